@@ -0,0 +1,234 @@
+# python_spade/audience.py
+"""
+Índice de audiência da Mídia: segmentos pré-computados de eleitores.
+
+Cada eleitor recebe um id inteiro e, em cada dimensão, uma faixa:
+  - party:       partido (PARTIES);
+  - ideology:    ideologia arredondada, FAR_LEFT..FAR_RIGHT (mesmos nomes
+                 de MEDIA_SIDE);
+  - credibility: LOW / MID / HIGH (cortes em AUDIENCE_CREDIBILITY_CUTS);
+  - centrality:  LOW / MID / HIGH, tercis do grau na rede social;
+  - outlet:      Mídia cuja audiência contém o eleitor (MEDIA_OUTLETS).
+
+Cada segmento (dimensão, faixa) é um array('i') de ids, com a posição de
+cada eleitor no seu segmento, de modo que mudar um eleitor de faixa (a
+ideologia deriva até o T10) é O(1): remoção por troca com o último mais
+append. Sortear k alvos de um segmento (ou de uma união de faixas da mesma
+dimensão) é O(k); com critérios em várias dimensões, sorteia na união
+menor e rejeita quem não atende os demais, caindo para uma varredura dessa
+união só se a taxa de aceitação for baixa demais.
+"""
+import random
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import common as cfg
+
+DIMENSIONS = ("party", "ideology", "credibility", "centrality", "outlet")
+IDEOLOGY_BANDS = ("FAR_LEFT", "LEFT", "CENTER", "RIGHT", "FAR_RIGHT")  # ideologia -2..2
+LEVELS = ("LOW", "MID", "HIGH")
+
+Criterion = Union[str, Iterable[str]]
+
+
+def ideology_band(ideology: float) -> str:
+    return IDEOLOGY_BANDS[min(2, max(-2, round(ideology))) + 2]
+
+
+def credibility_band(credibility: float, cuts: Sequence[float] = cfg.AUDIENCE_CREDIBILITY_CUTS) -> str:
+    return LEVELS[bisect_right(cuts, credibility)]
+
+
+def centrality_bands(degrees: Sequence[int]) -> List[str]:
+    """Tercis do grau (desempate pelo id), para que as três faixas tenham tamanhos iguais."""
+    n = len(degrees)
+    bands = [""] * n
+    for rank, i in enumerate(sorted(range(n), key=lambda i: (degrees[i], i))):
+        bands[i] = LEVELS[3 * rank // n]
+    return bands
+
+
+class AudienceIndex:
+    def __init__(self, dimensions: Sequence[str] = DIMENSIONS):
+        self.dimensions = tuple(dimensions)
+        self.jids: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.version = 0  # muda a cada troca de faixa (invalida as contagens em cache)
+        self._labels: Dict[str, List[str]] = {d: [] for d in self.dimensions}
+        self._codes: Dict[str, Dict[str, int]] = {d: {} for d in self.dimensions}
+        self._band: Dict[str, array] = {d: array("i") for d in self.dimensions}  # id -> código da faixa
+        self._pos: Dict[str, array] = {d: array("i") for d in self.dimensions}   # id -> posição no segmento
+        self._members: Dict[str, List[array]] = {d: [] for d in self.dimensions}
+        self._counts: Dict[Tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.jids)
+
+    def __contains__(self, jid: str) -> bool:
+        return jid in self.ids
+
+    # ---------------- Construção / atualização ----------------
+    def _code(self, dim: str, label: str) -> int:
+        code = self._codes[dim].get(label)
+        if code is None:
+            code = self._codes[dim][label] = len(self._labels[dim])
+            self._labels[dim].append(label)
+            self._members[dim].append(array("i"))
+        return code
+
+    def add(self, jid: str, bands: Dict[str, str]) -> int:
+        """Inclui um eleitor com uma faixa por dimensão; devolve o id."""
+        vid = self.ids[jid] = len(self.jids)
+        self.jids.append(jid)
+        for dim in self.dimensions:
+            code = self._code(dim, bands[dim])
+            members = self._members[dim][code]
+            self._band[dim].append(code)
+            self._pos[dim].append(len(members))
+            members.append(vid)
+        self.version += 1
+        return vid
+
+    def move(self, jid: str, dim: str, label: str) -> bool:
+        """Muda o eleitor de faixa em O(1); devolve False se já estava nela."""
+        vid = self.ids[jid]
+        old, new = self._band[dim][vid], self._code(dim, label)
+        if old == new:
+            return False
+        members, pos = self._members[dim][old], self._pos[dim]
+        last = members.pop()
+        if last != vid:
+            members[pos[vid]] = last
+            pos[last] = pos[vid]
+        pos[vid] = len(self._members[dim][new])
+        self._members[dim][new].append(vid)
+        self._band[dim][vid] = new
+        self.version += 1
+        return True
+
+    def update(self, jid: str, ideology: Optional[float] = None, credibility: Optional[float] = None) -> bool:
+        """Reclassifica o eleitor a partir do estado atual; devolve True se mudou de faixa."""
+        if jid not in self.ids:
+            return False
+        moved = False
+        if ideology is not None and "ideology" in self._band:
+            moved |= self.move(jid, "ideology", ideology_band(ideology))
+        if credibility is not None and "credibility" in self._band:
+            moved |= self.move(jid, "credibility", credibility_band(credibility))
+        return moved
+
+    # ---------------- Consulta ----------------
+    def band(self, jid: str, dim: str) -> str:
+        return self._labels[dim][self._band[dim][self.ids[jid]]]
+
+    def members(self, dim: str, label: str) -> array:
+        """Ids do segmento (não alterar)."""
+        code = self._codes[dim].get(label)
+        return self._members[dim][code] if code is not None else array("i")
+
+    def _criteria(self, criteria: Dict[str, Criterion]) -> List[Tuple[str, Tuple[int, ...]]]:
+        parsed = []
+        for dim, labels in criteria.items():
+            if dim not in self._codes:
+                raise KeyError(f"dimensão de audiência desconhecida: {dim}")
+            labels = (labels,) if isinstance(labels, str) else tuple(labels)
+            parsed.append((dim, tuple(sorted({self._codes[dim][l] for l in labels if l in self._codes[dim]}))))
+        # Sorteia na união menor; as outras dimensões viram filtro
+        parsed.sort(key=lambda dc: sum(len(self._members[dc[0]][c]) for c in dc[1]))
+        return parsed
+
+    def _matches(self, vid: int, filters: List[Tuple[str, Tuple[int, ...]]]) -> bool:
+        return all(self._band[dim][vid] in codes for dim, codes in filters)
+
+    def count(self, **criteria: Criterion) -> int:
+        """Eleitores que atendem todos os critérios (dimensão -> faixa ou faixas)."""
+        parsed = self._criteria(criteria)
+        if not parsed:
+            return len(self.jids)
+        (dim, codes), filters = parsed[0], parsed[1:]
+        if not filters:
+            return sum(len(self._members[dim][c]) for c in codes)
+        key = (self.version, tuple(parsed))
+        if key not in self._counts:
+            self._counts = {key: sum(
+                1 for c in codes for vid in self._members[dim][c] if self._matches(vid, filters)
+            )}
+        return self._counts[key]
+
+    def sample(
+        self,
+        k: int,
+        rng=random,
+        exclude: Iterable[str] = (),
+        **criteria: Criterion,
+    ) -> List[str]:
+        """
+        Até k JIDs distintos, uniformes entre os que atendem os critérios e
+        não estão em `exclude`. O(k) para uma dimensão sem exclusões.
+        """
+        parsed = self._criteria(criteria)
+        if parsed:
+            (dim, codes), filters = parsed[0], parsed[1:]
+            pools = [self._members[dim][c] for c in codes]
+        else:
+            filters, pools = [], [range(len(self.jids))]
+        ends, total = [], 0
+        for pool in pools:
+            total += len(pool)
+            ends.append(total)
+        k = min(k, total)
+        if k <= 0:
+            return []
+
+        def at(i: int) -> int:
+            p = bisect_right(ends, i)
+            return pools[p][i - (ends[p - 1] if p else 0)]
+
+        excluded = {self.ids[j] for j in exclude if j in self.ids}
+        if not filters and not excluded:
+            return [self.jids[at(i)] for i in rng.sample(range(total), k)]
+
+        # Rejeição: cada aceite é uniforme entre os elegíveis ainda não escolhidos
+        chosen: List[int] = []
+        seen = set()
+        attempts = 8 * k + 64
+        while len(chosen) < k and attempts and len(seen) < total:
+            attempts -= 1
+            i = rng.randrange(total)
+            if i in seen:
+                continue
+            seen.add(i)
+            vid = at(i)
+            if vid not in excluded and self._matches(vid, filters):
+                chosen.append(vid)
+        if len(chosen) < k and len(seen) < total:
+            eligible = [
+                vid for i in range(total) if i not in seen
+                for vid in (at(i),) if vid not in excluded and self._matches(vid, filters)
+            ]
+            chosen.extend(rng.sample(eligible, min(k - len(chosen), len(eligible))))
+        return [self.jids[vid] for vid in chosen]
+
+
+def build_index(
+    voter_jids: Sequence[str],
+    parties: Sequence[str],
+    ideology: Sequence[float],
+    credibility: Sequence[float],
+    degrees: Sequence[int],
+    outlet_of: Optional[Dict[str, str]] = None,
+) -> AudienceIndex:
+    """Índice a partir do estado inicial dos eleitores (na ordem de voter_jids)."""
+    index = AudienceIndex()
+    centrality = centrality_bands(degrees)
+    outlet_of = outlet_of or {}
+    for i, jid in enumerate(voter_jids):
+        index.add(jid, {
+            "party": parties[i],
+            "ideology": ideology_band(ideology[i]),
+            "credibility": credibility_band(credibility[i]),
+            "centrality": centrality[i],
+            "outlet": outlet_of.get(jid, ""),
+        })
+    return index
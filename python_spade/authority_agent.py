@@ -1,5 +1,4 @@
 # python_spade/authority_agent.py
-import spade
 import asyncio
 import json
 import random 
@@ -15,6 +14,8 @@ from common import (
     generate_jid,
     SUPERVISOR_PREFIX,
     PROTOCOL_VOTE,
+    PROTOCOL_BALLOT_SUMMARY,
+    PROTOCOL_DISTRICT_RESULTS,
     PROTOCOL_RESULTS,
     PROTOCOL_VOTING,
     PROTOCOL_INIT_SIM,
@@ -23,17 +24,54 @@ from common import (
     CANDIDATE_INITIAL_BUDGET,
     N_SEATS, 
     N_CITIZENS, 
+    P_DETECT_BASE, # Constante para a Punição Probabilística
+    DISTRICT_RESULTS_TIMEOUT,
 )
+from sim_agent import SimAgent
+from election_model import dhondt_allocation, ballots_digest, check_ballot_summary
 
-# Constante para a Punição Probabilística
-P_DETECT_BASE = 0.7 # 0.7 C0, C1 e C2 / 0.95 C3 
+def merge_district_results(results: List[Dict], n_citizens: int) -> Dict:
+    """Soma as contagens distritais num payload nacional (cadeiras = soma das cadeiras dos distritos)."""
+    by_candidate: Counter = Counter()
+    by_party: Counter = Counter()
+    seats: Counter = Counter()
+    received = 0
+    by_district = {}
+    for r in sorted(results, key=lambda r: r.get("district") or 0):
+        by_candidate.update(r["by_candidate"])
+        by_party.update(r["by_party"])
+        seats.update(r["seats_dhondt"])
+        received += r["total_votes_received"]
+        by_district[str(r.get("district"))] = {
+            "seats_dhondt": r["seats_dhondt"],
+            "total_votes_received": r["total_votes_received"],
+            "total_citizens": r["total_citizens"],
+        }
+    return {
+        "by_candidate": dict(by_candidate),
+        "by_party": dict(by_party),
+        "seats_dhondt": dict(seats),
+        "total_votes_received": received,
+        "total_citizens": n_citizens,
+        "abstentions": max(0, n_citizens - received),
+        "null_votes": by_candidate.get("NULO", 0),
+        "by_district": by_district,
+    }
 
-class ElectionAuthorityAgent(spade.agent.Agent):
+
+class ElectionAuthorityAgent(SimAgent):
     """
     Agente Autoridade Eleitoral:
     - Coleta votos, aplica D'Hondt e publica resultados ricos.
     - Ouve DENÚNCIAS da Mídia e aplica PUNIÇÕES (probabilísticas).
     - Gerencia a eliminação de candidatos após 3 punições.
+
+    Com distritos, há dois papéis:
+    - distrital (national_jid definido): coleta os votos do seu distrito e
+      manda a contagem com as suas `n_seats` cadeiras à Autoridade nacional;
+    - nacional (district_jids não vazio): repassa o anúncio de candidatos e
+      o START_COUNT aos distritos, que contam em paralelo, e soma os
+      resultados distritais antes de publicar ao Supervisor.
     """
 
     def __init__(
@@ -42,14 +80,31 @@ class ElectionAuthorityAgent(spade.agent.Agent):
         password: str,
         supervisor_jid: Optional[str] = None,
         *args,
+        district: Optional[int] = None,
+        national_jid: Optional[str] = None,
+        n_seats: int = N_SEATS,
+        n_citizens: int = N_CITIZENS,
         **kwargs
     ):
         super().__init__(jid, password, *args, **kwargs)
 
         self.supervisor_jid = supervisor_jid or generate_jid(SUPERVISOR_PREFIX, 1)
+        self.district = district
+        self.national_jid = national_jid
+        self.n_seats = n_seats
+        self.n_citizens = n_citizens
+        # Autoridade nacional: autoridades distritais e contagens recebidas
+        self.district_jids: List[str] = []
+        self._district_results: Dict[str, Dict] = {}
+        self._districts_done = asyncio.Event()
         self._votes: List[str] = []           
+        # Resumos de cédulas das populações (BALLOT_SUMMARY)
+        self._summary_counts: Counter = Counter()
+        self._summary_ballots = 0
+        self.ballot_hashes: Dict[str, List[str]] = {}  # população -> hashes (auditoria)
+        self._seen_ballot_hashes: Set[str] = set()
         self._candidate_jids: List[str] = []  
-        self.media_jid: Optional[str] = None 
+        self.media_jids: List[str] = []
         
         # D'Hondt
         self.candidate_parties: Dict[str, str] = {} 
@@ -69,6 +124,12 @@ class ElectionAuthorityAgent(spade.agent.Agent):
             Template(metadata={"protocol": PROTOCOL_VOTE})
         )
 
+        # Listener 1b: Votos agregados por população
+        self.add_behaviour(
+            self.BallotSummaryCollector(),
+            Template(metadata={"protocol": PROTOCOL_BALLOT_SUMMARY})
+        )
+
         # Listener 2: Sinal de contagem
         self.add_behaviour(
             self.StartCountListener(),
@@ -81,18 +142,26 @@ class ElectionAuthorityAgent(spade.agent.Agent):
             Template(metadata={"protocol": PROTOCOL_INIT_SIM})
         )
         
-        # Listener 4: Denúncias da Mídia
-        tpl_report = Template()
-        tpl_report.protocol = PROTOCOL_PUNISH
-        self.add_behaviour(self.MediaReportBehaviour(), tpl_report)
+        # Listener 4: Denúncias da Mídia (só na Autoridade nacional)
+        if self.national_jid is None:
+            tpl_report = Template()
+            tpl_report.protocol = PROTOCOL_PUNISH
+            self.add_behaviour(self.MediaReportBehaviour(), tpl_report)
+
+        # Listener 5: Contagens distritais
+        if self.district_jids:
+            self.add_behaviour(
+                self.DistrictResultsCollector(),
+                Template(metadata={"protocol": PROTOCOL_DISTRICT_RESULTS})
+            )
     
     async def _notify_media_of_elimination(self, cand_jid: str, beh: CyclicBehaviour):
-        """Notifica a Mídia sobre a eliminação de um candidato."""
-        if self.media_jid:
-            m = Message(to=self.media_jid)
+        """Notifica as Mídias sobre a eliminação de um candidato."""
+        for media_jid in self.media_jids:
+            m = Message(to=media_jid)
             m.set_metadata("protocol", PROTOCOL_ELIMINATION)
             m.set_metadata("performative", "inform")
-            m.body = cand_jid 
+            m.body = cand_jid
             await beh.send(m)
 
     # ============================================================
@@ -161,7 +230,7 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                 try:
                     cands = []
                     parties = []
-                    media_jid = None
+                    media_jids = []
                     
                     for part in body.split(";"):
                         if part.startswith("CANDIDATES="):
@@ -169,10 +238,10 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                         elif part.startswith("CANDIDATE_PARTIES="): # Lendo parties
                             parties = [x.strip() for x in part.split("=", 1)[1].strip().split(",") if x.strip()]
                         elif part.startswith("MEDIA_JID="):
-                            media_jid = part.split("=", 1)[1].strip()
+                            media_jids = [x.strip() for x in part.split("=", 1)[1].split(",") if x.strip()]
                             
                     self.agent._candidate_jids = cands
-                    self.agent.media_jid = media_jid
+                    self.agent.media_jids = media_jids
                     
                     # 2.1 Armazenar o partido de cada candidato
                     if cands and parties and len(cands) == len(parties):
@@ -184,6 +253,13 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                         self.agent.cand_punishments[cand_jid] = 0 
                     
                     print(f"[{get_sender_name(str(self.agent.jid)).upper()}] Candidatos registrados: {len(self.agent._candidate_jids)} com partidos.")
+
+                    # Autoridade nacional: os distritos contam com os mesmos candidatos
+                    for d_jid in self.agent.district_jids:
+                        fwd = Message(to=d_jid)
+                        fwd.metadata = dict(msg.metadata or {})
+                        fwd.body = msg.body
+                        await self.send(fwd)
                             
                 except Exception as e:
                     print(f"[AUTHORITY_ANNOUNCE_ERR] Erro ao processar anúncio: {e}")
@@ -193,23 +269,7 @@ class ElectionAuthorityAgent(spade.agent.Agent):
     # ============================================================
     class StartCountListener(CyclicBehaviour):
         
-        @staticmethod
-        def dhondt_allocation(votes_per_party: Dict[str, int], n_seats: int) -> Dict[str, int]:
-            """Implementa o método D'Hondt para distribuição de cadeiras."""
-            seats = {p: 0 for p in votes_per_party.keys()}
-            quotients = []
-
-            for party, v in votes_per_party.items():
-                for k in range(1, n_seats + 1):
-                    quotients.append((v / k, party))
-
-            quotients.sort(reverse=True, key=lambda t: t[0])
-            
-            # Distribui as cadeiras
-            for _, party in quotients[:n_seats]:
-                seats[party] += 1
-
-            return seats
+        dhondt_allocation = staticmethod(dhondt_allocation)
         
         async def run(self):
             msg = await self.receive(timeout=0.2)
@@ -222,11 +282,67 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                 self.kill() 
 
         async def _count_and_publish(self):
-            print(f"[{get_sender_name(str(self.agent.jid)).upper()}] Recebido START_COUNT. AGUARDANDO VOTOS POR 5 SEGUNDOS...")
-            
-            await asyncio.sleep(5.0) 
-            
+            if self.agent.district_jids:
+                payload_dict = await self._collect_districts()
+            else:
+                print(f"[{get_sender_name(str(self.agent.jid)).upper()}] Recebido START_COUNT. AGUARDANDO VOTOS POR 5 SEGUNDOS...")
+                await asyncio.sleep(5.0)
+                payload_dict = self._count_votes()
+
+            seats_per_party = payload_dict["seats_dhondt"]
+            total_valid_votes = sum(payload_dict["by_party"].values())
+            null_votes = payload_dict["null_votes"]
+            abstentions = payload_dict["abstentions"]
+
+            # Autoridade distrital -> nacional; senão, resultados ao Supervisor
+            if self.agent.national_jid:
+                payload_dict["district"] = self.agent.district
+                to, protocol, label = self.agent.national_jid, PROTOCOL_DISTRICT_RESULTS, "RESULTADOS DO DISTRITO ENVIADOS"
+            else:
+                to, protocol, label = self.agent.supervisor_jid, PROTOCOL_RESULTS, "RESULTADOS FINAIS ENVIADOS"
+
+            payload = json.dumps(payload_dict)
+            msg_out = Message(to=to)
+            msg_out.set_metadata("protocol", protocol)
+            msg_out.set_metadata("performative", "inform")
+            msg_out.body = payload
+            await self.send(msg_out)
+
+            # Printa para debug
+            print(
+                f"[{get_sender_name(str(self.agent.jid)).upper()}] {label}: "
+                f"Cadeiras={seats_per_party}, Válidos={total_valid_votes}, Nulos={null_votes}, Abst={abstentions}"
+            )
+            print(f"[{get_sender_name(str(self.agent.jid)).upper()}] PAYLOAD: {payload_dict}")
+            if self.agent.ballot_hashes:
+                all_hashes = sorted(h for hs in self.agent.ballot_hashes.values() for h in hs)
+                print(
+                    f"[{get_sender_name(str(self.agent.jid)).upper()}] AUDITORIA: "
+                    f"{len(all_hashes)} cédulas em {len(self.agent.ballot_hashes)} resumos, "
+                    f"digest={ballots_digest(all_hashes)}"
+                )
+
+        async def _collect_districts(self) -> Dict:
+            """Repassa o START_COUNT aos distritos (contagem em paralelo) e soma as contagens."""
+            me = get_sender_name(str(self.agent.jid)).upper()
+            for d_jid in self.agent.district_jids:
+                m = Message(to=d_jid)
+                m.set_metadata("protocol", PROTOCOL_VOTING)
+                m.set_metadata("performative", "inform")
+                m.body = "START_COUNT"
+                await self.send(m)
+            print(f"[{me}] START_COUNT repassado a {len(self.agent.district_jids)} distritos. Aguardando contagens...")
+
+            try:
+                await asyncio.wait_for(self.agent._districts_done.wait(), timeout=DISTRICT_RESULTS_TIMEOUT)
+            except asyncio.TimeoutError:
+                missing = [get_sender_name(j) for j in self.agent.district_jids if j not in self.agent._district_results]
+                print(f"[{me}][ERRO] Sem contagem de {missing} após {DISTRICT_RESULTS_TIMEOUT:.0f}s; publicando sem eles.")
+            return merge_district_results(list(self.agent._district_results.values()), self.agent.n_citizens)
+
+        def _count_votes(self) -> Dict:
             counts = Counter(self.agent._votes)
+            counts.update(self.agent._summary_counts)
             valid_cands = set(self.agent._candidate_jids)
             
             final_counts = {}
@@ -250,40 +366,23 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                 total_valid_votes += votes
 
             # Aplicar D'Hondt
-            seats_per_party = self.dhondt_allocation(party_votes, N_SEATS)
-            
+            seats_per_party = self.dhondt_allocation(party_votes, self.agent.n_seats)
+
             # Calcular abstenções e nulos
-            total_votes_received = len(self.agent._votes)
-            abstentions = max(0, N_CITIZENS - total_votes_received)
-            null_votes = final_counts.get("NULO", 0)
+            total_votes_received = len(self.agent._votes) + self.agent._summary_ballots
+            abstentions = max(0, self.agent.n_citizens - total_votes_received)
 
             # Payload rico
-            payload_dict = {
+            return {
                 "by_candidate": final_counts,
                 "by_party": dict(party_votes),
                 "seats_dhondt": seats_per_party,
                 "total_votes_received": total_votes_received,
-                "total_citizens": N_CITIZENS,
+                "total_citizens": self.agent.n_citizens,
                 "abstentions": abstentions,
-                "null_votes": null_votes,
+                "null_votes": final_counts.get("NULO", 0),
             }
 
-            payload = json.dumps(payload_dict)
-
-            # Envia resultados ao Supervisor
-            msg_sup = Message(to=self.agent.supervisor_jid)
-            msg_sup.set_metadata("protocol", PROTOCOL_RESULTS)
-            msg_sup.set_metadata("performative", "inform")
-            msg_sup.body = payload
-            await self.send(msg_sup)
-            
-            # Printa para debug
-            print(
-                f"[{get_sender_name(str(self.agent.jid)).upper()}] RESULTADOS FINAIS ENVIADOS: "
-                f"Cadeiras={seats_per_party}, Válidos={total_valid_votes}, Nulos={null_votes}, Abst={abstentions}"
-            )
-            print(f"[{get_sender_name(str(self.agent.jid)).upper()}] PAYLOAD: {payload_dict}")
-
     # ============================================================
     #  VoteCollector (Inalterado)
     # ============================================================
@@ -294,4 +393,57 @@ class ElectionAuthorityAgent(spade.agent.Agent):
                 return
 
             vote = (msg.body or "").strip()
-            self.agent._votes.append(vote)
\ No newline at end of file
+            self.agent._votes.append(vote)
+
+    # ============================================================
+    #  BallotSummaryCollector: votos agregados das populações
+    # ============================================================
+    class BallotSummaryCollector(CyclicBehaviour):
+        async def run(self):
+            msg = await self.receive(timeout=1.0)
+            if not msg:
+                return
+
+            me = get_sender_name(str(self.agent.jid)).upper()
+            try:
+                summary = json.loads(msg.body or "")
+            except ValueError:
+                print(f"[{me}][ERRO] Resumo de cédulas ilegível de {msg.sender}.")
+                return
+            shard = str(summary.get("population") or msg.sender)
+            problem = check_ballot_summary(summary)
+            if problem is None and not self.agent._seen_ballot_hashes.isdisjoint(summary["hashes"]):
+                problem = "cédulas já contadas"
+            if problem:
+                print(f"[{me}][ERRO] Resumo de {get_sender_name(shard)} rejeitado: {problem}.")
+                return
+
+            self.agent._summary_counts.update(summary["counts"])
+            self.agent._summary_ballots += len(summary["hashes"])
+            self.agent._seen_ballot_hashes.update(summary["hashes"])
+            self.agent.ballot_hashes.setdefault(shard, []).extend(summary["hashes"])
+            print(f"[{me}] Resumo de {get_sender_name(shard)}: {len(summary['hashes'])} votos.")
+
+    # ============================================================
+    #  DistrictResultsCollector: contagens das autoridades distritais
+    # ============================================================
+    class DistrictResultsCollector(CyclicBehaviour):
+        async def run(self):
+            msg = await self.receive(timeout=1.0)
+            if not msg:
+                return
+
+            me = get_sender_name(str(self.agent.jid)).upper()
+            sender = str(msg.sender)
+            try:
+                data = json.loads(msg.body or "")
+            except ValueError:
+                print(f"[{me}][ERRO] Contagem ilegível de {get_sender_name(sender)}.")
+                return
+            self.agent._district_results[sender] = data
+            print(
+                f"[{me}] Contagem do {get_sender_name(sender)} "
+                f"({len(self.agent._district_results)}/{len(self.agent.district_jids)}): {data.get('seats_dhondt')}"
+            )
+            if len(self.agent._district_results) >= len(self.agent.district_jids):
+                self.agent._districts_done.set()
@@ -0,0 +1,254 @@
+# python_spade/behaviour_profiler.py
+"""
+Perfil por behaviour (opt-in: PROFILE_BEHAVIOURS em common.py ou CLI).
+
+O SimAgent embrulha o run() de cada behaviour adicionado. O embrulho mede
+só o tempo em que a corrotina está de fato executando (cada passo entre
+dois awaits que suspendem), sem contar a espera em receive()/sleep(), e
+atribui esse tempo ocupado ao tipo de agente × classe do behaviour e ao
+TICK corrente (METRICS.tick). Com tracemalloc ligado, soma também a
+alocação líquida de cada passo.
+
+Em paralelo, uma thread amostra a pilha do event loop a cada
+PROFILE_SAMPLE_INTERVAL e grava as pilhas no formato "collapsed"
+(frame;frame;frame N), pronto para flamegraph.pl / speedscope / inferno.
+
+Uso (10k eleitores em populações, sem editar os agentes):
+    python behaviour_profiler.py --n 10000 --population-size 1000 --out-prefix prof_10k
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tick_timing import Histogram
+
+# Baldes (ms) do tempo ocupado por chamada de run()
+STEP_BUCKETS_MS = [0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 500]
+
+
+class _TimedRun:
+    """Conduz a corrotina de run() passo a passo, somando só o tempo ocupado."""
+
+    def __init__(self, coro, on_done: Callable[[float, int], None], track_alloc: bool):
+        self.coro = coro
+        self.on_done = on_done
+        self.track_alloc = track_alloc
+
+    def __await__(self):
+        gen = self.coro.__await__()
+        busy = 0.0
+        alloc = 0
+        value: Any = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                mem0 = tracemalloc.get_traced_memory()[0] if self.track_alloc else 0
+                t0 = time.perf_counter()
+                try:
+                    if error is not None:
+                        step = gen.throw(error)
+                    else:
+                        step = gen.send(value)
+                except StopIteration as stop:
+                    busy += time.perf_counter() - t0
+                    if self.track_alloc:
+                        alloc += tracemalloc.get_traced_memory()[0] - mem0
+                    return stop.value
+                busy += time.perf_counter() - t0
+                if self.track_alloc:
+                    alloc += tracemalloc.get_traced_memory()[0] - mem0
+                try:
+                    value, error = (yield step), None
+                except GeneratorExit:
+                    gen.close()
+                    raise
+                except BaseException as e:  # cancelamento etc.: repassa à corrotina
+                    value, error = None, e
+        finally:
+            self.on_done(busy, alloc)
+
+
+class BehaviourProfiler:
+    """Tempo ocupado e alocação por behaviour, por TICK, e amostras de pilha."""
+
+    def __init__(self):
+        self.enabled = False
+        self.track_alloc = False
+        self.tick_source: Callable[[], int] = lambda: -1
+        self.steps: Dict[Tuple[str, str], Histogram] = {}
+        self.alloc: Counter = Counter()                          # (agente, behaviour) -> bytes líquidos
+        self.per_tick: Dict[int, Counter] = defaultdict(Counter)  # tick -> behaviour -> ms ocupado
+        self.stacks: Counter = Counter()                          # pilha "a;b;c" -> amostras
+        self.samples = 0
+        self.alloc_sites: List[Dict[str, Any]] = []               # maiores linhas alocadoras (tracemalloc)
+        self.wall_seconds = 0.0
+        self._t0 = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- Ciclo de vida ----------------
+    def start(self, sample_interval: float = 0.005, track_alloc: bool = True,
+              tick_source: Optional[Callable[[], int]] = None):
+        self.enabled = True
+        self.track_alloc = track_alloc
+        if tick_source is not None:
+            self.tick_source = tick_source
+        if track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+        self._t0 = time.perf_counter()
+        if sample_interval > 0:
+            target = threading.get_ident()  # thread do event loop
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._sample_loop, args=(target, sample_interval), name="behaviour-profiler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self.wall_seconds = time.perf_counter() - self._t0
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.track_alloc and tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:15]
+            self.alloc_sites = [
+                {"site": f"{os.path.basename(st.traceback[0].filename)}:{st.traceback[0].lineno}",
+                 "bytes": st.size, "blocks": st.count}
+                for st in stats
+            ]
+            tracemalloc.stop()
+        self.enabled = False
+
+    # ---------------- Embrulho dos behaviours ----------------
+    def wrap(self, agent_kind: str, behaviour) -> None:
+        key = (agent_kind, type(behaviour).__name__)
+        hist = self.steps.setdefault(key, Histogram(STEP_BUCKETS_MS))
+        run = behaviour.run
+        profiler = self
+
+        def done(busy: float, alloc: int):
+            ms = busy * 1000.0
+            hist.add(ms)
+            profiler.per_tick[profiler.tick_source()][key[1]] += ms
+            profiler.alloc[key] += alloc
+
+        async def profiled_run():
+            return await _TimedRun(run(), done, profiler.track_alloc)
+
+        behaviour.run = profiled_run
+
+    # ---------------- Amostragem de pilhas ----------------
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _sample_loop(self, thread_id: int, interval: float):
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    # ---------------- Relatórios ----------------
+    def summary(self) -> Dict[str, Any]:
+        total_ms = sum(h.total for h in self.steps.values()) or 1.0
+        behaviours = []
+        for (agent, name), hist in sorted(self.steps.items(), key=lambda kv: kv[1].total, reverse=True):
+            if not hist.n:
+                continue
+            behaviours.append({
+                "agent": agent,
+                "behaviour": name,
+                "calls": hist.n,
+                "busy_ms": hist.total,
+                "share": hist.total / total_ms,
+                "alloc_bytes": self.alloc[(agent, name)],
+                "step": hist.to_dict(),
+            })
+        return {
+            "wall_seconds": self.wall_seconds,
+            "busy_ms": total_ms,
+            "stack_samples": self.samples,
+            "behaviours": behaviours,
+            "alloc_sites": self.alloc_sites,
+            "per_tick": {str(t): dict(c) for t, c in sorted(self.per_tick.items())},
+        }
+
+    def report_lines(self, top: int = 15) -> List[str]:
+        out = [f"{'agente.behaviour':<40} {'chamadas':>9} {'ocupado':>10} {'média':>9} {'p95':>8} "
+               f"{'%':>6} {'alloc':>10}"]
+        for b in self.summary()["behaviours"][:top]:
+            alloc = f"{b['alloc_bytes'] / 1024:.0f}KiB" if self.track_alloc else "-"
+            out.append(
+                f"{b['agent'] + '.' + b['behaviour']:<40} {b['calls']:>9} {b['busy_ms']:>8.0f}ms "
+                f"{b['step']['mean_ms']:>7.3f}ms {b['step']['p95_ms']:>6.2f}ms {b['share'] * 100:>5.1f}% {alloc:>10}"
+            )
+        ticks = [t for t in self.per_tick if t >= 0]
+        if ticks:
+            worst = max(ticks, key=lambda t: sum(self.per_tick[t].values()))
+            parts = ", ".join(f"{k}={v:.0f}ms" for k, v in self.per_tick[worst].most_common(3))
+            out.append(f"TICK mais pesado: T{worst} ({sum(self.per_tick[worst].values()):.0f}ms: {parts})")
+        return out
+
+    def save(self, json_path: str = "", collapsed_path: str = ""):
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as fh:
+                json.dump(self.summary(), fh, indent=2)
+        if collapsed_path:
+            with open(collapsed_path, "w", encoding="utf-8") as fh:
+                for stack, n in self.stacks.most_common():
+                    fh.write(f"{stack} {n}\n")
+
+
+PROFILER = BehaviourProfiler()
+
+
+# ==========================
+# CLI: roda a simulação com o perfil ligado
+# ==========================
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Perfil por behaviour de uma execução SPADE.")
+    parser.add_argument("--n", type=int, default=None, help="N_CITIZENS (padrão: common.py)")
+    parser.add_argument("--population-size", type=int, default=None, help="VOTER_POPULATION_SIZE")
+    parser.add_argument("--tick-duration", type=float, default=None, help="TICK_DURATION")
+    parser.add_argument("--interval", type=float, default=None, help="Intervalo de amostragem de pilhas (s)")
+    parser.add_argument("--no-alloc", action="store_true", help="Desliga tracemalloc")
+    parser.add_argument("--out-prefix", default="behaviour_profile", help="Gera <prefixo>.json e <prefixo>.collapsed")
+    args = parser.parse_args(argv)
+
+    import common as cfg
+
+    # Os agentes importam as constantes por nome: ajustar ANTES de importá-los
+    if args.n is not None:
+        cfg.N_CITIZENS = args.n
+    if args.population_size is not None:
+        cfg.VOTER_POPULATION_SIZE = args.population_size
+    if args.tick_duration is not None:
+        cfg.TICK_DURATION = args.tick_duration
+    if args.interval is not None:
+        cfg.PROFILE_SAMPLE_INTERVAL = args.interval
+    cfg.PROFILE_BEHAVIOURS = True
+    cfg.PROFILE_TRACEMALLOC = not args.no_alloc
+    cfg.PROFILE_FILE = f"{args.out_prefix}.json"
+    cfg.PROFILE_COLLAPSED_FILE = f"{args.out_prefix}.collapsed"
+
+    import spade
+    import run_spade_sim
+
+    spade.run(run_spade_sim.main(), embedded_xmpp_server=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# python_spade/bench_compare.py
+"""
+Compara um relatório do benchmark.py com uma linha de base da mesma máquina.
+
+Os casos são pareados por (modo, N) e, para cada métrica, mostra o valor da
+base, o novo e a variação. Uma piora acima do limite (em %) conta como
+regressão e o comando sai com código 1 (0 = ok; 2 = entrada inválida ou
+máquina diferente com --strict-host), para uso em CI ou antes de um commit.
+
+Métricas (nome: o que mede):
+    tick_mean, tick_p95: tempo ocupado por TICK (ms; menor é melhor; p95 exato das amostras)
+    boot:                arranque dos agentes / do modelo (s)
+    total:               tempo total do caso (s)
+    rss:                 pico de RSS (MiB)
+    msg_rate:            mensagens recebidas por segundo (maior é melhor)
+
+Diferenças absolutas abaixo de NOISE_FLOOR (ex.: 1 ms por TICK) não contam
+como regressão: em casos pequenos, 20% de 0,3 ms é ruído.
+
+Uso:
+    python benchmark.py --modes population headless --sizes 1000 --out base.json     # na base
+    python benchmark.py --modes population headless --sizes 1000 --out new.json      # depois da mudança
+    python bench_compare.py base.json new.json --threshold 10 --metric tick_p95=20 --metric rss=5
+"""
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# nome -> (extrator do caso, maior é melhor?, unidade, formato)
+METRICS: Dict[str, Tuple[Callable[[Dict[str, Any]], Optional[float]], bool, str, str]] = {
+    "tick_mean": (lambda c: (c.get("tick_ms") or {}).get("mean_ms"), False, "ms", ".2f"),
+    # Só p95 exato: o dos relatórios antigos é o limite do balde (1/2/5/10/20... ms)
+    "tick_p95": (
+        lambda c: (c.get("tick_ms") or {}).get("p95_ms") if (c.get("tick_ms") or {}).get("quantiles") == "exact" else None,
+        False, "ms", ".2f",
+    ),
+    "boot": (lambda c: c.get("boot_seconds"), False, "s", ".2f"),
+    "total": (lambda c: c.get("total_seconds"), False, "s", ".2f"),
+    "rss": (lambda c: c["peak_rss_bytes"] / 2**20 if c.get("peak_rss_bytes") else None, False, "MiB", ".0f"),
+    "msg_rate": (lambda c: c.get("messages_per_second"), True, "msg/s", ".0f"),
+}
+
+# Variação absoluta mínima para contar como regressão (mesma unidade da métrica)
+NOISE_FLOOR = {"tick_mean": 1.0, "tick_p95": 2.0, "boot": 0.2, "total": 0.5, "rss": 5.0, "msg_rate": 20.0}
+
+# Campos de meta que identificam a máquina/ambiente
+HOST_KEYS = ("platform", "cpu_count", "python")
+# Campos de meta que mudam o que foi medido
+CONFIG_KEYS = ("tick_duration", "population_size", "trace_policy", "seed")
+
+DEFAULT_THRESHOLD = 10.0
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        report = json.load(fh)
+    if not isinstance(report, dict) or "cases" not in report:
+        raise ValueError(f"{path}: não é um relatório do benchmark.py (falta 'cases')")
+    return report
+
+
+def meta_differences(base: Dict[str, Any], new: Dict[str, Any], keys) -> List[str]:
+    bm, nm = base.get("meta", {}), new.get("meta", {})
+    return [f"{k}: {bm.get(k)!r} -> {nm.get(k)!r}" for k in keys if bm.get(k) != nm.get(k)]
+
+
+def compare_case(base: Dict[str, Any], new: Dict[str, Any], thresholds: Dict[str, float]) -> List[Dict[str, Any]]:
+    rows = []
+    for name, (extract, higher_better, unit, spec) in METRICS.items():
+        b, n = extract(base), extract(new)
+        if b is None or n is None:
+            continue
+        delta = n - b
+        pct = (delta / b * 100.0) if b else (0.0 if not delta else float("inf"))
+        worse = -pct if higher_better else pct
+        limit = thresholds.get(name, thresholds["*"])
+        rows.append({
+            "metric": name,
+            "unit": unit,
+            "spec": spec,
+            "base": b,
+            "new": n,
+            "delta": delta,
+            "pct": pct,
+            "threshold_pct": limit,
+            "regression": worse > limit and abs(delta) >= NOISE_FLOOR.get(name, 0.0),
+        })
+    return rows
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], thresholds: Dict[str, float]) -> Dict[str, Any]:
+    base_cases = {(c["mode"], c["n_citizens"]): c for c in base["cases"]}
+    new_cases = {(c["mode"], c["n_citizens"]): c for c in new["cases"]}
+    cases, skipped = [], []
+    for key in sorted(set(base_cases) | set(new_cases)):
+        b, n = base_cases.get(key), new_cases.get(key)
+        label = f"{key[0]} N={key[1]}"
+        if b is None or n is None:
+            skipped.append(f"{label}: só na {'nova' if b is None else 'base'}")
+        elif b.get("status") != "ok" or n.get("status") != "ok":
+            skipped.append(f"{label}: status base={b.get('status')} nova={n.get('status')}")
+        else:
+            cases.append({"mode": key[0], "n_citizens": key[1], "metrics": compare_case(b, n, thresholds)})
+    regressions = [
+        f"{c['mode']} N={c['n_citizens']} {r['metric']}"
+        for c in cases for r in c["metrics"] if r["regression"]
+    ]
+    return {"cases": cases, "skipped": skipped, "regressions": regressions}
+
+
+def report_lines(result: Dict[str, Any]) -> List[str]:
+    out = [f"{'caso':<20} {'métrica':<10} {'base':>10} {'nova':>10} {'variação':>10} {'limite':>7}"]
+    for case in result["cases"]:
+        label = f"{case['mode']} N={case['n_citizens']}"
+        for r in case["metrics"]:
+            pct = f"{r['pct']:+.1f}%" if r["pct"] != float("inf") else "novo"
+            flag = "  << REGRESSÃO" if r["regression"] else ""
+            out.append(
+                f"{label:<20} {r['metric']:<10} {format(r['base'], r['spec']):>10} "
+                f"{format(r['new'], r['spec']):>10} {pct:>10} {r['threshold_pct']:>6.0f}%{flag}"
+            )
+            label = ""
+    for s in result["skipped"]:
+        out.append(f"(ignorado) {s}")
+    return out
+
+
+def parse_thresholds(default: float, items: List[str]) -> Dict[str, float]:
+    thresholds = {"*": default}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep or name not in METRICS:
+            raise ValueError(f"--metric {item!r}: use NOME=PCT com NOME em {', '.join(METRICS)}")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara um benchmark com a linha de base (regressões).")
+    parser.add_argument("baseline", help="JSON do benchmark.py de referência")
+    parser.add_argument("new", help="JSON do benchmark.py a avaliar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Piora máxima aceita (%%) para todas as métricas")
+    parser.add_argument("--metric", action="append", default=[], metavar="NOME=PCT",
+                        help=f"Limite próprio de uma métrica ({', '.join(METRICS)}); pode repetir")
+    parser.add_argument("--strict-host", action="store_true",
+                        help="Falha (código 2) se a base foi medida em outra máquina/ambiente")
+    parser.add_argument("--out", default=None, help="Salva a comparação em JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = parse_thresholds(args.threshold, args.metric)
+        base, new = load_report(args.baseline), load_report(args.new)
+    except (OSError, ValueError) as e:
+        print(f"[COMPARE][ERRO] {e}")
+        return 2
+
+    host = meta_differences(base, new, HOST_KEYS)
+    config = meta_differences(base, new, CONFIG_KEYS)
+    for d in host:
+        print(f"[COMPARE][AVISO] Máquina diferente da base: {d}")
+    for d in config:
+        print(f"[COMPARE][AVISO] Configuração diferente da base: {d}")
+    if host and args.strict_host:
+        return 2
+
+    result = compare(base, new, thresholds)
+    print(f"[COMPARE] base={base.get('meta', {}).get('git_commit') or args.baseline} "
+          f"nova={new.get('meta', {}).get('git_commit') or args.new}")
+    for line in report_lines(result):
+        print(line)
+
+    if args.out:
+        result["meta"] = {"baseline": args.baseline, "new": args.new, "thresholds": thresholds,
+                          "host_differences": host, "config_differences": config}
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+    if not result["cases"]:
+        print("[COMPARE][ERRO] Nenhum caso comparável (mesmo modo/N com status ok nos dois).")
+        return 2
+    if result["regressions"]:
+        print(f"[COMPARE] {len(result['regressions'])} regressão(ões): {'; '.join(result['regressions'])}")
+        return 1
+    print("[COMPARE] Sem regressões.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+# python_spade/benchmark.py
+"""
+Benchmark de escala da simulação eleitoral.
+
+Executa a simulação para cada N (padrão: 60, 1k, 10k, 100k) em cada modo:
+  - xmpp:       agentes SPADE, todas as mensagens pelo servidor XMPP embutido
+                (FORCE_XMPP_ROUTING);
+  - container:  agentes SPADE com entrega local do container (padrão do SPADE);
+  - population: como container, com os eleitores em VoterPopulationAgents
+                (VOTER_POPULATION_SIZE eleitores lógicos por agente);
+  - headless:   headless_sim.py (sem SPADE/XMPP), TICK a TICK;
+  - vectorized: vectorized_sim.py (NumPy), lote de 1 replicação;
+  - cohort:     cohort_sim.py (coortes ponderadas; custo independente de N).
+
+Cada caso roda num subprocesso próprio (pico de RSS isolado) e registra:
+tempo de boot, latência por TICK, tempo total, pico de RSS, mensagens por
+segundo, bytes por eleitor e memória dos traces de mensagens (TRACE_POLICY).
+Tudo roda offline (servidor XMPP embutido) e o relatório JSON pode ser
+comparado entre commits.
+
+Uso:
+    python benchmark.py --modes container headless vectorized --sizes 60 1000 --out bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODES = ("xmpp", "container", "population", "headless", "vectorized", "cohort")
+DEFAULT_SIZES = (60, 1000, 10000, 100000)
+
+# Maior N executado por modo (acima disso o caso é marcado como "skipped";
+# --no-caps desliga o limite). Um agente SPADE custa uma conexão XMPP.
+MODE_CAPS = {"xmpp": 1000, "container": 1000, "population": 10000, "headless": 100000, "vectorized": 100000,
+             "cohort": 10_000_000}
+
+# Políticas de trace (sim_agent.SimTraceStore)
+TRACE_POLICIES = ("off", "ring", "sample", "protocols")
+
+
+# ==========================
+# Memória
+# ==========================
+def rss_bytes() -> int:
+    """RSS atual do processo (Linux: /proc/self/statm; senão, o pico)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _tick_stats(tick_ms: List[float]) -> Dict[str, Any]:
+    """Histograma dos TICKs com p50/p95 exatos (os do histograma são o limite do balde)."""
+    from tick_timing import Histogram, percentile
+
+    hist = Histogram()
+    for ms in tick_ms:
+        hist.add(ms)
+    stats = hist.to_dict()
+    stats.update(p50_ms=percentile(tick_ms, 0.50), p95_ms=percentile(tick_ms, 0.95), quantiles="exact")
+    return stats
+
+
+# ==========================
+# Casos (executados no subprocesso)
+# ==========================
+def bench_spade(n: int, tick_duration: float, force_xmpp: bool, population_size: int, trace_policy: str,
+                out_dir: str, max_run_seconds: float, result_path: str):
+    """
+    Roda run_spade_sim.main() e grava o resultado assim que ela termina. O
+    processo sai em seguida (os._exit), sem o teardown do SPADE/servidor,
+    que com milhares de conexões pode levar minutos e não é medido.
+    """
+    import common as cfg
+
+    # Os agentes importam as constantes por nome: ajustar ANTES de importá-los
+    cfg.N_CITIZENS = n
+    cfg.TICK_DURATION = tick_duration
+    cfg.FORCE_XMPP_ROUTING = force_xmpp
+    cfg.VOTER_POPULATION_SIZE = population_size
+    cfg.TRACE_POLICY = trace_policy
+    cfg.CHART_OUTPUT_DIR = out_dir
+    cfg.TICK_TIMING_FILE = ""
+    cfg.MESSAGE_METRICS_FILE = ""
+
+    import spade
+    import run_spade_sim
+
+    samples: List[tuple] = []
+
+    async def sample_rss():
+        while True:
+            samples.append((time.perf_counter(), rss_bytes()))
+            await asyncio.sleep(0.2)
+
+    async def run():
+        sampler = asyncio.create_task(sample_rss())
+        rss0 = rss_bytes()
+        t0 = time.perf_counter()
+        stats = await run_spade_sim.main(max_run_seconds=max_run_seconds)
+        total = time.perf_counter() - t0
+        sampler.cancel()
+
+        boot_end = t0 + stats["setup_seconds"] + stats["boot_seconds"]
+        rss_boot = max((r for t, r in samples if t <= boot_end), default=rss0)
+        received = sum(d["in"] for protocols in stats["messages"].values() for d in protocols.values())
+        sent = sum(d["out"] for protocols in stats["messages"].values() for d in protocols.values())
+        write_result(result_path, {
+            "boot_seconds": stats["setup_seconds"] + stats["boot_seconds"],
+            "run_seconds": stats["run_seconds"],
+            "total_seconds": total,
+            "tick_ms": _tick_stats(stats["tick_busy_ms"]),
+            "tick_period_ms": stats["timing"].get("period"),
+            "messages_sent": sent,
+            "messages_received": received,
+            "messages_per_second": received / stats["run_seconds"] if stats["run_seconds"] else None,
+            "bytes_per_voter": (rss_boot - rss0) / float(n),
+            "trace_policy": stats["traces"]["policy"],
+            "trace_entries": stats["traces"]["entries"],
+            "trace_bytes": stats["traces"]["bytes"],
+            "completed": stats["results"] is not None,
+        })
+        sys.stdout.flush()
+        os._exit(0)
+
+    spade.run(run(), embedded_xmpp_server=True)
+
+
+def bench_headless(n: int, seed: int) -> Dict[str, Any]:
+    import headless_sim
+
+    # Aquecimento (imports tardios, p.ex. networkx) fora da medição
+    headless_sim.HeadlessElection(headless_sim.build_params({"N_CITIZENS": 8}), seed)
+    rss0 = rss_bytes()
+    t0 = time.perf_counter()
+    params = headless_sim.build_params({"N_CITIZENS": n})
+    election = headless_sim.HeadlessElection(params, seed)
+    boot = time.perf_counter() - t0
+    rss_boot = rss_bytes()
+
+    tick_ms = []
+    results = None
+    t_run = time.perf_counter()
+    for t in range(int(params["TOTAL_TICKS"]) + 1):
+        ts = time.perf_counter()
+        out = election.step(t)
+        tick_ms.append((time.perf_counter() - ts) * 1000.0)
+        if out is not None:
+            results = out
+    run = time.perf_counter() - t_run
+    return {
+        "boot_seconds": boot,
+        "run_seconds": run,
+        "total_seconds": boot + run,
+        "tick_ms": _tick_stats(tick_ms),
+        "messages_sent": None,
+        "messages_received": None,
+        "messages_per_second": None,
+        "bytes_per_voter": (rss_boot - rss0) / float(n),
+        "completed": results is not None,
+    }
+
+
+def bench_vectorized(n: int, seed: int) -> Dict[str, Any]:
+    import vectorized_sim
+
+    vectorized_sim.simulate_batch(1, {"N_CITIZENS": 8}, seed=seed)
+    rss0 = rss_bytes()
+    t0 = time.perf_counter()
+    out = vectorized_sim.simulate_batch(1, {"N_CITIZENS": n}, seed=seed)
+    run = time.perf_counter() - t0
+    ticks = int(vectorized_sim.cfg.TOTAL_TICKS) + 1
+    return {
+        "boot_seconds": None,
+        "run_seconds": run,
+        "total_seconds": run,
+        "tick_ms": {"n": ticks, "mean_ms": run * 1000.0 / ticks},
+        "messages_sent": None,
+        "messages_received": None,
+        "messages_per_second": None,
+        "bytes_per_voter": max(0, peak_rss_bytes() - rss0) / float(n),
+        "completed": int(out["seats"].sum()) > 0,
+    }
+
+
+def bench_cohort(n: int, seed: int) -> Dict[str, Any]:
+    import cohort_sim
+
+    cohort_sim.simulate({"N_CITIZENS": 8}, seed=seed)
+    rss0 = rss_bytes()
+    t0 = time.perf_counter()
+    election = cohort_sim.CohortElection(cohort_sim.build_params({"N_CITIZENS": n}), seed)
+    boot = time.perf_counter() - t0
+    t_run = time.perf_counter()
+    results = election.run()
+    run = time.perf_counter() - t_run
+    ticks = int(cohort_sim.cfg.TOTAL_TICKS) + 1
+    return {
+        "boot_seconds": boot,
+        "run_seconds": run,
+        "total_seconds": boot + run,
+        "tick_ms": {"n": ticks, "mean_ms": run * 1000.0 / ticks},
+        "messages_sent": None,
+        "messages_received": None,
+        "messages_per_second": None,
+        "bytes_per_voter": max(0, peak_rss_bytes() - rss0) / float(n),
+        "cohorts": results["cohorts"],
+        "completed": results["total_votes_received"] > 0,
+    }
+
+
+def write_result(result_path: str, data: Dict[str, Any]):
+    data["peak_rss_bytes"] = peak_rss_bytes()
+    with open(result_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+
+
+def run_child(mode: str, n: int, args):
+    if mode in ("xmpp", "container", "population"):
+        out_dir = os.path.join(os.path.dirname(args.result), "charts")
+        population_size = args.population_size if mode == "population" else 0
+        bench_spade(n, args.tick_duration, mode == "xmpp", population_size, args.trace_policy, out_dir,
+                    args.timeout, args.result)
+    elif mode == "headless":
+        write_result(args.result, bench_headless(n, args.seed))
+    elif mode == "cohort":
+        write_result(args.result, bench_cohort(n, args.seed))
+    else:
+        write_result(args.result, bench_vectorized(n, args.seed))
+
+
+# ==========================
+# Orquestração (processo pai)
+# ==========================
+def run_case(mode: str, n: int, args) -> Dict[str, Any]:
+    case: Dict[str, Any] = {"mode": mode, "n_citizens": n}
+    if not args.no_caps and n > MODE_CAPS[mode]:
+        case["status"] = "skipped"
+        return case
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--child", mode, "--n", str(n),
+            "--result", result_path, "--tick-duration", str(args.tick_duration), "--seed", str(args.seed),
+            "--timeout", str(args.timeout), "--population-size", str(args.population_size),
+            "--trace-policy", args.trace_policy,
+        ]
+        log = open(os.path.join(args.log_dir, f"{mode}_{n}.log"), "w") if args.log_dir else subprocess.DEVNULL
+        t0 = time.perf_counter()
+        # Sessão própria: o servidor XMPP embutido cria um pool de processos que
+        # herda a porta 5222 e sobrevive ao os._exit do caso; o grupo inteiro é
+        # encerrado aqui para não bloquear o caso seguinte.
+        proc = subprocess.Popen(cmd, cwd=HERE, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        try:
+            returncode = proc.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            returncode = None
+        finally:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.wait()
+            if args.log_dir:
+                log.close()
+        case["wall_seconds"] = time.perf_counter() - t0
+
+        if returncode is None:
+            case["status"] = "timeout"
+        elif returncode != 0 or not os.path.exists(result_path):
+            case["status"] = f"error (código {returncode})"
+        else:
+            with open(result_path, encoding="utf-8") as fh:
+                case.update(json.load(fh))
+            case["status"] = "ok" if case.get("completed") else "incomplete"
+    return case
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if isinstance(value, (int, float)) else "-"
+
+
+def print_case(case: Dict[str, Any]):
+    tick = case.get("tick_ms") or {}
+    print(
+        f"[BENCH] {case['mode']:<10} N={case['n_citizens']:<7} {case['status']:<10} "
+        f"boot={_fmt(case.get('boot_seconds'), '.2f')}s "
+        f"total={_fmt(case.get('total_seconds'), '.2f')}s "
+        f"tick={_fmt(tick.get('mean_ms'), '.1f')}ms "
+        f"rss={_fmt((case.get('peak_rss_bytes') or 0) / 2**20, '.0f')}MiB "
+        f"msg/s={_fmt(case.get('messages_per_second'), '.0f')} "
+        f"B/eleitor={_fmt(case.get('bytes_per_voter'), '.0f')} "
+        f"traces={_fmt(case['trace_bytes'] / 2**20 if 'trace_bytes' in case else None, '.1f')}MiB"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark de escala da simulação eleitoral.")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--tick-duration", type=float, default=0.2, help="TICK_DURATION nos modos SPADE")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="Limite por caso (s)")
+    parser.add_argument("--population-size", type=int, default=1000,
+                        help="Eleitores lógicos por agente no modo population")
+    parser.add_argument("--trace-policy", default="ring", choices=TRACE_POLICIES,
+                        help="TRACE_POLICY dos agentes nos modos SPADE")
+    parser.add_argument("--no-caps", action="store_true", help="Ignora MODE_CAPS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-dir", default=None, help="Guarda a saída de cada caso")
+    parser.add_argument("--out", default="benchmark_results.json")
+    # Uso interno (subprocesso de um caso)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--n", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.n, args)
+        return
+
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "tick_duration": args.tick_duration,
+            "population_size": args.population_size,
+            "trace_policy": args.trace_policy,
+            "seed": args.seed,
+        },
+        "cases": [],
+    }
+    for mode in args.modes:
+        for n in args.sizes:
+            case = run_case(mode, n, args)
+            print_case(case)
+            report["cases"].append(case)
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"[BENCH] Relatório salvo em: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
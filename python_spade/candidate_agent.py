@@ -2,7 +2,6 @@
 
 import asyncio
 import random
-import spade
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
 from spade.template import Template
@@ -12,8 +11,9 @@ from common import (
     PROTOCOL_INIT_SIM,
     PROTOCOL_CAMPAIGN,
 )
+from sim_agent import SimAgent
 
-class CandidateAgent(spade.agent.Agent):
+class CandidateAgent(SimAgent):
     """
     Agente Candidato (modelo de alto nível, não usado diretamente no run_spade_sim.py atual).
     A lógica de campanha do rascunho é mantida aqui.
@@ -0,0 +1,254 @@
+# python_spade/charts.py
+"""
+Renderização de gráficos FORA do event loop dos agentes.
+
+A Mídia apenas grava o histórico (JSON) e agenda o PNG num subprocesso
+(BackgroundRenderer); o matplotlib nunca é importado no processo dos
+agentes. O mesmo histórico alimenta figuras comparativas entre várias
+execuções, renderizadas em paralelo.
+
+Uso (linha de comando):
+    python charts.py render  historico1.json historico2.json ... [--workers N]
+    python charts.py compare historico1.json historico2.json ... --out comparacao.png
+    python charts.py scenarios --scenarios C0 C1 C2 C3 --reps 3 --out-dir RESULTS
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import common as cfg
+
+HISTORY_PREFIX = "media_mix_history"
+CHART_PREFIX = "media_mix_evolution"
+
+
+def matplotlib_available() -> bool:
+    """Verifica o matplotlib sem importá-lo."""
+    return importlib.util.find_spec("matplotlib") is not None
+
+
+def run_label() -> str:
+    """Rótulo da execução usado nos nomes de arquivo (CHART_RUN_LABEL ou timestamp)."""
+    return cfg.CHART_RUN_LABEL or time.strftime("%Y%m%d-%H%M%S")
+
+
+def output_paths(label: str, out_dir: Optional[str] = None) -> Dict[str, str]:
+    out_dir = out_dir or cfg.CHART_OUTPUT_DIR
+    return {
+        "history": os.path.join(out_dir, f"{HISTORY_PREFIX} {label}.json"),
+        "chart": os.path.join(out_dir, f"{CHART_PREFIX} {label}.png"),
+    }
+
+
+# ==========================
+# Histórico
+# ==========================
+def make_history(label: str, ticks: List[int], news: List[int], fake: List[int]) -> Dict[str, Any]:
+    return {"label": label, "ticks": list(ticks), "news": list(news), "fake": list(fake)}
+
+
+def save_history(history: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(history, fh)
+
+
+def load_history(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# ==========================
+# Renderização
+# ==========================
+def _new_figure(figsize):
+    """Figura matplotlib sem pyplot (backend Agg, seguro fora da thread principal)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def render_media_mix(history: Dict[str, Any], fname: str) -> str:
+    """Gráfico de evolução do mix NEWS/FAKENEWS de uma execução."""
+    fig = _new_figure((8, 4.5))
+    ax = fig.add_subplot(1, 1, 1)
+    ax.plot(history["ticks"], history["news"], label="NEWS")
+    ax.plot(history["ticks"], history["fake"], label="FAKENEWS")
+    ax.set_xlabel("Tick")
+    ax.set_ylabel("Mensagens acumuladas")
+    title = "Evolução do mix NEWS/FAKENEWS (Mídia)"
+    if history.get("label"):
+        title += f" — {history['label']}"
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    fig.savefig(fname, bbox_inches="tight")
+    return fname
+
+
+def render_comparison(histories: List[Dict[str, Any]], fname: str) -> str:
+    """Comparação de várias execuções: NEWS e FAKENEWS acumulados lado a lado."""
+    fig = _new_figure((12, 4.5))
+    ax_news = fig.add_subplot(1, 2, 1)
+    ax_fake = fig.add_subplot(1, 2, 2, sharey=ax_news)
+    for hist in histories:
+        label = hist.get("label", "")
+        ax_news.plot(hist["ticks"], hist["news"], label=label)
+        ax_fake.plot(hist["ticks"], hist["fake"], label=label)
+    ax_news.set_title("NEWS acumulados")
+    ax_fake.set_title("FAKENEWS acumulados")
+    for ax in (ax_news, ax_fake):
+        ax.set_xlabel("Tick")
+        ax.grid(True)
+    ax_news.set_ylabel("Mensagens acumuladas")
+    ax_fake.legend(fontsize="small", ncol=2)
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    fig.savefig(fname, bbox_inches="tight")
+    return fname
+
+
+def _render_history_file(path: str, fname: str) -> str:
+    return render_media_mix(load_history(path), fname)
+
+
+class BackgroundRenderer:
+    """
+    Renderiza históricos gravados em subprocessos (`python charts.py render`).
+    submit() retorna imediatamente; o processo dos agentes nunca importa
+    o matplotlib nem espera pelo PNG.
+    """
+
+    def __init__(self):
+        self._procs: List[subprocess.Popen] = []
+
+    def submit(self, history_path: str) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "render", history_path],
+            stdout=subprocess.DEVNULL,
+        )
+        self._procs.append(proc)
+        return proc
+
+    def wait(self, timeout: Optional[float] = None) -> List[int]:
+        codes = []
+        for proc in self._procs:
+            try:
+                codes.append(proc.wait(timeout=timeout))
+            except subprocess.TimeoutExpired:
+                codes.append(-1)
+        self._procs = []
+        return codes
+
+
+_RENDERER: Optional[BackgroundRenderer] = None
+
+
+def get_renderer() -> BackgroundRenderer:
+    global _RENDERER
+    if _RENDERER is None:
+        _RENDERER = BackgroundRenderer()
+    return _RENDERER
+
+
+def wait_pending(timeout: Optional[float] = 60.0) -> List[int]:
+    """Aguarda os gráficos pendentes (chamado no shutdown da simulação)."""
+    return _RENDERER.wait(timeout) if _RENDERER is not None else []
+
+
+# ==========================
+# Lotes de várias execuções
+# ==========================
+def render_many(history_paths: List[str], out_dir: Optional[str] = None, workers: Optional[int] = None,
+                comparison: Optional[str] = None) -> List[str]:
+    """Renderiza um PNG por histórico (em paralelo) e, opcionalmente, a comparação."""
+    futures = []
+    histories = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for path in history_paths:
+            hist = load_history(path)
+            histories.append(hist)
+            label = hist.get("label") or os.path.splitext(os.path.basename(path))[0]
+            fname = output_paths(label, out_dir or os.path.dirname(path))["chart"]
+            futures.append(pool.submit(_render_history_file, path, fname))
+        if comparison:
+            futures.append(pool.submit(render_comparison, histories, comparison))
+        return [f.result() for f in futures]
+
+
+def scenario_histories(scenarios: List[str], reps: int, out_dir: str, seed: int = 0) -> List[str]:
+    """Gera históricos headless por cenário/replicação (C0a, C0b, ...)."""
+    import headless_sim
+    from scenarios import SCENARIOS
+
+    paths = []
+    for name in scenarios:
+        for r in range(reps):
+            label = f"{name}{chr(ord('a') + r)}"
+            election = headless_sim.HeadlessElection(
+                headless_sim.build_params(SCENARIOS[name]), seed=f"{seed}:{label}"
+            )
+            election.run()
+            hist = make_history(
+                label,
+                [h["tick"] for h in election.history],
+                [h["news"] for h in election.history],
+                [h["fake"] for h in election.history],
+            )
+            path = output_paths(label, out_dir)["history"]
+            save_history(hist, path)
+            paths.append(path)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gráficos da Mídia a partir de históricos gravados.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_render = sub.add_parser("render", help="Um PNG por histórico, em paralelo")
+    p_render.add_argument("histories", nargs="+")
+    p_render.add_argument("--out-dir", default=None)
+    p_render.add_argument("--workers", type=int, default=None)
+    p_render.add_argument("--comparison", default=None, help="PNG comparativo opcional")
+
+    p_cmp = sub.add_parser("compare", help="Figura comparativa de várias execuções")
+    p_cmp.add_argument("histories", nargs="+")
+    p_cmp.add_argument("--out", default="media_mix_comparison.png")
+
+    p_scn = sub.add_parser("scenarios", help="Históricos headless + PNGs por cenário")
+    p_scn.add_argument("--scenarios", nargs="+", default=["C0", "C1", "C2", "C3"])
+    p_scn.add_argument("--reps", type=int, default=3)
+    p_scn.add_argument("--out-dir", default="charts")
+    p_scn.add_argument("--workers", type=int, default=None)
+    p_scn.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if not matplotlib_available():
+        parser.error("matplotlib não está instalado.")
+
+    if args.cmd == "render":
+        paths = [p for pattern in args.histories for p in sorted(glob.glob(pattern))]
+        written = render_many(paths, args.out_dir, args.workers, args.comparison)
+    elif args.cmd == "compare":
+        written = [render_comparison([load_history(p) for p in args.histories], args.out)]
+    else:
+        paths = scenario_histories(args.scenarios, args.reps, args.out_dir, args.seed)
+        comparison = os.path.join(args.out_dir, "media_mix_comparison.png")
+        written = render_many(paths, args.out_dir, args.workers, comparison)
+
+    for fname in written:
+        print(f"[CHARTS] GRÁFICO SALVO EM: {fname}")
+
+
+if __name__ == "__main__":
+    main()
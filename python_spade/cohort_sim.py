@@ -0,0 +1,382 @@
+# python_spade/cohort_sim.py
+"""
+Motor por COORTES para eleitorados muito grandes (milhões de eleitores).
+
+Fora o partido, um eleitor é descrito por engagement e credibilidade
+(uniformes) e pela exposição à campanha; eleitores com o mesmo estado são
+intercambiáveis. O eleitorado vira então uma grade de coortes
+(partido × faixa de engagement × faixa de credibilidade) com pesos
+inteiros, e o custo não depende de N:
+
+  - T10: os candidatos são os C maiores engagements (estatísticas de ordem
+    Beta(N-k+1, k)), retirados das coortes correspondentes;
+  - T11..T50: a Mídia decide como no headless_sim (RL/mix manual, custos,
+    viralização, denúncia); os alvos de cada TICK são repartidos entre as
+    coortes por uma amostra hipergeométrica multivariada;
+  - T51: em cada coorte, até COHORT_SAMPLES eleitores representativos
+    (engagement/credibilidade uniformes dentro das faixas) revivem a
+    exposição da campanha e decidem o voto com as regras de
+    election_model; a contagem da coorte é uma multinomial(peso, frequências
+    dos representativos). Coortes pequenas são simuladas eleitor a eleitor.
+
+A influência social (T0..T10) só move a ideologia, que não entra na regra
+de voto, e por isso não é simulada aqui.
+
+Uso:
+    python cohort_sim.py --n 10000000
+    python cohort_sim.py --n 3000 --compare 100    # agregados vs headless_sim
+"""
+import argparse
+import copy
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import common as cfg
+from common import generate_jid
+import election_model as model
+from headless_sim import PUNISHMENTS_TO_ELIMINATE, build_params, party_counts_for
+
+# Grade de coortes
+ENGAGEMENT_BINS = 20
+CREDIBILITY_BINS = 8
+CREDIBILITY_RANGE = (0.5, 0.9)  # como VoterAgent.confianca_midia
+# Eleitores representativos por coorte no dia da eleição
+COHORT_SAMPLES = 128
+
+
+class CohortElection:
+    """Uma replicação da eleição com o eleitorado em coortes ponderadas."""
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        seed: Any = None,
+        engagement_bins: int = ENGAGEMENT_BINS,
+        credibility_bins: int = CREDIBILITY_BINS,
+        samples: int = COHORT_SAMPLES,
+    ):
+        self.p = params
+        self.rng = np.random.default_rng(seed)
+        # Decisões escalares da Mídia com as mesmas funções do headless (random.Random)
+        self.media_rng = random.Random(int(self.rng.integers(2**63)))
+        self.n = int(params["N_CITIZENS"])
+        self.E, self.R, self.S = int(engagement_bins), int(credibility_bins), int(samples)
+
+        # Pesos (partido, faixa de engagement, faixa de credibilidade)
+        self.parties = list(cfg.ALL_PARTIES)
+        counts = party_counts_for(self.n, params["PARTY_PERCENTAGES"])
+        cells = self.E * self.R
+        self.weights = np.stack([
+            self.rng.multinomial(counts[p], np.full(cells, 1.0 / cells)).reshape(self.E, self.R)
+            for p in self.parties
+        ]).astype(np.int64)
+
+        # Candidatos (indivíduos fora das coortes)
+        self.candidates: List[str] = []          # JIDs
+        self.cand_party: List[str] = []
+        self.cand_engagement: List[float] = []
+        self.budgets: List[float] = []
+        self.q_values: List[Dict[str, Dict[str, float]]] = []
+        self.punishments: List[int] = []
+        self.eliminated: set = set()
+        self.cand_idx = 0
+
+        # Campanha: (slot do candidato, performativo, fração exposta por coorte) por TICK
+        self.exposures: List[Tuple[int, str, np.ndarray]] = []
+        self.news_sent = 0
+        self.fakenews_sent = 0
+
+    @property
+    def n_cohorts(self) -> int:
+        return int(np.count_nonzero(self.weights))
+
+    # ---------------- T10 ----------------
+    def _promote_candidates(self):
+        c = min(int(self.p["N_CANDIDATES_TO_PROMOTE"]), self.n)
+        k = np.arange(1, c + 1)
+        # k-ésimo maior de N uniformes ~ Beta(N-k+1, k)
+        engagement = np.sort(self.rng.beta(self.n - k + 1, k))[::-1]
+        ids = self.rng.choice(self.n, size=c, replace=False) + 1
+        for e, vid in zip(engagement, ids):
+            e_bin = min(self.E - 1, int(e * self.E))
+            while e_bin > 0 and not self.weights[:, e_bin, :].any():
+                e_bin -= 1
+            cell = self.weights[:, e_bin, :]
+            flat = self.rng.choice(cell.size, p=cell.ravel() / cell.sum())
+            party_i, r_bin = divmod(int(flat), self.R)
+            self.weights[party_i, e_bin, r_bin] -= 1
+
+            self.candidates.append(generate_jid(cfg.VOTER_PREFIX, int(vid)))
+            self.cand_party.append(self.parties[party_i])
+            self.cand_engagement.append(float(e))
+            self.budgets.append(float(self.p["CANDIDATE_INITIAL_BUDGET"]))
+            self.q_values.append(model.empty_q_table())
+            self.punishments.append(0)
+
+    # ---------------- T11..T50 ----------------
+    def _next_active_candidate(self) -> Optional[int]:
+        for _ in range(len(self.candidates)):
+            slot = self.cand_idx % len(self.candidates)
+            self.cand_idx += 1
+            if slot not in self.eliminated:
+                return slot
+        return None
+
+    def _campaign_step(self, cand: Optional[int] = None):
+        p, rng = self.p, self.media_rng
+        if cand is None:
+            cand = self._next_active_candidate()
+        if cand is None:
+            return
+
+        state = model.budget_state(self.budgets[cand], p["CANDIDATE_INITIAL_BUDGET"])
+        if p["MEDIA_USE_MANUAL_RATIOS"]:
+            perf = model.manual_performative(p["NEWS_RATIO"], p["FAKE_RATIO"], rng)
+        else:
+            perf = model.select_action(self.q_values[cand][state], p["RL_EPSILON"], rng)
+
+        if perf == "NEWS":
+            cost_per_target, fine = p["COST_NEWS_PER_TARGET"], 0
+        else:
+            cost_per_target, fine = p["COST_FAKENEWS_PER_TARGET"], p["PENALTY_PER_FAKENEWS"]
+
+        n_targets = max(1, int(0.4 * self.n))
+        if rng.random() < model.viral_probability(perf, p["VIRAL_BASE_PROB"]):
+            n_targets += min(int(p["VIRAL_MAX_EXTRA_TARGETS"]), self.n - n_targets)
+
+        total_cost = n_targets * cost_per_target
+        self.budgets[cand] -= total_cost + fine
+        punished_for_rl = perf == "FAKENEWS" and rng.random() < p["P_DETECT_BASE"]
+
+        # Alvos repartidos entre coortes e candidatos (que não recebem a mensagem)
+        w = self.weights.ravel()
+        pool = np.append(w, len(self.candidates))
+        hit = self.rng.multivariate_hypergeometric(pool, n_targets, method="marginals")[:-1]
+        self.exposures.append((cand, perf, (hit / np.maximum(w, 1)).astype(np.float32)))
+
+        if perf == "FAKENEWS" and rng.random() < p["P_DETECT_BASE"]:
+            self.punishments[cand] += 1
+            if self.punishments[cand] >= PUNISHMENTS_TO_ELIMINATE:
+                self.eliminated.add(cand)
+
+        if not p["MEDIA_USE_MANUAL_RATIOS"]:
+            self._update_q(cand, state, perf, total_cost + fine, n_targets, punished_for_rl)
+
+        if perf == "NEWS":
+            self.news_sent += n_targets
+        else:
+            self.fakenews_sent += n_targets
+
+    def _update_q(self, cand: int, state: str, action: str, cost: float, n_targets: int, punished: bool):
+        p = self.p
+        reward = model.campaign_reward(
+            n_targets, self.n, cost, p["RL_LAMBDA_COST"], p["CANDIDATE_INITIAL_BUDGET"]
+        )
+        reward *= model.ideological_weight(
+            self.cand_party[cand], p["MEDIA_IDEOLOGY_BIAS"], p["MEDIA_BIAS_STRENGTH"]
+        )
+        next_state = model.budget_state(self.budgets[cand], p["CANDIDATE_INITIAL_BUDGET"])
+        q = self.q_values[cand]
+        updated = model.bellman_update(
+            q[state][action], reward, max(q[next_state].values()), p["RL_ALPHA"], p["RL_GAMMA"]
+        )
+        if punished and action == "FAKENEWS":
+            factor = model.punishment_factor(self.cand_party[cand])
+            if factor is not None:
+                updated *= factor
+        q[state][action] = updated
+
+    # ---------------- T51 ----------------
+    def _cohort_votes(self) -> np.ndarray:
+        """Votos por categoria (candidatos..., nulo, abstenção) somados sobre as coortes."""
+        p, rng = self.p, self.rng
+        C = len(self.candidates)
+        K = max(1, int(p["CAMPAIGN_MEMORY_WINDOW"]))
+        w = self.weights.ravel()
+        cohorts = np.flatnonzero(w)
+        reps = np.minimum(w[cohorts], self.S)
+        cohort_of = np.repeat(np.arange(len(cohorts)), reps)
+        flat = cohorts[cohort_of]
+        n_reps = len(flat)
+
+        e_bin = (flat // self.R) % self.E
+        r_bin = flat % self.R
+        engagement = (e_bin + rng.random(n_reps)) / self.E
+        lo, hi = CREDIBILITY_RANGE
+        credibility = lo + (hi - lo) * (r_bin + rng.random(n_reps)) / self.R
+
+        # Exposição à campanha (memória em buffer circular, como no vectorized_sim)
+        msg_count = np.zeros(n_reps, dtype=np.int64)
+        memory = np.zeros((n_reps, max(C, 1), K))
+        mem_sum = np.zeros((n_reps, max(C, 1)))
+        mem_count = np.zeros((n_reps, max(C, 1)), dtype=np.int64)
+        backfire = credibility > p["FAKENEWS_BACKFIRE_CREDIBILITY"]
+        rows = np.arange(n_reps)
+        for slot, perf, share in self.exposures:
+            exposed = rng.random(n_reps) < share[flat]
+            if perf == "FAKENEWS":
+                impact = rng.uniform(0.1, 0.3, n_reps) * np.where(backfire, -0.5, 1.0)
+            else:
+                impact = rng.uniform(0.05, 0.2, n_reps) * credibility
+            msg_count += exposed
+            pos = mem_count[:, slot] % K
+            oldest = memory[rows, slot, pos]
+            memory[rows[exposed], slot, pos[exposed]] = impact[exposed]
+            mem_sum[:, slot] += np.where(exposed, impact - oldest, 0.0)
+            mem_count[:, slot] += exposed
+
+        # Decisão (election_model.decide_vote, vetorizada)
+        overload = np.maximum(0, msg_count - p["VOTER_OVERLOAD_THRESHOLD"])
+        eff = np.maximum(0.0, engagement - np.minimum(0.40, 0.02 * overload))
+        p_abstain = p["P_BASE_ABSTAIN"] + 0.4 * (eff < p["ENGAGEMENT_ABSTAIN_THRESHOLD"])
+        votes = rng.random(n_reps) >= p_abstain
+        if C:
+            scores = model.PESO_IDEO * rng.uniform(0.1, 0.3, (n_reps, C)) * eff[:, None]
+            scores += model.PESO_CAMP * mem_sum[:, :C] / np.maximum(np.minimum(mem_count[:, :C], K), 1)
+            choice = scores.argmax(axis=1)
+            max_score = scores.max(axis=1)
+        else:
+            choice = np.zeros(n_reps, dtype=np.int64)
+            max_score = np.zeros(n_reps)
+        null = (rng.random(n_reps) < p["P_BASE_NULL"] + 0.25 * (max_score < 0.05)) | (C == 0)
+        category = np.where(~votes, C + 1, np.where(null, C, choice))
+
+        hist = np.zeros((len(cohorts), C + 2), dtype=np.int64)
+        np.add.at(hist, (cohort_of, category), 1)
+        exact = w[cohorts] <= self.S
+        totals = hist[exact].sum(axis=0)
+        sampled = ~exact
+        if sampled.any():
+            freqs = hist[sampled] / reps[sampled][:, None]
+            totals += rng.multinomial(w[cohorts][sampled], freqs).sum(axis=0)
+        return totals
+
+    def _vote_and_count(self) -> Dict[str, Any]:
+        p, rng = self.p, self.rng
+        C = len(self.candidates)
+        totals = self._cohort_votes()
+
+        # Candidatos votam em si mesmos (99%), sem mensagens de campanha
+        for slot, e in enumerate(self.cand_engagement):
+            p_abstain = model.abstain_probability(e, p["P_BASE_ABSTAIN"], p["ENGAGEMENT_ABSTAIN_THRESHOLD"])
+            if rng.random() < p_abstain:
+                totals[C + 1] += 1
+            elif rng.random() < 0.99:
+                totals[slot] += 1
+            else:
+                totals[C] += 1
+
+        by_candidate = {jid: int(totals[i]) for i, jid in enumerate(self.candidates)}
+        if totals[C]:
+            by_candidate["NULO"] = int(totals[C])
+        party_votes: Dict[str, int] = {}
+        for i, party in enumerate(self.cand_party):
+            party_votes[party] = party_votes.get(party, 0) + int(totals[i])
+        received = int(totals[:C + 1].sum())
+        return {
+            "by_candidate": by_candidate,
+            "by_party": party_votes,
+            "seats_dhondt": model.dhondt_allocation(party_votes, int(p["N_SEATS"])),
+            "total_votes_received": received,
+            "total_citizens": self.n,
+            "abstentions": self.n - received,
+            "null_votes": int(totals[C]),
+            "news_sent": self.news_sent,
+            "fakenews_sent": self.fakenews_sent,
+            "eliminated": sorted(self.candidates[c] for c in self.eliminated),
+            "cohorts": self.n_cohorts,
+        }
+
+    # ---------------- Execução ----------------
+    def run_campaign(self, policy: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None):
+        """T10 e T11..T50, sem a votação; `policy` (partido -> tabela Q) inicia as tabelas dos candidatos."""
+        self._promote_candidates()
+        if policy:
+            for c, party in enumerate(self.cand_party):
+                if party in policy:
+                    self.q_values[c] = copy.deepcopy(policy[party])
+        for _tick in range(11, min(50, int(self.p["TOTAL_TICKS"])) + 1):
+            if not self.candidates:
+                continue
+            if self.p["MEDIA_CAMPAIGN_MODE"] == "tick":
+                # Um envio por candidato ativo no início do TICK
+                for cand in [c for c in range(len(self.candidates)) if c not in self.eliminated]:
+                    self._campaign_step(cand)
+            else:
+                self._campaign_step()
+
+    def run(self) -> Dict[str, Any]:
+        self.run_campaign()
+        return self._vote_and_count()
+
+
+def simulate(overrides: Optional[Dict[str, Any]] = None, seed: Any = None, **grid) -> Dict[str, Any]:
+    """Executa uma replicação por coortes e devolve o payload de resultados (formato do headless)."""
+    return CohortElection(build_params(overrides), seed, **grid).run()
+
+
+# ==========================
+# CLI
+# ==========================
+def _aggregates(results: Dict[str, Any]) -> Dict[str, float]:
+    n = float(results["total_citizens"])
+    cand = sorted((v for k, v in results["by_candidate"].items() if k != "NULO"), reverse=True)
+    received = results["total_votes_received"] or 1
+    return {
+        "abstenção": results["abstentions"] / n,
+        "nulos/recebidos": results["null_votes"] / received,
+        "1º candidato/recebidos": (cand[0] if cand else 0) / received,
+        "último candidato/recebidos": (cand[-1] if cand else 0) / received,
+        "FAKENEWS/alvos": results["fakenews_sent"] / float(results["news_sent"] + results["fakenews_sent"] or 1),
+    }
+
+
+def compare(n: int, reps: int, seed: int = 0) -> List[str]:
+    """Média dos agregados em `reps` replicações: coortes vs headless_sim (eleitor a eleitor)."""
+    import headless_sim
+
+    engines = {"coortes": simulate, "headless": headless_sim.simulate}
+    means: Dict[str, Dict[str, float]] = {}
+    for name, fn in engines.items():
+        t0 = time.perf_counter()
+        acc: Dict[str, float] = {}
+        for r in range(reps):
+            for k, v in _aggregates(fn({"N_CITIZENS": n}, seed=f"{seed}-{r}" if name == "headless" else (seed, r))).items():
+                acc[k] = acc.get(k, 0.0) + v / reps
+        means[name] = acc
+        print(f"[COHORT] {name}: {reps} replicações em {time.perf_counter() - t0:.1f}s")
+    out = [f"{'agregado (média)':<28} {'coortes':>9} {'headless':>9}"]
+    for k in means["coortes"]:
+        out.append(f"{k:<28} {means['coortes'][k]:>9.4f} {means['headless'][k]:>9.4f}")
+    return out
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Eleição por coortes ponderadas (eleitorados muito grandes).")
+    parser.add_argument("--n", type=int, default=10_000_000, help="Número de eleitores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--samples", type=int, default=COHORT_SAMPLES, help="Representativos por coorte no T51")
+    parser.add_argument("--compare", type=int, default=0, metavar="REPS",
+                        help="Compara os agregados com o headless_sim em REPS replicações (use N pequeno)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        for line in compare(args.n, args.compare, args.seed):
+            print(line)
+        return
+
+    t0 = time.perf_counter()
+    election = CohortElection(build_params({"N_CITIZENS": args.n}), args.seed, samples=args.samples)
+    results = election.run()
+    elapsed = time.perf_counter() - t0
+    print(f"[COHORT] N={args.n} em {election.n_cohorts} coortes: {elapsed:.2f}s")
+    print(f"[COHORT] Votos por candidato: {results['by_candidate']}")
+    print(f"[COHORT] Cadeiras (D'Hondt): {results['seats_dhondt']}")
+    print(f"[COHORT] Abstenções: {results['abstentions']} | Nulos: {results['null_votes']}")
+
+
+if __name__ == "__main__":
+    main()
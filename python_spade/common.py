@@ -12,6 +12,8 @@ AUTHORITY_PREFIX  = "authority"
 MEDIA_PREFIX      = "media"
 VOTER_PREFIX      = "voter"
 CANDIDATE_PREFIX  = "candidate"
+POPULATION_PREFIX = "population"
+DISTRICT_PREFIX   = "district"
 
 
 def generate_jid(prefix: str, i: int) -> str:
@@ -33,11 +35,14 @@ PROTOCOL_INIT_SIM            = "SIM_INIT"            # TICKs e ANNOUNCE de Candi
 PROTOCOL_REQUEST_ENGAGEMENT  = "REQUEST_ENGAGEMENT"  # sup -> voters (T10)
 PROTOCOL_RESPONSE_ENGAGEMENT = "RESPONSE_ENGAGEMENT" # voters -> sup (T10)
 PROTOCOL_CAMPAIGN            = "CAMPAIGN"            # media/candidate -> voters
+PROTOCOL_CAMPAIGN_BATCH      = "CAMPAIGN_BATCH"      # media -> host de eleitores (todos os envios do TICK)
 PROTOCOL_PUNISH              = "PUNISH"              # media -> authority (Denúncia)
 PROTOCOL_VOTING              = "VOTING"              # sup -> voters ; sup -> authority (START_COUNT)
 PROTOCOL_VOTE                = "VOTE"                # voters -> authority
 PROTOCOL_RESULTS             = "RESULTS"             # authority -> sup
 PROTOCOL_ELIMINATION         = "ELIMINATION"         # authority -> media (Eliminação de cand.)
+PROTOCOL_BALLOT_SUMMARY      = "BALLOT_SUMMARY"      # populações -> authority (votos agregados)
+PROTOCOL_DISTRICT_RESULTS    = "DISTRICT_RESULTS"    # autoridade distrital -> nacional
 
 
 # ----------------- Tempo e Config -----------------
@@ -45,21 +50,67 @@ TOTAL_TICKS = 51                # 0..51 (T51 = eleição)
 TICK_DURATION = 2.5             # 0.5s em teste / 2.5s em simulação real
 N_CITIZENS = 60                # 10 em teste / 60 em simulação real
 N_CANDIDATES_TO_PROMOTE = 6    # 3 em teste / 6 em simulação real
+# Coleta de engagement no T10: a promoção sai quando ENGAGEMENT_QUORUM (fração
+# dos eleitores) respondeu ou após ENGAGEMENT_TIMEOUT segundos, o que vier antes
+ENGAGEMENT_QUORUM = 1.0
+ENGAGEMENT_TIMEOUT = 8.0
 
 # --- Sistema eleitoral ---
 N_SEATS = 3  # número de cadeiras para o método D'Hondt
+# Distritos: com N_DISTRICTS > 1, os eleitores são divididos em blocos contíguos
+# da rede e cada distrito tem uma autoridade (district_k) que conta e aplica
+# D'Hondt às suas cadeiras; a Autoridade nacional soma os distritos.
+N_DISTRICTS = 1
+DISTRICT_SEATS = None           # cadeiras por distrito; None = N_SEATS repartidas pelo eleitorado
+DISTRICT_RESULTS_TIMEOUT = 15.0  # s que a Autoridade nacional espera pelos distritos
 
 # --- Abstenção / Voto Nulo ---
 P_BASE_ABSTAIN = 0.05           # probabilidade base de abstenção
 P_BASE_NULL = 0.05              # probabilidade base de voto nulo
 ENGAGEMENT_ABSTAIN_THRESHOLD = 0.20  # abaixo disso, abstenção sobe bastante
 
+# --- Fadiga / Reação a FAKENEWS ---
+VOTER_OVERLOAD_THRESHOLD = 20         # 20 em C0 e C2 / 60 em C1 e C3
+FAKENEWS_BACKFIRE_CREDIBILITY = 0.7   # 0,7 em C0, C1 e C2 / 0,8 em C3
+
+# --- Influência social (T0..T10) ---
+#   "pull": com prob. 0.2 por TICK o eleitor pergunta o perfil a um vizinho (QUERY_PROFILE + resposta JSON);
+#   "gossip": a cada TICK cada host de eleitores publica os perfis aos hosts vizinhos num único payload,
+#             e a influência usa o último perfil recebido de cada vizinho.
+INFLUENCE_MODE = "pull"
+# Avanço rápido de T0..T9 (influence_fastforward.py): "off" (rodadas reais) | "expected" | "sampled"
+INFLUENCE_FAST_FORWARD = "off"
+
+# --- Memória de campanha ---
+CAMPAIGN_MEMORY_WINDOW = 2            # últimos K impactos guardados por (eleitor, candidato)
+
 
 # --- Viés ideológico da mídia ---
 # Valores possíveis: "LEFT", "RIGHT", "FAR_LEFT", "FAR_RIGHT", "CENTER", "NEUTRAL"
 MEDIA_IDEOLOGY_BIAS = "CENTER"
 MEDIA_BIAS_STRENGTH = 0.15  # 0.0 (=neutro) a ~0.3 (viés bem forte)
 
+# Várias mídias (media_1..media_K) em paralelo, cada uma com a sua fatia do
+# eleitorado (audiências disjuntas) e o seu caixa por candidato (orçamento
+# inicial x fatia). Cada entrada aceita "bias", "strength", "news_ratio",
+# "fake_ratio", "policy", "target" (padrão: os valores globais) e "audience" (peso da fatia).
+# Lista vazia = uma única Mídia com todo o eleitorado.
+MEDIA_OUTLETS = []
+# Ex.: [{"bias": "LEFT", "audience": 0.6}, {"bias": "FAR_RIGHT", "strength": 0.3, "fake_ratio": 0.6, "audience": 0.4}]
+
+# Campanha segmentada (audience.py): cada envio sorteia 40% do segmento da audiência
+# que atende os critérios, dimensão -> faixa(s): "party" (código ou "CANDIDATE" =
+# partido do candidato), "ideology" (FAR_LEFT..FAR_RIGHT), "credibility" e
+# "centrality" (LOW/MID/HIGH). Vazio = toda a audiência.
+MEDIA_TARGETING = {}
+# Ex.: {"ideology": ["LEFT", "FAR_LEFT"], "centrality": "HIGH"}
+AUDIENCE_CREDIBILITY_CUTS = (0.63, 0.77)  # LOW < 0.63 <= MID < 0.77 <= HIGH (credibilidade ~ U(0.5, 0.9))
+
+# Ritmo da campanha: "round_robin" = um candidato por TICK, em revezamento (calibração
+# dos cenários C0..C3); "tick" = a cada TICK, um envio por candidato ativo, planejado
+# em lote, com uma mensagem CAMPAIGN_BATCH por host de eleitores.
+MEDIA_CAMPAIGN_MODE = "round_robin"
+
 
 # --- Efeito viral ---
 VIRAL_BASE_PROB = 0.15          # probabilidade base de viralizar (0.15 C0 e C2 / 0.50 C1 / 0.05 C3)
@@ -73,6 +124,7 @@ CANDIDATE_INITIAL_BUDGET = 1000
 COST_NEWS_PER_TARGET = 10
 COST_FAKENEWS_PER_TARGET = 4 # 4 em C0, C2 e C3 / 1 em C1
 PENALTY_PER_FAKENEWS = 50
+P_DETECT_BASE = 0.7 # 0.7 C0, C1 e C2 / 0.95 C3
 
 
 # --- Parâmetros de Reinforcement Learning (Q-Learning) ---
@@ -81,12 +133,72 @@ RL_EPSILON = 0.2       # probabilidade de exploração (escolher ação aleatór
 RL_ALPHA = 0.2         # taxa de aprendizado
 RL_GAMMA = 0.9         # fator de desconto futuro
 RL_LAMBDA_COST = 0.5   # peso do custo (campanha + multas) na função de recompensa
+MEDIA_RL_VERBOSE = False  # log RL_UPDATE a cada atualização da tabela Q (os Q_VALUES_FINAL saem sempre)
+MEDIA_POLICY_FILE = ""  # política por partido treinada com rl_train.py; vazio = tabelas Q começam zeradas
 
 
 # --- Ticks de Relatório Jornalístico ---
 REPORT_TICKS = [20, 30, 40, 50]
 
 
+# --- Gráficos (charts.py) ---
+# PNG e histórico JSON vão para CHART_OUTPUT_DIR com o rótulo da execução
+# (CHART_RUN_LABEL, ou data/hora quando vazio), sem sobrescrever execuções anteriores.
+CHART_OUTPUT_DIR = "."
+CHART_RUN_LABEL = ""
+
+
+# --- Instrumentação (tick_timing.py / sim_agent.py) ---
+# Tempos por fase de cada TICK do Supervisor e deriva em relação a TICK_DURATION.
+# Com SUPERVISOR_WEB_PORT definido, a métrica ao vivo fica em http://localhost:<porta>/timing.
+TICK_TIMING_FILE = ""                    # ex.: "tick_timing.json" (vazio = não grava)
+MESSAGE_METRICS_FILE = ""               # ex.: "message_metrics.json": contadores por protocolo e filas (sim_agent.py)
+SUPERVISOR_WEB_PORT = None              # ex.: 10000
+
+# Quando True, toda mensagem passa pelo servidor XMPP, mesmo entre agentes do
+# mesmo processo (o container do SPADE entrega localmente por padrão).
+FORCE_XMPP_ROUTING = False
+
+# Broadcast de TICKs e anúncios do Supervisor (sim_pubsub.py):
+#   "pubsub" publica uma vez num nó XEP-0060 assinado por eleitores, Mídia e
+#   Autoridade (volta a "direct" se o servidor não entregar a sonda);
+#   "direct" envia uma mensagem por destinatário. "pubsub" é opcional: o
+#   pyjabber 0.4.5 não carrega nós criados em execução, então a sonda sempre
+#   falha e a criação/inscrição só atrasa o início.
+BROADCAST_MODE = "direct"
+PUBSUB_SERVICE = f"pubsub.{SERVER}"
+PUBSUB_NODE = "sim_broadcast"
+
+# Trace de mensagens por agente (TraceStore do SPADE, visível na interface web):
+#   "off" | "ring" (últimos TRACE_RING_SIZE) | "sample" (1 a cada TRACE_SAMPLE_EVERY)
+#   | "protocols" (só TRACE_PROTOCOLS). Os contadores de MESSAGE_METRICS_FILE
+#   não dependem da política.
+TRACE_POLICY = "ring"
+TRACE_RING_SIZE = 1000          # mesmo tamanho padrão do SPADE
+TRACE_SAMPLE_EVERY = 100
+TRACE_PROTOCOLS = ("RESULTS", "ELIMINATION", "PUNISH")
+
+# Perfil por behaviour (behaviour_profiler.py): tempo ocupado e alocação por
+# classe de behaviour e por TICK, mais pilhas amostradas para flamegraph.
+PROFILE_BEHAVIOURS = False
+PROFILE_SAMPLE_INTERVAL = 0.005          # s entre amostras de pilha (0 desliga)
+PROFILE_TRACEMALLOC = True               # alocação por behaviour (mais lento)
+PROFILE_FILE = "behaviour_profile.json"
+PROFILE_COLLAPSED_FILE = "behaviour_profile.collapsed"
+
+
+# --- Populações de eleitores (voter_population_agent.py) ---
+# Com VOTER_POPULATION_SIZE > 0, cada VoterPopulationAgent hospeda até esse
+# número de eleitores lógicos atrás de um único JID/conexão XMPP (population_k).
+# 0 = um VoterAgent por cidadão (comportamento original).
+VOTER_POPULATION_SIZE = 0
+POPULATION_VERBOSE = False  # logs por eleitor (campanha, voto) dentro das populações
+# Votos das populações para a Autoridade:
+#   "summary": uma mensagem BALLOT_SUMMARY por população (contagens por escolha + hashes das cédulas);
+#   "individual": um VOTE por eleitor, como os VoterAgents.
+VOTE_AGGREGATION = "summary"
+
+
 # --- Mix manual de NEWS/FAKENEWS na Mídia ---
 # Estes valores são o "core" do experimento.
 # Podem ser alterados livremente (0.0 a 1.0) e não precisam somar 1,
@@ -0,0 +1,370 @@
+# python_spade/election_model.py
+"""
+Regras do modelo eleitoral independentes do SPADE.
+
+Os agentes (VoterAgent, MediaAgent, ElectionAuthorityAgent) e os motores
+sem XMPP (headless_sim.py) usam as mesmas funções, para que uma mudança
+no modelo valha para todos os modos de execução.
+
+Todas as funções aleatórias recebem `rng` (default: módulo `random`), o que
+permite replicações reprodutíveis com `random.Random(seed)`.
+"""
+import hashlib
+import random
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from common import (
+    P_BASE_ABSTAIN,
+    P_BASE_NULL,
+    ENGAGEMENT_ABSTAIN_THRESHOLD,
+    VOTER_OVERLOAD_THRESHOLD,
+    FAKENEWS_BACKFIRE_CREDIBILITY,
+    CANDIDATE_INITIAL_BUDGET,
+    RL_ALPHA,
+    RL_GAMMA,
+    PARTIES,
+    CAMPAIGN_MEMORY_WINDOW,
+)
+
+# Pesos do score de voto
+PESO_IDEO = 0.5
+PESO_CAMP = 0.5
+
+RL_ACTIONS = ("NEWS", "FAKENEWS")
+RL_STATES = ("HIGH", "MID", "LOW")
+
+# Direção numérica de cada viés ideológico da mídia
+MEDIA_SIDE = {
+    "LEFT": -1,
+    "FAR_LEFT": -2,
+    "RIGHT": 1,
+    "FAR_RIGHT": 2,
+    "CENTER": 0,
+}
+
+
+# ----------------- Eleitor -----------------
+class ImpactWindow:
+    """
+    Últimos K impactos de campanha de um candidato num eleitor.
+
+    Buffer circular de tamanho fixo com soma corrente: add() e mean() são
+    O(1) e não alocam, qualquer que seja K.
+    """
+
+    __slots__ = ("buf", "pos", "count", "total")
+
+    def __init__(self, k: int = CAMPAIGN_MEMORY_WINDOW):
+        self.buf = [0.0] * max(1, int(k))
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, impact: float) -> None:
+        if self.count == len(self.buf):
+            self.total -= self.buf[self.pos]
+        else:
+            self.count += 1
+        self.buf[self.pos] = impact
+        self.total += impact
+        self.pos = (self.pos + 1) % len(self.buf)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def values(self) -> List[float]:
+        """Impactos guardados, do mais antigo ao mais recente (para logs)."""
+        if self.count < len(self.buf):
+            return self.buf[:self.count]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def campaign_impact(
+    performative: str,
+    credibility: float,
+    backfire_credibility: float = FAKENEWS_BACKFIRE_CREDIBILITY,
+    rng=random,
+) -> float:
+    """Impacto de uma mensagem de campanha (NEWS/FAKENEWS) num eleitor."""
+    impact = 0.0
+    if performative == "NEWS":
+        impact = rng.uniform(0.05, 0.2) * credibility
+    elif performative == "FAKENEWS":
+        impact = rng.uniform(0.1, 0.3)
+        if credibility > backfire_credibility:
+            impact *= -0.5
+    return impact
+
+
+def influence_ideology(ideology: float, n_ideology: float, n_engagement: float) -> float:
+    """Influência social de um vizinho: 0.9*self + 0.1*(ideologia*engajamento)."""
+    updated = (ideology * 0.9) + (n_ideology * n_engagement) * 0.1
+    return max(-2.0, min(2.0, updated))
+
+
+def effective_engagement(
+    engagement: float,
+    msg_count: int,
+    overload_threshold: int = VOTER_OVERLOAD_THRESHOLD,
+) -> float:
+    """Engagement descontado da fadiga política (TAREFA 2)."""
+    overload_factor = max(0, msg_count - overload_threshold)
+    fatigue_penalty = min(0.40, 0.02 * overload_factor)
+    return max(0.0, engagement - fatigue_penalty)
+
+
+def abstain_probability(
+    eng: float,
+    p_base: float = P_BASE_ABSTAIN,
+    threshold: float = ENGAGEMENT_ABSTAIN_THRESHOLD,
+) -> float:
+    """Probabilidade de abstenção dado o engagement efetivo (TAREFA 3.1)."""
+    p_abstain = p_base
+    if eng < threshold:
+        p_abstain += 0.4  # sobe bastante a chance de abster-se
+    return p_abstain
+
+
+def decide_vote(
+    engagement: float,
+    msg_count: int,
+    memory: Dict[str, ImpactWindow],
+    candidates_short: List[str],
+    is_candidate: bool,
+    me_short: str,
+    p_base_abstain: float = P_BASE_ABSTAIN,
+    p_base_null: float = P_BASE_NULL,
+    abstain_threshold: float = ENGAGEMENT_ABSTAIN_THRESHOLD,
+    overload_threshold: int = VOTER_OVERLOAD_THRESHOLD,
+    rng=random,
+) -> Dict[str, object]:
+    """
+    Decisão de voto de um eleitor (fadiga, abstenção, scores e nulo).
+
+    Retorna um dict com:
+      - "choice": JID curto do candidato, "NULO" ou None (abstenção);
+      - "effective_engagement", "p_abstain" e "max_score" para logs.
+    """
+    eng = effective_engagement(engagement, msg_count, overload_threshold)
+    p_abstain = abstain_probability(eng, p_base_abstain, abstain_threshold)
+
+    decision: Dict[str, object] = {
+        "choice": None,
+        "effective_engagement": eng,
+        "p_abstain": p_abstain,
+        "max_score": 0.0,
+    }
+
+    if rng.random() < p_abstain:
+        return decision
+
+    # Scores: base ideológica + média da memória de campanha
+    vote_scores: Dict[str, float] = {}
+    for short_jid in candidates_short:
+        vote_scores[short_jid] = PESO_IDEO * rng.uniform(0.1, 0.3) * eng
+
+    for cand_short, impactos in memory.items():
+        if cand_short in vote_scores:
+            vote_scores[cand_short] += PESO_CAMP * impactos.mean()
+
+    if not vote_scores:
+        chosen = "NULO"
+        max_score = 0.0
+    else:
+        chosen = max(vote_scores, key=vote_scores.get)
+        max_score = vote_scores.get(chosen, 0.0)
+
+    # Voto nulo probabilístico
+    p_null = p_base_null + (0.25 if max_score < 0.05 else 0.0)
+    if rng.random() < p_null:
+        chosen = "NULO"
+
+    # Candidato vota em si mesmo (prioridade máxima)
+    if is_candidate:
+        chosen = me_short if rng.random() < 0.99 else "NULO"
+
+    decision["choice"] = chosen
+    decision["max_score"] = max_score
+    return decision
+
+
+# ----------------- Mídia -----------------
+def ideological_weight(party: str, bias: str, strength: float) -> float:
+    """Peso ideológico da Mídia sobre o partido do candidato (TAREFA 6)."""
+    bias = bias.upper()
+    if bias == "NEUTRAL" or strength <= 0.0:
+        return 1.0
+
+    party_ideology = PARTIES.get(party, {}).get("ideology", 0)
+    sign_match = MEDIA_SIDE.get(bias, 0) * party_ideology
+    if sign_match > 0:
+        return 1.0 + strength  # favorece
+    elif sign_match < 0:
+        return 1.0 - strength  # prejudica
+    return 1.0
+
+
+def budget_state(budget: float, initial_budget: float = CANDIDATE_INITIAL_BUDGET) -> str:
+    """Mapeia o orçamento restante para um estado discreto (HIGH, MID, LOW)."""
+    ratio = budget / float(initial_budget)
+    if ratio >= 0.7:
+        return "HIGH"
+    elif ratio >= 0.3:
+        return "MID"
+    return "LOW"
+
+
+def manual_performative(news_ratio: float, fake_ratio: float, rng=random) -> str:
+    """Sorteia NEWS/FAKENEWS segundo o mix manual (normalizado)."""
+    total_ratio = max(news_ratio + fake_ratio, 0.0)
+    if total_ratio <= 0.0:
+        return "NEWS"
+    threshold = news_ratio / total_ratio
+    return "NEWS" if rng.random() < threshold else "FAKENEWS"
+
+
+def viral_probability(performative: str, base_prob: float) -> float:
+    """FAKENEWS viraliza mais (x1.5) e NEWS menos (x0.7) (TAREFA 5)."""
+    return base_prob * (1.5 if performative == "FAKENEWS" else 0.7)
+
+
+def campaign_reward(
+    n_targets: int,
+    n_voters: int,
+    total_cost: float,
+    lambda_cost: float,
+    initial_budget: float = CANDIDATE_INITIAL_BUDGET,
+) -> float:
+    """Recompensa RL: cobertura menos custo normalizado."""
+    coverage = n_targets / float(n_voters or 1)
+    cost_norm = total_cost / float(initial_budget)
+    return coverage - lambda_cost * cost_norm
+
+
+def empty_q_table() -> Dict[str, Dict[str, float]]:
+    """Tabela Q de um candidato: estado de orçamento -> ação -> valor."""
+    return {s: {a: 0.0 for a in RL_ACTIONS} for s in RL_STATES}
+
+
+def select_action(q_state: Dict[str, float], epsilon: float, rng=random) -> str:
+    """Política ε-greedy entre NEWS e FAKENEWS."""
+    if rng.random() < epsilon:
+        return rng.choice(list(RL_ACTIONS))
+    return "NEWS" if q_state["NEWS"] >= q_state["FAKENEWS"] else "FAKENEWS"
+
+
+def bellman_update(
+    q_s_a: float,
+    reward: float,
+    max_next: float,
+    alpha: float = RL_ALPHA,
+    gamma: float = RL_GAMMA,
+) -> float:
+    """Equação de Bellman (Q-Learning)."""
+    return q_s_a + alpha * (reward + gamma * max_next - q_s_a)
+
+
+def punishment_factor(party: str) -> Optional[float]:
+    """
+    Reação partidária após punição de FAKENEWS (TAREFA 3.4).
+    Moderados reduzem o Q-value pela metade; extremos só 10%.
+    """
+    if party in {"PDD", "PDE", "PCE"}:
+        return 0.5
+    if party in {"PED", "PEE"}:
+        return 0.9
+    return None
+
+
+# ----------------- Contagem -----------------
+def ballot_hash(voter_jid: str, choice: str) -> str:
+    """Hash curto de uma cédula (eleitor + escolha), para auditar votos agregados."""
+    return hashlib.sha256(f"{voter_jid}|{choice}".encode("utf-8")).hexdigest()[:16]
+
+
+def ballots_digest(hashes: Sequence[str]) -> str:
+    """Digest de um lote de hashes de cédulas (na ordem dada)."""
+    return hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()
+
+
+def summarize_ballots(ballots: Sequence[Tuple[str, str]]) -> Dict[str, object]:
+    """
+    Resumo de um lote de cédulas (voter_jid, escolha) para uma única mensagem:
+    contagem por escolha (JID do candidato ou "NULO"), hashes ordenados das
+    cédulas e o digest deles.
+    """
+    hashes = sorted(ballot_hash(v, c) for v, c in ballots)
+    return {
+        "counts": dict(Counter(c for _, c in ballots)),
+        "hashes": hashes,
+        "digest": ballots_digest(hashes),
+    }
+
+
+def check_ballot_summary(summary: Dict[str, object]) -> Optional[str]:
+    """None se o resumo é consistente; senão, o motivo da rejeição."""
+    counts, hashes = summary.get("counts"), summary.get("hashes")
+    if not isinstance(counts, dict) or not isinstance(hashes, list):
+        return "campos counts/hashes ausentes"
+    if any(not isinstance(n, int) or n < 0 for n in counts.values()):
+        return "contagem inválida"
+    if sum(counts.values()) != len(hashes):
+        return f"{sum(counts.values())} votos para {len(hashes)} hashes"
+    if len(set(hashes)) != len(hashes):
+        return "hashes de cédula repetidos"
+    if ballots_digest(hashes) != summary.get("digest"):
+        return "digest não confere"
+    return None
+
+
+def district_bounds(n_citizens: int, n_districts: int) -> List[Tuple[int, int]]:
+    """
+    Distritos como blocos contíguos [início, fim) de eleitores. Na rede
+    small-world os vizinhos têm índices próximos, então cada distrito
+    fica com uma vizinhança da rede.
+    """
+    n_districts = max(1, min(int(n_districts), n_citizens))
+    base, extra = divmod(n_citizens, n_districts)
+    bounds, start = [], 0
+    for d in range(n_districts):
+        end = start + base + (1 if d < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def apportion_seats(n_seats: int, electorates: Sequence[int]) -> List[int]:
+    """Cadeiras por distrito proporcionais ao eleitorado (maiores restos), ao menos 1 por distrito."""
+    if n_seats < len(electorates):
+        raise ValueError(f"{n_seats} cadeiras para {len(electorates)} distritos")
+    seats = [1] * len(electorates)
+    remaining = n_seats - len(electorates)
+    total = float(sum(electorates)) or 1.0
+    quotas = [remaining * e / total for e in electorates]
+    for d, q in enumerate(quotas):
+        seats[d] += int(q)
+    left = n_seats - sum(seats)
+    for d in sorted(range(len(quotas)), key=lambda d: quotas[d] - int(quotas[d]), reverse=True)[:left]:
+        seats[d] += 1
+    return seats
+
+
+def dhondt_allocation(votes_per_party: Dict[str, int], n_seats: int) -> Dict[str, int]:
+    """Implementa o método D'Hondt para distribuição de cadeiras."""
+    seats = {p: 0 for p in votes_per_party.keys()}
+    quotients = []
+
+    for party, v in votes_per_party.items():
+        for k in range(1, n_seats + 1):
+            quotients.append((v / k, party))
+
+    quotients.sort(reverse=True, key=lambda t: t[0])
+
+    for _, party in quotients[:n_seats]:
+        seats[party] += 1
+
+    return seats
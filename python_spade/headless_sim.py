@@ -0,0 +1,358 @@
+# python_spade/headless_sim.py
+"""
+Motor HEADLESS da simulação eleitoral (sem SPADE/XMPP).
+
+Reproduz o ciclo T0..T51 do run_spade_sim.py num único processo síncrono:
+  - T0..T10: influência social entre vizinhos (Watts-Strogatz);
+  - T10: promoção dos N eleitores mais engajados a candidatos;
+  - T11..T50: um passo do Broadcaster da Mídia por TICK (round-robin);
+  - T51: votação e contagem D'Hondt pela Autoridade.
+
+As regras vêm de election_model.py (as mesmas usadas pelos agentes). O
+resultado tem o mesmo formato do payload PROTOCOL_RESULTS da Authority,
+acrescido de estatísticas da Mídia. Usado pelo sweep_runner.py para
+replicações Monte Carlo.
+"""
+import random
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import common as cfg
+from common import generate_jid, get_sender_name
+import election_model as model
+
+# Chaves de common.py que podem ser sobrescritas por cenário / replicação
+PARAM_KEYS = [
+    "TOTAL_TICKS",
+    "N_CITIZENS",
+    "N_CANDIDATES_TO_PROMOTE",
+    "N_SEATS",
+    "P_BASE_ABSTAIN",
+    "P_BASE_NULL",
+    "ENGAGEMENT_ABSTAIN_THRESHOLD",
+    "VOTER_OVERLOAD_THRESHOLD",
+    "FAKENEWS_BACKFIRE_CREDIBILITY",
+    "CAMPAIGN_MEMORY_WINDOW",
+    "INFLUENCE_FAST_FORWARD",
+    "MEDIA_IDEOLOGY_BIAS",
+    "MEDIA_BIAS_STRENGTH",
+    "VIRAL_BASE_PROB",
+    "VIRAL_MAX_EXTRA_TARGETS",
+    "CANDIDATE_INITIAL_BUDGET",
+    "COST_NEWS_PER_TARGET",
+    "COST_FAKENEWS_PER_TARGET",
+    "PENALTY_PER_FAKENEWS",
+    "P_DETECT_BASE",
+    "RL_EPSILON",
+    "RL_ALPHA",
+    "RL_GAMMA",
+    "RL_LAMBDA_COST",
+    "NEWS_RATIO",
+    "FAKE_RATIO",
+    "MEDIA_USE_MANUAL_RATIOS",
+    "MEDIA_CAMPAIGN_MODE",
+    "PARTY_PERCENTAGES",
+]
+
+# Probabilidade de um eleitor consultar um vizinho a cada TICK (T0..T10)
+P_SOCIAL_QUERY = 0.2
+# Punições detectadas até a eliminação do candidato
+PUNISHMENTS_TO_ELIMINATE = 3
+
+
+def default_params() -> Dict[str, Any]:
+    """Parâmetros atuais de common.py (snapshot)."""
+    params = {key: getattr(cfg, key) for key in PARAM_KEYS}
+    params["PARTY_PERCENTAGES"] = dict(cfg.PARTY_PERCENTAGES)
+    return params
+
+
+def build_params(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Aplica overrides sobre os parâmetros de common.py."""
+    params = default_params()
+    for key, value in (overrides or {}).items():
+        if key not in params:
+            raise KeyError(f"Parâmetro desconhecido: {key}")
+        params[key] = value
+    return params
+
+
+def party_counts_for(n_citizens: int, percentages: Dict[str, float]) -> Dict[str, int]:
+    """Eleitores por partido (mesma regra de compute_party_counts)."""
+    base_counts = {p: int(percentages.get(p, 0.0) * n_citizens) for p in cfg.ALL_PARTIES}
+    remaining = n_citizens - sum(base_counts.values())
+    while remaining > 0:
+        for p in cfg.ALL_PARTIES:
+            if remaining <= 0:
+                break
+            base_counts[p] += 1
+            remaining -= 1
+    return base_counts
+
+
+def party_list_for(n_citizens: int, percentages: Dict[str, float]) -> List[str]:
+    """Lista determinística de partidos (mesma regra de compute_party_counts)."""
+    parties: List[str] = []
+    for code, count in party_counts_for(n_citizens, percentages).items():
+        parties.extend([code] * count)
+    if len(parties) < n_citizens:
+        parties.extend(["SPD"] * (n_citizens - len(parties)))
+    return parties[:n_citizens]
+
+
+class HeadlessElection:
+    """
+    Uma replicação da eleição. O estado dos eleitores fica em listas
+    paralelas indexadas por 0..N-1 (eleitor i == voter_{i+1}).
+    """
+
+    def __init__(self, params: Dict[str, Any], seed: Any = None):
+        self.p = params
+        self.rng = random.Random(seed)
+        self.n = int(params["N_CITIZENS"])
+
+        rng = self.rng
+        self.jids = [generate_jid(cfg.VOTER_PREFIX, i) for i in range(1, self.n + 1)]
+        self.shorts = [get_sender_name(j) for j in self.jids]
+        self.party = party_list_for(self.n, params["PARTY_PERCENTAGES"])
+        self.ideology = [float(cfg.PARTIES.get(p, {}).get("ideology", 0)) for p in self.party]
+        self.engagement = [rng.random() for _ in range(self.n)]
+        self.credibility = [rng.uniform(0.5, 0.9) for _ in range(self.n)]
+        self.msg_count = [0] * self.n
+        self.memory: List[Dict[str, model.ImpactWindow]] = [{} for _ in range(self.n)]
+        self.memory_window = int(params["CAMPAIGN_MEMORY_WINDOW"])
+        self.is_candidate = [False] * self.n
+
+        self.neighbours = self._build_network()
+
+        # Mídia / Authority
+        self.candidates: List[int] = []
+        self.budgets: Dict[int, float] = {}
+        self.q_values: Dict[int, Dict[str, Dict[str, float]]] = {}
+        self.punishments: Dict[int, int] = {}
+        self.eliminated: set = set()
+        self.cand_idx = 0
+        self.news_sent = 0
+        self.fakenews_sent = 0
+        self.history: List[Dict[str, int]] = []
+
+    def _build_network(self) -> List[List[int]]:
+        """Rede small-world igual à de run_spade_sim.build_social_network."""
+        if self.n < 2:
+            return [[] for _ in range(self.n)]
+        import networkx as nx  # import tardio: o motor vetorizado não precisa dele
+
+        k = max(1, min(4, self.n - 1))
+        graph = nx.watts_strogatz_graph(self.n, k, 0.3, seed=self.rng)
+        return [list(graph.neighbors(i)) for i in range(self.n)]
+
+    # ---------------- Fases ----------------
+    def _influence_tick(self):
+        rng = self.rng
+        for i in range(self.n):
+            if self.neighbours[i] and rng.random() < P_SOCIAL_QUERY:
+                j = rng.choice(self.neighbours[i])
+                self.ideology[i] = model.influence_ideology(
+                    self.ideology[i], self.ideology[j], self.engagement[j]
+                )
+
+    def _fast_forward_influence(self) -> int:
+        """Troca as rodadas T0..T9 pelo avanço rápido; devolve o TICK em que o ciclo continua."""
+        import influence_fastforward as ff  # import tardio (NumPy)
+
+        self.ideology = ff.fast_forward(
+            self.ideology, self.engagement, self.neighbours, self.p["INFLUENCE_FAST_FORWARD"],
+            seed=self.rng.getrandbits(32),
+        )
+        return ff.FAST_FORWARD_ROUNDS
+
+    def _promote_candidates(self):
+        ordered = sorted(range(self.n), key=lambda i: self.engagement[i], reverse=True)
+        self.candidates = ordered[: int(self.p["N_CANDIDATES_TO_PROMOTE"])]
+        for c in self.candidates:
+            self.is_candidate[c] = True
+            self.budgets[c] = float(self.p["CANDIDATE_INITIAL_BUDGET"])
+            self.q_values[c] = model.empty_q_table()
+            self.punishments[c] = 0
+
+    def _next_active_candidate(self) -> Optional[int]:
+        """Round-robin do Broadcaster, pulando candidatos eliminados."""
+        for _ in range(len(self.candidates)):
+            cand = self.candidates[self.cand_idx % len(self.candidates)]
+            self.cand_idx += 1
+            if cand not in self.eliminated:
+                return cand
+        return None
+
+    def _active_candidates(self) -> List[int]:
+        """Candidatos não eliminados no início do TICK (planejador do modo "tick")."""
+        return [c for c in self.candidates if c not in self.eliminated]
+
+    def _campaign_step(self, tick: int, cand: Optional[int] = None):
+        p, rng = self.p, self.rng
+        if cand is None:
+            cand = self._next_active_candidate()
+        if cand is None:
+            return
+
+        state = model.budget_state(self.budgets[cand], p["CANDIDATE_INITIAL_BUDGET"])
+        if p["MEDIA_USE_MANUAL_RATIOS"]:
+            perf = model.manual_performative(p["NEWS_RATIO"], p["FAKE_RATIO"], rng)
+        else:
+            perf = model.select_action(self.q_values[cand][state], p["RL_EPSILON"], rng)
+
+        if perf == "NEWS":
+            cost_per_target, fine = p["COST_NEWS_PER_TARGET"], 0
+        else:
+            cost_per_target, fine = p["COST_FAKENEWS_PER_TARGET"], p["PENALTY_PER_FAKENEWS"]
+
+        base_targets = max(1, int(0.4 * self.n))
+        targets = rng.sample(range(self.n), base_targets)
+        if rng.random() < model.viral_probability(perf, p["VIRAL_BASE_PROB"]):
+            chosen = set(targets)
+            remaining = [v for v in range(self.n) if v not in chosen]
+            if remaining:
+                k_extra = min(int(p["VIRAL_MAX_EXTRA_TARGETS"]), len(remaining))
+                targets.extend(rng.sample(remaining, k_extra))
+
+        total_cost = len(targets) * cost_per_target
+        self.budgets[cand] -= total_cost + fine
+        punished_for_rl = perf == "FAKENEWS" and rng.random() < p["P_DETECT_BASE"]
+
+        # Entrega aos eleitores
+        cand_short = self.shorts[cand]
+        backfire = p["FAKENEWS_BACKFIRE_CREDIBILITY"]
+        for v in targets:
+            if self.is_candidate[v]:
+                continue
+            self.msg_count[v] += 1
+            impact = model.campaign_impact(perf, self.credibility[v], backfire, rng)
+            mem = self.memory[v].get(cand_short)
+            if mem is None:
+                mem = self.memory[v][cand_short] = model.ImpactWindow(self.memory_window)
+            mem.add(impact)
+
+        # Denúncia à Authority (detecção probabilística independente). A multa
+        # da Authority sai do caixa dela, não do da Mídia (como no MediaAgent).
+        if perf == "FAKENEWS" and rng.random() < p["P_DETECT_BASE"]:
+            self.punishments[cand] += 1
+            if self.punishments[cand] >= PUNISHMENTS_TO_ELIMINATE:
+                self.eliminated.add(cand)
+
+        if not p["MEDIA_USE_MANUAL_RATIOS"]:
+            self._update_q(cand, state, perf, total_cost + fine, len(targets), punished_for_rl)
+
+        if perf == "NEWS":
+            self.news_sent += len(targets)
+        else:
+            self.fakenews_sent += len(targets)
+        self.history.append(
+            {"tick": tick, "news": self.news_sent, "fake": self.fakenews_sent}
+        )
+
+    def _update_q(self, cand: int, state: str, action: str, cost: float, n_targets: int, punished: bool):
+        p = self.p
+        reward = model.campaign_reward(
+            n_targets, self.n, cost, p["RL_LAMBDA_COST"], p["CANDIDATE_INITIAL_BUDGET"]
+        )
+        reward *= model.ideological_weight(
+            self.party[cand], p["MEDIA_IDEOLOGY_BIAS"], p["MEDIA_BIAS_STRENGTH"]
+        )
+        next_state = model.budget_state(self.budgets[cand], p["CANDIDATE_INITIAL_BUDGET"])
+        q = self.q_values[cand]
+        updated = model.bellman_update(
+            q[state][action], reward, max(q[next_state].values()), p["RL_ALPHA"], p["RL_GAMMA"]
+        )
+        if punished and action == "FAKENEWS":
+            factor = model.punishment_factor(self.party[cand])
+            if factor is not None:
+                updated *= factor
+        q[state][action] = updated
+
+    def _vote_and_count(self) -> Dict[str, Any]:
+        p, rng = self.p, self.rng
+        cand_shorts = [self.shorts[c] for c in self.candidates]
+        votes: List[str] = []
+        for i in range(self.n):
+            decision = model.decide_vote(
+                self.engagement[i],
+                self.msg_count[i],
+                self.memory[i],
+                cand_shorts,
+                self.is_candidate[i],
+                self.shorts[i],
+                p_base_abstain=p["P_BASE_ABSTAIN"],
+                p_base_null=p["P_BASE_NULL"],
+                abstain_threshold=p["ENGAGEMENT_ABSTAIN_THRESHOLD"],
+                overload_threshold=p["VOTER_OVERLOAD_THRESHOLD"],
+                rng=rng,
+            )
+            choice = decision["choice"]
+            if choice is None:
+                continue
+            votes.append(choice if choice == "NULO" else f"{choice}@{cfg.SERVER}")
+
+        counts = Counter(votes)
+        cand_jids = [self.jids[c] for c in self.candidates]
+        final_counts = {j: counts.get(j, 0) for j in cand_jids}
+        if counts.get("NULO"):
+            final_counts["NULO"] = counts["NULO"]
+
+        party_votes: Dict[str, int] = defaultdict(int)
+        for c in self.candidates:
+            party_votes[self.party[c]] += final_counts[self.jids[c]]
+
+        seats = model.dhondt_allocation(party_votes, int(p["N_SEATS"]))
+        return {
+            "by_candidate": final_counts,
+            "by_party": dict(party_votes),
+            "seats_dhondt": seats,
+            "total_votes_received": len(votes),
+            "total_citizens": self.n,
+            "abstentions": max(0, self.n - len(votes)),
+            "null_votes": final_counts.get("NULO", 0),
+            "news_sent": self.news_sent,
+            "fakenews_sent": self.fakenews_sent,
+            "eliminated": sorted(self.jids[c] for c in self.eliminated),
+        }
+
+    # ---------------- Execução ----------------
+    def step(self, t: int) -> Optional[Dict[str, Any]]:
+        """Executa o TICK t; devolve os resultados no último TICK."""
+        if t <= 10:
+            self._influence_tick()
+        if t == 10:
+            self._promote_candidates()
+        if 10 < t <= 50 and self.candidates:
+            if self.p["MEDIA_CAMPAIGN_MODE"] == "tick":
+                for cand in self._active_candidates():
+                    self._campaign_step(t, cand)
+            else:
+                self._campaign_step(t)
+        if t == int(self.p["TOTAL_TICKS"]):
+            return self._vote_and_count()
+        return None
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        start = 0
+        if self.p["INFLUENCE_FAST_FORWARD"] != "off":
+            start = self._fast_forward_influence()
+        for t in range(start, int(self.p["TOTAL_TICKS"]) + 1):
+            out = self.step(t)
+            if out is not None:
+                results = out
+        return results
+
+
+def simulate(overrides: Optional[Dict[str, Any]] = None, seed: Any = None) -> Dict[str, Any]:
+    """Executa uma replicação headless e devolve o payload de resultados."""
+    return HeadlessElection(build_params(overrides), seed).run()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    seed_arg = sys.argv[1] if len(sys.argv) > 1 else None
+    print(json.dumps(simulate(seed=seed_arg), indent=2))
@@ -0,0 +1,103 @@
+# python_spade/import_profile.py
+"""
+Relatório de tempo de import (python -X importtime) por pacote.
+
+Cada módulo é importado num interpretador novo, para medir o custo real
+de arranque (o mesmo que cada worker de um pool paga). O tempo "self" de
+cada submódulo é somado no pacote de topo (spade, pyjabber, networkx, ...).
+
+Uso:
+    python import_profile.py run_spade_sim headless_sim vectorized_sim --top 10
+    python import_profile.py vectorized_sim --forbid networkx matplotlib spade
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MODULES = ["run_spade_sim", "headless_sim", "vectorized_sim", "sweep_runner", "charts"]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Converte as linhas 'import time: self | cumulative | módulo' em registros (µs)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # cabeçalho
+        name = parts[2].rstrip()
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+        })
+    return rows
+
+
+def profile_module(module: str) -> Dict[str, Any]:
+    """Importa `module` num subprocesso e agrega o tempo por pacote de topo."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    rows = parse_importtime(proc.stderr)
+    by_package = Counter()
+    for r in rows:
+        by_package[r["module"].split(".")[0]] += r["self_us"]
+    top = [r for r in rows if r["module"] == module]
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "total_us": top[-1]["cumulative_us"] if top else sum(by_package.values()),
+        "n_modules": len(rows),
+        "packages": dict(by_package.most_common()),
+    }
+
+
+def print_report(report: Dict[str, Any], top: int):
+    status = "" if report["ok"] else "  (ERRO NO IMPORT)"
+    print(
+        f"\n[IMPORT] {report['module']}: {report['total_us'] / 1000:.0f} ms, "
+        f"{report['n_modules']} módulos{status}"
+    )
+    for pkg, us in list(report["packages"].items())[:top]:
+        print(f"    {pkg:<20} {us / 1000:8.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de import por pacote (python -X importtime).")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Pacotes listados por módulo")
+    parser.add_argument(
+        "--forbid", nargs="*", default=[],
+        help="Pacotes que NÃO podem ser carregados (sai com código 1 se forem)",
+    )
+    parser.add_argument("--out", default=None, help="Grava o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    reports = [profile_module(m) for m in args.modules]
+    failed = False
+    for report in reports:
+        print_report(report, args.top)
+        leaked = [pkg for pkg in args.forbid if pkg in report["packages"]]
+        if leaked:
+            failed = True
+            print(f"    [IMPORT][ERRO] {report['module']} carrega pacotes proibidos: {leaked}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(reports, fh, indent=2)
+        print(f"\n[IMPORT] Relatório salvo em: {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# python_spade/influence_fastforward.py
+"""
+Avanço rápido da fase de influência social (T0..T9).
+
+Em cada TICK da pré-campanha, o eleitor i consulta com prob. p um vizinho j
+sorteado e faz x_i <- 0.9*x_i + 0.1*e_j*x_j (election_model.influence_ideology;
+como |e_j*x_j| <= 2, o corte em [-2, 2] nunca atua). Em esperança é um
+processo linear:
+
+    E[x'] = M x,   M = (1 - 0.1p) I + 0.1p D^-1 A E
+
+(A = adjacência, D = graus, E = diag(engagement); eleitor sem vizinhos fica
+parado). Depois de k rodadas, E[x_k] = M^k x_0, calculado como k produtos
+matriz-vetor esparsos sobre a lista de arestas, O(k·|arestas|).
+
+Modos (INFLUENCE_FAST_FORWARD em common.py):
+  - "off":      rodadas reais, TICK a TICK (agentes / headless_sim);
+  - "expected": estado esperado M^k x_0 (determinístico);
+  - "sampled":  sorteia as k rodadas de uma vez com NumPy (mesma lei das
+                rodadas reais, com atualização síncrona em cada rodada).
+
+Com o avanço ligado, o Supervisor começa em T10 e o headless_sim pula as
+rodadas T0..T9; a rodada de T10 e a promoção continuam normais.
+
+Validação contra o modo por agentes (média de várias execuções de
+headless_sim._influence_tick):
+    python influence_fastforward.py --n 2000 --reps 200
+"""
+import argparse
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from headless_sim import P_SOCIAL_QUERY
+
+MODES = ("off", "expected", "sampled")
+# Rodadas substituídas pelo avanço: T0..T9 (T10 roda normalmente)
+FAST_FORWARD_ROUNDS = 10
+# Pesos de influence_ideology
+SELF_WEIGHT = 0.9
+NEIGHBOUR_WEIGHT = 0.1
+
+
+def edge_arrays(neighbours: Sequence[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lista de adjacência -> (offsets CSR, destinos, graus)."""
+    deg = np.fromiter((len(nb) for nb in neighbours), dtype=np.int64, count=len(neighbours))
+    offsets = np.zeros(len(neighbours) + 1, dtype=np.int64)
+    np.cumsum(deg, out=offsets[1:])
+    dst = np.fromiter((j for nb in neighbours for j in nb), dtype=np.int64, count=int(offsets[-1]))
+    return offsets, dst, deg
+
+
+def expected_ideology(
+    ideology: Sequence[float],
+    engagement: Sequence[float],
+    neighbours: Sequence[Sequence[int]],
+    rounds: int = FAST_FORWARD_ROUNDS,
+    p: float = P_SOCIAL_QUERY,
+) -> np.ndarray:
+    """E[x_k] = M^k x_0 por k produtos esparsos."""
+    x = np.asarray(ideology, dtype=float).copy()
+    e = np.asarray(engagement, dtype=float)
+    offsets, dst, deg = edge_arrays(neighbours)
+    src = np.repeat(np.arange(len(x)), deg)
+    has = deg > 0
+    inv_deg = np.where(has, 1.0 / np.maximum(deg, 1), 0.0)
+    stay = np.where(has, 1.0 - NEIGHBOUR_WEIGHT * p, 1.0)
+    for _ in range(rounds):
+        pulled = np.bincount(src, weights=(e * x)[dst], minlength=len(x)) * inv_deg
+        x = stay * x + NEIGHBOUR_WEIGHT * p * pulled
+    return x
+
+
+def sampled_ideology(
+    ideology: Sequence[float],
+    engagement: Sequence[float],
+    neighbours: Sequence[Sequence[int]],
+    rounds: int = FAST_FORWARD_ROUNDS,
+    p: float = P_SOCIAL_QUERY,
+    seed=None,
+) -> np.ndarray:
+    """Sorteia as k rodadas (quem consulta, qual vizinho) com atualização síncrona."""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(ideology, dtype=float).copy()
+    e = np.asarray(engagement, dtype=float)
+    offsets, dst, deg = edge_arrays(neighbours)
+    has = deg > 0
+    for _ in range(rounds):
+        asks = has & (rng.random(len(x)) < p)
+        pick = offsets[:-1] + (rng.random(len(x)) * np.maximum(deg, 1)).astype(np.int64)
+        j = dst[np.minimum(pick, len(dst) - 1)] if len(dst) else np.zeros(len(x), dtype=np.int64)
+        updated = np.clip(SELF_WEIGHT * x + NEIGHBOUR_WEIGHT * e[j] * x[j], -2.0, 2.0)
+        x = np.where(asks, updated, x)
+    return x
+
+
+def fast_forward(
+    ideology: Sequence[float],
+    engagement: Sequence[float],
+    neighbours: Sequence[Sequence[int]],
+    mode: str,
+    rounds: int = FAST_FORWARD_ROUNDS,
+    seed=None,
+) -> List[float]:
+    """Ideologias após `rounds` rodadas no modo dado ("expected" | "sampled")."""
+    if mode == "expected":
+        x = expected_ideology(ideology, engagement, neighbours, rounds)
+    elif mode == "sampled":
+        x = sampled_ideology(ideology, engagement, neighbours, rounds, seed=seed)
+    else:
+        raise ValueError(f"INFLUENCE_FAST_FORWARD inválido: {mode!r} (use {', '.join(MODES)})")
+    return x.tolist()
+
+
+# ==========================
+# CLI: validação contra as rodadas reais
+# ==========================
+def main(argv: Optional[List[str]] = None):
+    import random
+
+    import headless_sim
+
+    parser = argparse.ArgumentParser(description="Compara o avanço rápido com as rodadas reais de influência.")
+    parser.add_argument("--n", type=int, default=2000, help="Número de eleitores")
+    parser.add_argument("--rounds", type=int, default=FAST_FORWARD_ROUNDS)
+    parser.add_argument("--reps", type=int, default=100, help="Execuções do modo por agentes para a média")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    election = headless_sim.HeadlessElection(headless_sim.build_params({"N_CITIZENS": args.n}), args.seed)
+    x0 = list(election.ideology)
+
+    t0 = time.perf_counter()
+    runs = np.zeros((args.reps, args.n))
+    for r in range(args.reps):
+        election.ideology = list(x0)
+        election.rng = random.Random(f"{args.seed}-{r}")
+        for _ in range(args.rounds):
+            election._influence_tick()
+        runs[r] = election.ideology
+    t_agents = (time.perf_counter() - t0) / args.reps
+    reference = runs.mean(axis=0)
+
+    t0 = time.perf_counter()
+    expected = expected_ideology(x0, election.engagement, election.neighbours, args.rounds)
+    t_expected = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    sampled = np.array([
+        sampled_ideology(x0, election.engagement, election.neighbours, args.rounds, seed=(args.seed, r))
+        for r in range(args.reps)
+    ])
+    t_sampled = (time.perf_counter() - t0) / args.reps
+
+    drift = np.abs(reference - np.asarray(x0)).mean()
+    print(f"[FASTFWD] N={args.n} rodadas={args.rounds} execuções={args.reps}")
+    print(f"[FASTFWD] deslocamento médio |x_k - x_0| (agentes): {drift:.5f}")
+    print(f"[FASTFWD] expected: erro médio vs média dos agentes = {np.abs(expected - reference).mean():.5f} "
+          f"({t_expected * 1000:.2f}ms)")
+    print(f"[FASTFWD] sampled:  erro médio da média vs agentes  = {np.abs(sampled.mean(axis=0) - reference).mean():.5f} "
+          f"({t_sampled * 1000:.2f}ms por execução)")
+    print(f"[FASTFWD] agentes (headless, sequencial): {t_agents * 1000:.2f}ms por execução")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 # python_spade/media_agent.py
 import asyncio, random
-import spade
+import numpy as np
 import json
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
 from spade.template import Template
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from common import (
     PROTOCOL_CAMPAIGN,
@@ -18,12 +18,12 @@ from common import (
     COST_NEWS_PER_TARGET,
     COST_FAKENEWS_PER_TARGET,
     PENALTY_PER_FAKENEWS,
+    P_DETECT_BASE,  # 0.7 em todos os cenários, exceto C3 = 0.95
     # CONSTANTES DE REINFORCEMENT LEARNING (RL)
     RL_EPSILON,
     RL_ALPHA,
     RL_GAMMA,
     RL_LAMBDA_COST,
-    PARTIES,  # Necessário para a Lógica Partidária
     # Constantes de Relatório e Viral
     REPORT_TICKS,
     VIRAL_BASE_PROB,
@@ -37,20 +37,30 @@ from common import (
     NEWS_RATIO,
     FAKE_RATIO,
     MEDIA_USE_MANUAL_RATIOS,
+    MEDIA_RL_VERBOSE,
+    MEDIA_POLICY_FILE,
+    MEDIA_TARGETING,
+    MEDIA_CAMPAIGN_MODE,
+    PROTOCOL_CAMPAIGN_BATCH,
+)
+from sim_agent import SimAgent, VoterDirectory
+from audience import AudienceIndex
+from q_table import QTable
+from voter_agent import encode_pitches
+from rl_train import BUDGET_MODEL, load_policy
+
+from election_model import (
+    ideological_weight,
+    budget_state,
+    manual_performative,
+    viral_probability,
+    campaign_reward,
+    punishment_factor,
 )
 
-# Tentativa de importação de P_DETECT_BASE do common
-try:
-    from common import P_DETECT_BASE
-except ImportError:
-    P_DETECT_BASE = 0.7 # 0.7 em todos os cenários, exceto C3 = 0.95
-
-# Matplotlib para gráfico automático (opcional)
-try:
-    import matplotlib.pyplot as plt
-    HAS_MATPLOTLIB = True
-except ImportError:
-    HAS_MATPLOTLIB = False
+# Gráfico automático (opcional): renderizado fora do event loop por charts.py
+import charts
+HAS_MATPLOTLIB = charts.matplotlib_available()
 
 # ANSI Colors
 ANSI_RESET = "\033[0m"
@@ -63,10 +73,13 @@ PROTOCOL_MEDIA_REPORT = "MEDIA_REPORT"
 PROTOCOL_ELIMINATION = "ELIMINATION"  # Protocolo para receber notificação da Authority
 
 
-class MediaAgent(spade.agent.Agent):
+class MediaAgent(SimAgent):
     """
     Agente Mídia: Implementa Q-Learning, Viés Ideológico, Efeito Viral,
     respeita candidatos eliminados e registra o efeito do mix NEWS/FAKENEWS.
+
+    Com várias Mídias (MEDIA_OUTLETS), cada uma recebe a sua audiência em
+    voter_jids, o seu viés/mix e um caixa por candidato de initial_budget.
     """
 
     def __init__(
@@ -77,19 +90,39 @@ class MediaAgent(spade.agent.Agent):
         voter_jids: list,
         authority_jid: str,
         *args,
+        ideology_bias: str = MEDIA_IDEOLOGY_BIAS,
+        bias_strength: float = MEDIA_BIAS_STRENGTH,
+        news_ratio: float = NEWS_RATIO,
+        fake_ratio: float = FAKE_RATIO,
+        initial_budget: float = CANDIDATE_INITIAL_BUDGET,
+        policy_file: str = MEDIA_POLICY_FILE,
+        targeting: Optional[Dict[str, Any]] = None,
         **kwargs,
     ):
         super().__init__(jid, password, *args, **kwargs)
         self.supervisor_jid = supervisor_jid
         self.authority_jid = authority_jid
-        self.voter_jids = voter_jids
+        self.voter_jids = voter_jids  # audiência desta Mídia
+        self.ideology_bias = ideology_bias
+        self.bias_strength = bias_strength
+        self.news_ratio = news_ratio
+        self.fake_ratio = fake_ratio
+        self.initial_budget = initial_budget
+        self.policy_file = policy_file
+        self.policy: Dict[str, Dict[str, Dict[str, float]]] = {}  # partido -> tabela Q inicial
+        self.chart_suffix = ""  # distingue os gráficos quando há várias Mídias
+        self.voter_directory: Optional[VoterDirectory] = None  # injetado pelo run_spade_sim.py
+        self.audience_index: Optional[AudienceIndex] = None    # idem; sem índice, sorteia em voter_jids
+        self.targeting: Dict[str, Any] = dict(MEDIA_TARGETING if targeting is None else targeting)
         self.known_candidates: List[str] = []  # JIDs completos
         self._tick = 0
         self._cand_idx = 0
+        self._planned_tick = -1  # último TICK planejado (MEDIA_CAMPAIGN_MODE = "tick")
+        self._np_rng = np.random.default_rng()
 
         # CAMPOS DO AGENTE
         self.candidate_budgets: Dict[str, float] = {}
-        self.q_values: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.q_values = QTable()  # [candidato, estado de orçamento, ação]
         self.candidate_party_map: Dict[str, str] = {}  # Para lógica RL Partidária
         self.eliminated_candidates: Set[str] = set()  # Candidatos eliminados
 
@@ -110,70 +143,15 @@ class MediaAgent(spade.agent.Agent):
     def _ideological_weight(self, cand_jid: str) -> float:
         """Calcula o peso ideológico da Mídia sobre o candidato (TAREFA 6)."""
         party = self.candidate_party_map.get(cand_jid, "SPD")
-        party_ideology = PARTIES.get(party, {}).get("ideology", 0)
-
-        bias = MEDIA_IDEOLOGY_BIAS.upper()
-        strength = MEDIA_BIAS_STRENGTH
-
-        if bias == "NEUTRAL" or strength <= 0.0:
-            return 1.0
-
-        # Mapeia viés para direção numérica
-        if bias == "LEFT":
-            media_side = -1
-        elif bias == "FAR_LEFT":
-            media_side = -2
-        elif bias == "RIGHT":
-            media_side = 1
-        elif bias == "FAR_RIGHT":
-            media_side = 2
-        elif bias == "CENTER":
-            media_side = 0
-        else:
-            media_side = 0
-
-        # Se sinais coincidem (ou ambos centro), favorece; se opostos, penaliza
-        sign_match = media_side * party_ideology
-        if sign_match > 0:
-            return 1.0 + strength  # favorece
-        elif sign_match < 0:
-            return 1.0 - strength  # prejudica
-        else:
-            return 1.0
+        return ideological_weight(party, self.ideology_bias, self.bias_strength)
 
     def _get_budget_state(self, cand_jid: str) -> str:
         """Mapeia o orçamento restante para um estado discreto (HIGH, MID, LOW)."""
-        budget = self.candidate_budgets.get(cand_jid, 0.0)
-        ratio = budget / float(CANDIDATE_INITIAL_BUDGET)
-        if ratio >= 0.7:
-            return "HIGH"
-        elif ratio >= 0.3:
-            return "MID"
-        else:
-            return "LOW"
+        return budget_state(self.candidate_budgets.get(cand_jid, 0.0), self.initial_budget)
 
     def _select_action(self, cand_jid: str, state: str) -> str:
         """Implementa a política ε-greedy para escolher NEWS ou FAKENEWS."""
-
-        # Garante Q-Value
-        if cand_jid not in self.q_values:
-            self.q_values[cand_jid] = {
-                "HIGH": {"NEWS": 0.0, "FAKENEWS": 0.0},
-                "MID": {"NEWS": 0.0, "FAKENEWS": 0.0},
-                "LOW": {"NEWS": 0.0, "FAKENEWS": 0.0},
-            }
-
-        if state not in self.q_values[cand_jid]:
-            self.q_values[cand_jid][state] = {"NEWS": 0.0, "FAKENEWS": 0.0}
-
-        if random.random() < RL_EPSILON:
-            return random.choice(["NEWS", "FAKENEWS"])
-
-        q_state = self.q_values[cand_jid][state]
-        if q_state["NEWS"] >= q_state["FAKENEWS"]:
-            return "NEWS"
-        else:
-            return "FAKENEWS"
+        return self.q_values.select(cand_jid, state, RL_EPSILON)
 
     def _update_q(
         self,
@@ -192,37 +170,31 @@ class MediaAgent(spade.agent.Agent):
         if cand_jid not in self.q_values:
             return
 
-        q_s_a = self.q_values[cand_jid][state][action]
-        next_qs = self.q_values[cand_jid][next_state]
-        max_next = max(next_qs["NEWS"], next_qs["FAKENEWS"])
-
         # TAREFA 6.3: Aplica peso ideológico à recompensa
         weight = self._ideological_weight(cand_jid)
         biased_reward = reward * weight
 
-        # Equação de Bellman (Q-Learning)
-        updated = q_s_a + RL_ALPHA * (
-            biased_reward + RL_GAMMA * max_next - q_s_a
-        )
-
         # TAREFA 3.4: REAÇÃO PARTIDÁRIA APÓS PUNIÇÃO
+        factor = None
         if punished and action == "FAKENEWS":
             party = self.candidate_party_map.get(cand_jid, "SPD")
+            factor = punishment_factor(party)
 
-            if party in {"PDD", "PDE", "PCE"}:  # Moderados
-                updated *= 0.5
+            if factor is not None:
+                kind = "Moderado" if factor < 0.9 else "Extremo"
                 print(
                     f"[{str(get_sender_name(self.jid)).upper()}] "
-                    f"RL_PARTIDÁRIO: Moderado {party} ajustado (x0.5)."
-                )
-            elif party in {"PED", "PEE"}:  # Extremos
-                updated *= 0.9
-                print(
-                    f"[{str(get_sender_name(self.jid)).upper()}] "
-                    f"RL_PARTIDÁRIO: Extremo {party} ajustado (x0.9)."
+                    f"RL_PARTIDÁRIO: {kind} {party} ajustado (x{factor})."
                 )
 
-        self.q_values[cand_jid][state][action] = updated
+        # Equação de Bellman (Q-Learning)
+        updated = self.q_values.update(
+            cand_jid, state, action, biased_reward, next_state, RL_ALPHA, RL_GAMMA,
+            factor if factor is not None else 1.0,
+        )
+
+        if not MEDIA_RL_VERBOSE:
+            return
 
         # Log de atualização para debug
         agent_name_upper = str(get_sender_name(self.jid)).upper()
@@ -271,8 +243,8 @@ class MediaAgent(spade.agent.Agent):
                         real_news_pct = 0.0
                         real_fake_pct = 0.0
 
-                    tgt_news = NEWS_RATIO * 100.0
-                    tgt_fake = FAKE_RATIO * 100.0
+                    tgt_news = self.agent.news_ratio * 100.0
+                    tgt_fake = self.agent.fake_ratio * 100.0
 
                     print(
                         f"[{get_sender_name(str(self.agent.jid)).upper()}]"
@@ -313,16 +285,15 @@ class MediaAgent(spade.agent.Agent):
                     for cand_jid in self.agent.known_candidates:
                         self.agent.candidate_budgets[
                             cand_jid
-                        ] = CANDIDATE_INITIAL_BUDGET
+                        ] = self.agent.initial_budget
                         self.agent._stats_per_candidate[cand_jid] = {
                             "NEWS": 0,
                             "FAKE": 0,
                         }
-                        self.agent.q_values[cand_jid] = {
-                            "HIGH": {"NEWS": 0.0, "FAKENEWS": 0.0},
-                            "MID": {"NEWS": 0.0, "FAKENEWS": 0.0},
-                            "LOW": {"NEWS": 0.0, "FAKENEWS": 0.0},
-                        }
+                    self.agent.q_values.reset(self.agent.known_candidates)
+                    for cand_jid, party in self.agent.candidate_party_map.items():
+                        if party in self.agent.policy:
+                            self.agent.q_values.set(cand_jid, self.agent.policy[party])
 
                     print(
                         f"[{get_sender_name(str(self.agent.jid)).upper()}] "
@@ -396,44 +367,16 @@ class MediaAgent(spade.agent.Agent):
                         s: {a: f"{q:.4f}" for a, q in d.items()}
                         for s, d in q_data.items()
                     }
-                    for jid, q_data in self.agent.q_values.items()
+                    for jid, q_data in self.agent.q_values.as_dict().items()
                 }
                 print(
                     f"[{str(get_sender_name(self.agent.jid)).upper()}] "
                     f"Q_VALUES_FINAL: {q_log}"
                 )
 
-                # Geração do gráfico de evolução do mix NEWS/FAKE
+                # Histórico + gráfico de evolução do mix NEWS/FAKE (processo de fundo)
                 if HAS_MATPLOTLIB and self.agent._history_ticks:
-                    try:
-                        plt.figure(figsize=(8, 4.5))
-                        plt.plot(
-                            self.agent._history_ticks,
-                            self.agent._history_news,
-                            label="NEWS",
-                        )
-                        plt.plot(
-                            self.agent._history_ticks,
-                            self.agent._history_fake,
-                            label="FAKENEWS",
-                        )
-                        plt.xlabel("Tick")
-                        plt.ylabel("Mensagens acumuladas")
-                        plt.title("Evolução do mix NEWS/FAKENEWS (Mídia)")
-                        plt.legend()
-                        plt.grid(True)
-                        fname = "media_mix_evolution.png"
-                        plt.savefig(fname, bbox_inches="tight")
-                        plt.close()
-                        print(
-                            f"[{get_sender_name(str(self.agent.jid)).upper()}] "
-                            f"GRÁFICO SALVO EM: {fname}"
-                        )
-                    except Exception as e:
-                        print(
-                            f"[{get_sender_name(str(self.agent.jid)).upper()}] "
-                            f"ERRO AO GERAR GRÁFICO: {e!r}"
-                        )
+                    self.agent._schedule_chart()
                 else:
                     print(
                         f"[{get_sender_name(str(self.agent.jid)).upper()}] "
@@ -454,6 +397,11 @@ class MediaAgent(spade.agent.Agent):
                 await asyncio.sleep(TICK_DURATION)
                 return
 
+            # Planejador por TICK: todos os candidatos ativos de uma vez
+            if MEDIA_CAMPAIGN_MODE == "tick":
+                await self.agent._campaign_tick(self)
+                return
+
             # Alvo de campanha: JID completo do candidato
             cand_jid = self.agent.known_candidates[
                 self.agent._cand_idx % len(self.agent.known_candidates)
@@ -469,13 +417,7 @@ class MediaAgent(spade.agent.Agent):
             cand_state = self.agent._get_budget_state(cand_jid)
 
             if MEDIA_USE_MANUAL_RATIOS:
-                total_ratio = max(NEWS_RATIO + FAKE_RATIO, 0.0)
-                if total_ratio <= 0.0:
-                    perf = "NEWS"
-                else:
-                    threshold = NEWS_RATIO / total_ratio
-                    r = random.random()
-                    perf = "NEWS" if r < threshold else "FAKENEWS"
+                perf = manual_performative(self.agent.news_ratio, self.agent.fake_ratio)
                 action = perf
             else:
                 action = self.agent._select_action(cand_jid, cand_state)
@@ -495,31 +437,7 @@ class MediaAgent(spade.agent.Agent):
             # (Aqui poderia entrar lógica extra de checagem de orçamento se quiser.)
 
             # Efeito Viral (TAREFA 5)
-            base_targets = max(1, int(0.4 * len(self.agent.voter_jids)))
-            targets = random.sample(self.agent.voter_jids, base_targets)
-            targets_to_send = targets[:]
-            extra_targets: List[str] = []
-
-            # Heurística viral
-            base_prob = VIRAL_BASE_PROB
-            if perf == "FAKENEWS":
-                base_prob *= 1.5
-            else:
-                base_prob *= 0.7
-
-            if random.random() < base_prob:
-                remaining = [
-                    v for v in self.agent.voter_jids if v not in targets
-                ]
-                if remaining:
-                    k_extra = min(VIRAL_MAX_EXTRA_TARGETS, len(remaining))
-                    extra_targets = random.sample(remaining, k_extra)
-                    targets_to_send.extend(extra_targets)
-                    print(
-                        f"[{get_sender_name(str(self.agent.jid)).upper()}] "
-                        f"CAMPANHA VIRAL: cand={cand_short}, perf={perf}, "
-                        f"alvos={len(targets_to_send)} (extra={len(extra_targets)})"
-                    )
+            targets_to_send = self.agent._draw_targets(cand_jid, perf)
 
             # Se não há alvos, cancela envio
             if not targets_to_send:
@@ -545,8 +463,11 @@ class MediaAgent(spade.agent.Agent):
             )
 
             # 5. ENVIO E DENÚNCIA (Usando targets_to_send)
+            directory = self.agent.voter_directory
             for v in targets_to_send:
                 m = Message(to=v)
+                if directory is not None:
+                    directory.address(m, v)
                 m.set_metadata("protocol", PROTOCOL_CAMPAIGN)
                 m.set_metadata("performative", perf)
                 m.body = f"pitch:{cand_short};t={self.agent._tick}"
@@ -566,12 +487,13 @@ class MediaAgent(spade.agent.Agent):
                 await self.send(report_msg)
 
             # 6. CÁLCULO DA RECOMPENSA E ATUALIZAÇÃO Q
-            total_voters = (
-                len(self.agent.voter_jids) if self.agent.voter_jids else 1
+            reward = campaign_reward(
+                len(targets_to_send),
+                len(self.agent.voter_jids),
+                custo_total + multa,
+                RL_LAMBDA_COST,
+                self.agent.initial_budget,
             )
-            coverage = len(targets_to_send) / float(total_voters)
-            cost_norm = (custo_total + multa) / float(CANDIDATE_INITIAL_BUDGET)
-            reward = coverage - RL_LAMBDA_COST * cost_norm
 
             next_state = self.agent._get_budget_state(cand_jid)
 
@@ -616,8 +538,8 @@ class MediaAgent(spade.agent.Agent):
                 real_news_pct = 0.0
                 real_fake_pct = 0.0
 
-            tgt_news = NEWS_RATIO * 100.0
-            tgt_fake = FAKE_RATIO * 100.0
+            tgt_news = self.agent.news_ratio * 100.0
+            tgt_fake = self.agent.fake_ratio * 100.0
 
             current_colored = (
                 f"{ANSI_GREEN}NEWS{ANSI_RESET}"
@@ -649,11 +571,222 @@ class MediaAgent(spade.agent.Agent):
 
             await asyncio.sleep(TICK_DURATION)
 
+    def _schedule_chart(self) -> None:
+        """Grava o histórico e agenda o PNG num subprocesso (não bloqueia o loop)."""
+        label = charts.run_label() + self.chart_suffix
+        paths = charts.output_paths(label)
+        history = charts.make_history(
+            label, self._history_ticks, self._history_news, self._history_fake
+        )
+        name = get_sender_name(str(self.jid)).upper()
+        try:
+            charts.save_history(history, paths["history"])
+            charts.get_renderer().submit(paths["history"])
+        except Exception as e:
+            print(f"[{name}] ERRO AO AGENDAR GRÁFICO: {e!r}")
+            return
+
+        print(
+            f"[{name}] HISTÓRICO SALVO EM: {paths['history']} "
+            f"(gráfico em segundo plano: {paths['chart']})"
+        )
+
+    async def _campaign_tick(self, beh: CyclicBehaviour) -> None:
+        """
+        MEDIA_CAMPAIGN_MODE = "tick": um envio por candidato ativo a cada TICK.
+        As ações saem em lote da tabela Q, orçamentos e custos numa passada, a
+        entrega é uma mensagem CAMPAIGN_BATCH por host de eleitores e a tabela
+        Q é atualizada em lote.
+        """
+        tick = self._tick
+        if tick == self._planned_tick:
+            await asyncio.sleep(TICK_DURATION * 0.1)
+            return
+        self._planned_tick = tick
+        active = [c for c in self.known_candidates if c not in self.eliminated_candidates]
+        if not active:
+            return
+        name = get_sender_name(str(self.jid)).upper()
+
+        # 1. Ações de todos os candidatos: modo MANUAL (ratios) ou RL em lote
+        q = self.q_values
+        rows = np.array([q.row(c) for c in active])
+        states = np.array([q.state_index[self._get_budget_state(c)] for c in active])
+        if MEDIA_USE_MANUAL_RATIOS:
+            actions = np.array([
+                q.action_index[manual_performative(self.news_ratio, self.fake_ratio)] for _ in active
+            ])
+        else:
+            actions = q.select_batch(rows, states, RL_EPSILON, self._np_rng)
+
+        # 2. Alvos, custos e orçamentos numa passada; envios agrupados por host
+        directory = self.voter_directory
+        batches: Dict[str, List[Tuple[str, str, str]]] = {}
+        plan, kept = [], []
+        for k, (cand_jid, a) in enumerate(zip(active, actions)):
+            perf = q.actions[a]
+            cand_short = get_sender_name(cand_jid)
+            targets = self._draw_targets(cand_jid, perf)
+            if not targets:
+                print(f"[{name}] CUSTO_CAMPANHA: cand={cand_short}, Envio de {perf} cancelado. Alvos vazios.")
+                continue
+            if perf == "NEWS":
+                custo_alvo, multa = COST_NEWS_PER_TARGET, 0
+            else:
+                custo_alvo, multa = COST_FAKENEWS_PER_TARGET, PENALTY_PER_FAKENEWS
+            custo_total = len(targets) * custo_alvo
+            self.candidate_budgets[cand_jid] = self.candidate_budgets.get(cand_jid, 0.0) - (custo_total + multa)
+            punished = perf == "FAKENEWS" and random.random() < P_DETECT_BASE
+            for v in targets:
+                host = directory.host_of(v) if directory is not None else v
+                batches.setdefault(host, []).append((v, cand_short, perf))
+            plan.append((cand_jid, cand_short, perf, len(targets), custo_total, multa, punished))
+            kept.append(k)
+        if not plan:
+            return
+        rows, states, actions = rows[kept], states[kept], actions[kept]
+
+        # 3. Entrega: uma mensagem por host + denúncias de FAKENEWS
+        for host, pitches in batches.items():
+            m = Message(to=host)
+            m.set_metadata("protocol", PROTOCOL_CAMPAIGN_BATCH)
+            m.set_metadata("performative", "inform")
+            m.body = encode_pitches(pitches)
+            await beh.send(m)
+        for cand_jid, _, perf, *_ in plan:
+            if perf == "FAKENEWS":
+                report_msg = Message(to=str(self.authority_jid))
+                report_msg.set_metadata("protocol", PROTOCOL_PUNISH)
+                report_msg.set_metadata("performative", "inform")
+                report_msg.body = json.dumps({"candidate": cand_jid, "type": "FAKENEWS", "tick": tick})
+                await beh.send(report_msg)
+
+        # 4. Recompensas e atualização Q em lote
+        if not MEDIA_USE_MANUAL_RATIOS:
+            rewards = np.array([
+                campaign_reward(sent, len(self.voter_jids), custo + multa, RL_LAMBDA_COST, self.initial_budget)
+                * self._ideological_weight(cand_jid)
+                for cand_jid, _, _, sent, custo, multa, _ in plan
+            ])
+            next_states = np.array([q.state_index[self._get_budget_state(p[0])] for p in plan])
+            factors = np.ones(len(plan))
+            for k, (cand_jid, _, perf, _, _, _, punished) in enumerate(plan):
+                party = self.candidate_party_map.get(cand_jid, "SPD")
+                factor = punishment_factor(party) if punished else None
+                if factor is not None:
+                    factors[k] = factor
+                    kind = "Moderado" if factor < 0.9 else "Extremo"
+                    print(f"[{name}] RL_PARTIDÁRIO: {kind} {party} ajustado (x{factor}).")
+            updated = q.update_batch(rows, states, actions, rewards, next_states, RL_ALPHA, RL_GAMMA, factors)
+            if MEDIA_RL_VERBOSE:
+                for k, (cand_jid, cand_short, perf, *_rest) in enumerate(plan):
+                    print(
+                        f"[{name}] RL_UPDATE: cand={cand_short}, "
+                        f"state='{q.states[states[k]]}', action='{perf}', reward={rewards[k]:.4f}, "
+                        f"Q_new={updated[k]:.4f}, next_state='{q.states[next_states[k]]}'"
+                    )
+
+        # 5. Estatísticas, histórico (um ponto por TICK) e log
+        for cand_jid, cand_short, perf, sent, custo, multa, _ in plan:
+            if perf == "NEWS":
+                self._stats_news_sent_total += sent
+                self._stats_per_candidate[cand_jid]["NEWS"] += sent
+            else:
+                self._stats_fakenews_sent_total += sent
+                self._stats_per_candidate[cand_jid]["FAKE"] += sent
+            print(
+                f"[{name}] CUSTO_CAMPANHA: cand={cand_short}, tipo={perf}, "
+                f"enviados={sent}, custo={custo}, multa={multa}, "
+                f"restante={self.candidate_budgets[cand_jid]:.2f}"
+            )
+        self._history_ticks.append(tick)
+        self._history_news.append(self._stats_news_sent_total)
+        self._history_fake.append(self._stats_fakenews_sent_total)
+        print(
+            f"[{name}][T{tick:02d}] PLANO: {len(plan)} candidatos, "
+            f"{sum(p[3] for p in plan)} envios em {len(batches)} lotes | "
+            f"TOTAL: NEWS={self._stats_news_sent_total} FAKE={self._stats_fakenews_sent_total}"
+        )
+
+    def _draw_targets(self, cand_jid: str, perf: str) -> List[str]:
+        """Alvos de um envio: 40% da audiência (ou do segmento-alvo) + extras virais."""
+        index = self.audience_index
+        if index is not None:
+            # Sorteio O(k) no segmento-alvo da audiência (audience.py)
+            segment = self._target_segment(cand_jid)
+            base_targets = max(1, int(0.4 * index.count(**segment)))
+            targets = index.sample(base_targets, **segment)
+        else:
+            base_targets = max(1, int(0.4 * len(self.voter_jids)))
+            targets = random.sample(self.voter_jids, base_targets)
+        targets_to_send = targets[:]
+        extra_targets: List[str] = []
+
+        # Heurística viral
+        base_prob = viral_probability(perf, VIRAL_BASE_PROB)
+
+        if random.random() < base_prob:
+            if index is not None:
+                # Viraliza para fora do segmento, mas dentro da audiência desta Mídia
+                extra_targets = index.sample(
+                    VIRAL_MAX_EXTRA_TARGETS, exclude=targets, outlet=str(self.jid)
+                )
+            else:
+                remaining = [
+                    v for v in self.voter_jids if v not in targets
+                ]
+                if remaining:
+                    k_extra = min(VIRAL_MAX_EXTRA_TARGETS, len(remaining))
+                    extra_targets = random.sample(remaining, k_extra)
+            if extra_targets:
+                targets_to_send.extend(extra_targets)
+                print(
+                    f"[{get_sender_name(str(self.jid)).upper()}] "
+                    f"CAMPANHA VIRAL: cand={get_sender_name(cand_jid)}, perf={perf}, "
+                    f"alvos={len(targets_to_send)} (extra={len(extra_targets)})"
+                )
+        return targets_to_send
+
+    def _target_segment(self, cand_jid: str) -> Dict[str, Any]:
+        """Critérios do AudienceIndex para o envio: a audiência desta Mídia + MEDIA_TARGETING."""
+        segment = {"outlet": str(self.jid)}
+        for dim, labels in self.targeting.items():
+            if dim == "party" and labels == "CANDIDATE":
+                labels = self.candidate_party_map.get(cand_jid, "SPD")
+            segment[dim] = labels
+        return segment
+
+    def _load_policy(self):
+        """Carrega a política do rl_train.py; em caso de erro, as tabelas começam zeradas."""
+        name = get_sender_name(str(self.jid)).upper()
+        try:
+            self.policy, meta = load_policy(self.policy_file)
+        except (OSError, ValueError) as e:
+            print(f"[{name}] [ERRO] Política {self.policy_file} ignorada: {e}")
+            return
+        if meta.get("budget_model") != BUDGET_MODEL:
+            print(
+                f"[{name}] Aviso: política treinada com outro modelo de caixa "
+                f"({meta.get('budget_model')!r}, esperado {BUDGET_MODEL!r}); retreine com rl_train.py."
+            )
+        trained = meta.get("params", {})
+        for key, value in (("MEDIA_IDEOLOGY_BIAS", self.ideology_bias), ("MEDIA_BIAS_STRENGTH", self.bias_strength)):
+            if key in trained and trained[key] != value:
+                print(f"[{name}] Aviso: política treinada com {key}={trained[key]}, esta Mídia usa {value}.")
+        print(
+            f"[{name}] Política Q carregada de {self.policy_file} "
+            f"({len(self.policy)} partidos, {meta.get('episodes', '?')} episódios)."
+        )
+
     async def setup(self):
         print(
             f"[{get_sender_name(str(self.jid)).upper()}] "
-            "Agente Mídia iniciado (com mix NEWS/FAKE configurável)."
+            "Agente Mídia iniciado (com mix NEWS/FAKE configurável): "
+            f"viés={self.ideology_bias} ({self.bias_strength:.2f}), "
+            f"audiência={len(self.voter_jids)} eleitores."
         )
+        if self.policy_file:
+            self._load_policy()
 
         template_sim = Template(metadata={"protocol": PROTOCOL_INIT_SIM})
         self.add_behaviour(self.SimListener(), template_sim)
@@ -0,0 +1,140 @@
+# python_spade/q_table.py
+"""
+Tabela Q da Mídia num array NumPy [candidato, estado, ação].
+
+Substitui o dict candidato -> estado -> ação -> valor: estados e ações são
+índices (RL_STATES/RL_ACTIONS por padrão, mas qualquer tupla serve, p.ex.
+faixas de orçamento mais finas ou ações de segmentação) e as operações
+trabalham em lote sobre linhas de vários candidatos:
+
+  - select_batch: ε-greedy vetorizado (empate -> primeira ação, como
+    election_model.select_action);
+  - update_batch: Bellman para vários (candidato, estado, ação) de uma vez,
+    com fator de punição opcional por entrada.
+
+Os métodos escalares (select, update) aplicam as mesmas regras a uma
+entrada, para o MediaAgent, que decide um candidato por vez.
+"""
+import random
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from common import RL_ALPHA, RL_GAMMA
+from election_model import RL_ACTIONS, RL_STATES
+
+
+class QTable:
+    def __init__(
+        self,
+        states: Sequence[str] = RL_STATES,
+        actions: Sequence[str] = RL_ACTIONS,
+        capacity: int = 8,
+    ):
+        self.states = tuple(states)
+        self.actions = tuple(actions)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        self.rows: Dict[str, int] = {}
+        self.values = np.zeros((max(1, capacity), len(self.states), len(self.actions)))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row(self, key: str) -> int:
+        """Linha do candidato, criada zerada se ainda não existe (o array cresce dobrando)."""
+        r = self.rows.get(key)
+        if r is None:
+            r = self.rows[key] = len(self.rows)
+            if r >= len(self.values):
+                grown = np.zeros((2 * len(self.values),) + self.values.shape[1:])
+                grown[:len(self.values)] = self.values
+                self.values = grown
+        return r
+
+    def reset(self, keys: Iterable[str]) -> None:
+        """Zera (ou cria) as linhas dos candidatos dados."""
+        for key in keys:
+            self.values[self.row(key)] = 0.0
+
+    def set(self, key: str, table: Dict[str, Dict[str, float]]) -> None:
+        """Copia uma tabela estado -> ação -> valor (p.ex. a política do rl_train.py) para a linha do candidato."""
+        r = self.row(key)
+        for s, q in table.items():
+            for a, value in q.items():
+                self.values[r, self.state_index[s], self.action_index[a]] = value
+
+    # ---------------- Lote ----------------
+    def select_batch(
+        self,
+        rows: np.ndarray,
+        states: np.ndarray,
+        epsilon: float,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """Índices de ação ε-greedy para cada par (linha, estado)."""
+        greedy = self.values[rows, states].argmax(axis=-1)
+        explore = rng.random(len(greedy)) < epsilon
+        return np.where(explore, rng.integers(len(self.actions), size=len(greedy)), greedy)
+
+    def update_batch(
+        self,
+        rows: np.ndarray,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        alpha: float = RL_ALPHA,
+        gamma: float = RL_GAMMA,
+        factors: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Bellman vetorizado; devolve os novos valores. Cada (linha, estado,
+        ação) deve aparecer uma vez por lote (com repetição, vale a última).
+        """
+        q_sa = self.values[rows, states, actions]
+        max_next = self.values[rows, next_states].max(axis=-1)
+        updated = q_sa + alpha * (rewards + gamma * max_next - q_sa)
+        if factors is not None:
+            updated = updated * factors
+        self.values[rows, states, actions] = updated
+        return updated
+
+    # ---------------- Escalar ----------------
+    def select(self, key: str, state: str, epsilon: float, rng=random) -> str:
+        """ε-greedy para um candidato (mesma política de election_model.select_action)."""
+        if rng.random() < epsilon:
+            return rng.choice(self.actions)
+        q = self.values[self.row(key), self.state_index[state]]
+        return self.actions[int(q.argmax())]
+
+    def update(
+        self,
+        key: str,
+        state: str,
+        action: str,
+        reward: float,
+        next_state: str,
+        alpha: float = RL_ALPHA,
+        gamma: float = RL_GAMMA,
+        factor: float = 1.0,
+    ) -> float:
+        """Bellman para uma entrada; `factor` é a reação partidária à punição (1.0 = nenhuma)."""
+        r, s, a = self.row(key), self.state_index[state], self.action_index[action]
+        q_sa = self.values[r, s, a]
+        updated = (q_sa + alpha * (reward + gamma * self.values[r, self.state_index[next_state]].max() - q_sa)) * factor
+        self.values[r, s, a] = updated
+        return float(updated)
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Formato antigo candidato -> estado -> ação -> valor (logs e JSON)."""
+        return {
+            key: {
+                s: {a: float(self.values[r, i, j]) for j, a in enumerate(self.actions)}
+                for i, s in enumerate(self.states)
+            }
+            for key, r in self.rows.items()
+        }
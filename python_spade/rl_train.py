@@ -0,0 +1,219 @@
+# python_spade/rl_train.py
+"""
+Treino offline da política Q da Mídia (MEDIA_USE_MANUAL_RATIOS = False).
+
+Uma execução ao vivo dá ~40 atualizações por candidato e a tabela se perde
+no fim. Aqui cada episódio é a campanha T11..T50 do motor por coortes
+(cohort_sim.CohortElection.run_campaign: mesmas decisões, custos e denúncias
+do headless_sim, com custo independente de N), sem a votação.
+
+A recompensa só depende do candidato pelo partido (peso ideológico e reação
+à punição), então a política é uma tabela por partido: partido -> estado de
+orçamento -> ação -> Q. O treino é feito em rodadas: cada tarefa do pool roda
+um lote de episódios partindo da política atual (cada candidato começa com a
+tabela do seu partido) e devolve a soma das tabelas finais por partido; a
+nova política é a média ponderada pelo número de candidatos. O treino para
+quando a maior variação de um Q entre rodadas, relativa ao maior |Q|, fica
+abaixo de --tol (cada episódio só dá ~40 passos por candidato, então a
+convergência leva milhares de episódios).
+
+A Mídia carrega a política salva (MEDIA_POLICY_FILE em common.py) ao
+receber o anúncio de candidatos.
+
+Uso:
+    python rl_train.py --episodes 20000 --workers 8 --out media_policy.json
+    python rl_train.py --scenario C1 --episodes 20000 --out policy_c1.json
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import common as cfg
+from election_model import RL_ACTIONS, RL_STATES, empty_q_table
+
+Policy = Dict[str, Dict[str, Dict[str, float]]]
+
+# Dinâmica do caixa usada no treino (gravada no arquivo): o MediaAgent só desconta
+# custo por alvo + PENALTY_PER_FAKENEWS; a multa da Authority fica no caixa dela.
+BUDGET_MODEL = "media_cost_and_fine"
+
+# Parâmetros que mudam a recompensa ou a dinâmica do orçamento (gravados no arquivo)
+POLICY_KEYS = (
+    "N_CITIZENS",
+    "CANDIDATE_INITIAL_BUDGET",
+    "COST_NEWS_PER_TARGET",
+    "COST_FAKENEWS_PER_TARGET",
+    "PENALTY_PER_FAKENEWS",
+    "P_DETECT_BASE",
+    "VIRAL_BASE_PROB",
+    "VIRAL_MAX_EXTRA_TARGETS",
+    "MEDIA_IDEOLOGY_BIAS",
+    "MEDIA_BIAS_STRENGTH",
+    "RL_EPSILON",
+    "RL_ALPHA",
+    "RL_GAMMA",
+    "RL_LAMBDA_COST",
+)
+
+
+def empty_policy() -> Policy:
+    return {party: empty_q_table() for party in cfg.ALL_PARTIES}
+
+
+def run_episodes(policy: Policy, overrides: Dict[str, Any], seeds: Sequence[Any]) -> Tuple[Policy, Dict[str, int]]:
+    """Roda um lote de episódios; devolve (soma das tabelas finais por partido, candidatos por partido)."""
+    from cohort_sim import CohortElection, build_params  # import tardio (NumPy) só nos workers
+
+    params = build_params({**overrides, "MEDIA_USE_MANUAL_RATIOS": False})
+    sums = {party: {s: {a: 0.0 for a in RL_ACTIONS} for s in RL_STATES} for party in policy}
+    counts = {party: 0 for party in policy}
+    for seed in seeds:
+        episode = CohortElection(params, seed)
+        episode.run_campaign(policy)
+        for party, q in zip(episode.cand_party, episode.q_values):
+            counts[party] += 1
+            for s in RL_STATES:
+                for a in RL_ACTIONS:
+                    sums[party][s][a] += q[s][a]
+    return sums, counts
+
+
+def merge(policy: Policy, results: List[Tuple[Policy, Dict[str, int]]]) -> Tuple[Policy, float]:
+    """Média das tabelas finais por partido; devolve (nova política, maior |ΔQ| / maior |Q|)."""
+    merged: Policy = {}
+    delta = 0.0
+    for party, table in policy.items():
+        n = sum(counts[party] for _, counts in results)
+        if not n:
+            merged[party] = table  # partido sem candidatos nesta rodada
+            continue
+        merged[party] = {
+            s: {a: sum(sums[party][s][a] for sums, _ in results) / n for a in RL_ACTIONS}
+            for s in RL_STATES
+        }
+        delta = max(delta, max(abs(merged[party][s][a] - table[s][a]) for s in RL_STATES for a in RL_ACTIONS))
+    scale = max(abs(q) for table in merged.values() for row in table.values() for q in row.values())
+    return merged, delta / scale if scale else delta
+
+
+def train(
+    overrides: Optional[Dict[str, Any]] = None,
+    episodes: int = 20000,
+    round_episodes: int = 400,
+    batch: int = 50,
+    tol: float = 0.02,
+    min_rounds: int = 3,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    initial: Optional[Policy] = None,
+) -> Dict[str, Any]:
+    """Treina em rodadas de `round_episodes` episódios até convergir ou gastar `episodes`."""
+    overrides = dict(overrides or {})
+    workers = workers or os.cpu_count() or 1
+    policy = initial or empty_policy()
+    history: List[Dict[str, Any]] = []
+    done, converged = 0, False
+    t0 = time.perf_counter()
+
+    print(f"[RLTRAIN] até {episodes} episódios, rodadas de {round_episodes}, lotes de {batch}, workers={workers}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while done < episodes and not converged:
+            n = min(round_episodes, episodes - done)
+            seeds = [(seed, done + i) for i in range(n)]
+            futures = [
+                pool.submit(run_episodes, policy, overrides, seeds[i:i + batch])
+                for i in range(0, n, batch)
+            ]
+            policy, delta = merge(policy, [f.result() for f in futures])
+            done += n
+            history.append({"round": len(history) + 1, "episodes": done, "rel_delta": delta})
+            print(f"[RLTRAIN] rodada {len(history)}: {done} episódios, max|ΔQ|/max|Q|={delta:.4f}")
+            converged = len(history) >= min_rounds and delta < tol
+
+    wall = time.perf_counter() - t0
+    print(f"[RLTRAIN] {'Convergiu' if converged else 'Sem convergência'} após {done} episódios ({wall:.1f}s).")
+    return {"policy": policy, "history": history, "episodes": done, "converged": converged, "wall_seconds": wall}
+
+
+# ==========================
+# Política salva
+# ==========================
+def save_policy(path: str, report: Dict[str, Any], params: Dict[str, Any], scenario: Optional[str] = None):
+    data = {
+        "meta": {
+            "params": {k: params[k] for k in POLICY_KEYS},
+            "scenario": scenario,
+            "budget_model": BUDGET_MODEL,
+            "episodes": report["episodes"],
+            "converged": report["converged"],
+        },
+        "history": report["history"],
+        "policy": report["policy"],
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+
+
+def load_policy(path: str) -> Tuple[Policy, Dict[str, Any]]:
+    """Lê (política, meta) de um arquivo do rl_train.py; ValueError se o formato não confere."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    policy = data.get("policy") if isinstance(data, dict) else None
+    if not isinstance(policy, dict):
+        raise ValueError(f"{path}: não é uma política do rl_train.py (falta 'policy')")
+    for party, table in policy.items():
+        if set(table) != set(RL_STATES) or any(set(q) != set(RL_ACTIONS) for q in table.values()):
+            raise ValueError(f"{path}: tabela de {party} não tem os estados/ações {RL_STATES}/{RL_ACTIONS}")
+    return policy, data.get("meta", {})
+
+
+def main(argv: Optional[List[str]] = None):
+    from headless_sim import build_params
+    from scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Treino offline da política Q da Mídia (episódios headless).")
+    parser.add_argument("--episodes", type=int, default=20000, help="Máximo de episódios")
+    parser.add_argument("--round-episodes", type=int, default=400, help="Episódios por rodada de média")
+    parser.add_argument("--batch", type=int, default=50, help="Episódios por tarefa do pool")
+    parser.add_argument("--tol", type=float, default=0.02, help="Para quando max|ΔQ|/max|Q| entre rodadas < tol")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenario", default=None, help="Cenário de scenarios.py (padrão: common.py)")
+    parser.add_argument("--n-citizens", type=int, default=None)
+    parser.add_argument("--resume", default=None, help="Continua a partir de uma política salva")
+    parser.add_argument("--out", default="media_policy.json")
+    args = parser.parse_args(argv)
+
+    overrides: Dict[str, Any] = {}
+    if args.scenario:
+        if args.scenario not in SCENARIOS:
+            parser.error(f"cenário desconhecido: {args.scenario}")
+        overrides.update(SCENARIOS[args.scenario])
+    if args.n_citizens:
+        overrides["N_CITIZENS"] = args.n_citizens
+    initial = load_policy(args.resume)[0] if args.resume else None
+
+    report = train(
+        overrides,
+        episodes=args.episodes,
+        round_episodes=args.round_episodes,
+        batch=args.batch,
+        tol=args.tol,
+        min_rounds=args.min_rounds,
+        workers=args.workers,
+        seed=args.seed,
+        initial=initial,
+    )
+    for party, table in report["policy"].items():
+        greedy = {s: max(RL_ACTIONS, key=lambda a: (table[s][a], a == "NEWS")) for s in RL_STATES}
+        print(f"[RLTRAIN]   {party}: {greedy}")
+    save_policy(args.out, report, build_params(overrides), args.scenario)
+    print(f"[RLTRAIN] Política salva em: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
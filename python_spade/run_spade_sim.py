@@ -2,17 +2,24 @@
 
 import asyncio
 import random
+import time
 from collections import Counter
+from typing import Any, Dict, Optional
 
 import spade
-import networkx as nx
 
 import common as cfg
+import charts
 from common import get_sender_name, generate_jid
+from behaviour_profiler import PROFILER
+from sim_agent import METRICS, SimAgent, VoterDirectory, trace_footprint
+from audience import build_index
+from election_model import apportion_seats, district_bounds
 
 from authority_agent import ElectionAuthorityAgent
 from media_agent import MediaAgent
 from voter_agent import VoterAgent
+from voter_population_agent import VoterPopulationAgent
 from supervisor_agent import SupervisorAgent
 
 # Importa comandos do supervisor (necessário para o novo fluxo)
@@ -44,6 +51,7 @@ AUTHORITY_PREFIX = cfg.AUTHORITY_PREFIX
 MEDIA_PREFIX = cfg.MEDIA_PREFIX
 SUPERVISOR_PREFIX = cfg.SUPERVISOR_PREFIX
 VOTER_PREFIX = cfg.VOTER_PREFIX
+VOTER_POPULATION_SIZE = cfg.VOTER_POPULATION_SIZE
 TOTAL_TICKS = cfg.TOTAL_TICKS
 
 
@@ -72,7 +80,7 @@ async def safe_start(
 # ==========================
 # Função de Comando (Nova) - Reescrita para ser robusta
 # ==========================
-class CommandSenderAgent(spade.agent.Agent):
+class CommandSenderAgent(SimAgent):
     """Agente temporário para enviar comandos ao Supervisor."""
 
     def __init__(self, jid, password, target_jid, command, *args, **kwargs):
@@ -116,16 +124,113 @@ async def send_command(
 # ==========================
 def build_social_network(n: int, k: int = 4, p: float = 0.3):
     """Cria uma rede social de Watts-Strogatz (small-world)."""
+    import networkx as nx  # import tardio (só é necessário uma vez, no setup)
+
     if n < 2:
         return nx.empty_graph(n)
     k = max(1, min(k, n - 1))
     return nx.watts_strogatz_graph(n, k, p)
 
 
+def fast_forward_influence(voters: list, graph, mode: str) -> int:
+    """
+    Aplica o avanço rápido de T0..T9 (influence_fastforward.py) ao estado dos
+    eleitores antes do start; devolve o TICK em que o Supervisor deve começar.
+    """
+    import influence_fastforward as ff  # import tardio (NumPy)
+
+    ideology, engagement = [], []
+    for v in voters:
+        if isinstance(v, VoterPopulationAgent):
+            ideology.extend(v.ideology)
+            engagement.extend(v.engagement)
+        else:
+            ideology.append(v.ideology)
+            engagement.append(v.engagement)
+    neighbours = [list(graph.neighbors(i)) if graph.has_node(i) else [] for i in range(len(ideology))]
+
+    t0 = time.perf_counter()
+    updated = ff.fast_forward(ideology, engagement, neighbours, mode)
+    pos = 0
+    for v in voters:
+        if isinstance(v, VoterPopulationAgent):
+            for i in range(len(v.voter_jids)):
+                v.ideology[i] = updated[pos + i]
+            pos += len(v.voter_jids)
+        else:
+            v.ideology = updated[pos]
+            pos += 1
+    print(
+        f"[SETUP] Influência T0..T{ff.FAST_FORWARD_ROUNDS - 1} avançada ({mode}) em "
+        f"{(time.perf_counter() - t0) * 1000:.1f}ms; simulação começa em T{ff.FAST_FORWARD_ROUNDS}."
+    )
+    return ff.FAST_FORWARD_ROUNDS
+
+
+def build_audience_index(voters: list, graph, outlets: list[Dict[str, Any]]):
+    """Segmentos de audiência (audience.py) a partir do estado dos eleitores após o avanço rápido."""
+    jids, parties, ideology, credibility = [], [], [], []
+    for v in voters:
+        if isinstance(v, VoterPopulationAgent):
+            jids.extend(v.voter_jids)
+            parties.extend(v.parties)
+            ideology.extend(v.ideology)
+            credibility.extend(v.credibility)
+        else:
+            jids.append(str(v.jid))
+            parties.append(v.party)
+            ideology.append(v.ideology)
+            credibility.append(v.confianca_midia)
+    degrees = [graph.degree(i) if graph.has_node(i) else 0 for i in range(len(jids))]
+    outlet_of = {jid: o["jid"] for o in outlets for jid in o["audience"]}
+
+    t0 = time.perf_counter()
+    index = build_index(jids, parties, ideology, credibility, degrees, outlet_of)
+    print(f"[SETUP] Índice de audiência: {len(index)} eleitores segmentados em {(time.perf_counter() - t0) * 1000:.1f}ms.")
+    return index
+
+
+def media_outlets(voter_jids: list[str]) -> list[Dict[str, Any]]:
+    """
+    Configuração de cada Mídia (MEDIA_OUTLETS): audiências disjuntas sorteadas
+    com tamanhos proporcionais a "audience" e caixa por candidato proporcional
+    à audiência. Sem MEDIA_OUTLETS, uma Mídia com todo o eleitorado.
+    """
+    specs = cfg.MEDIA_OUTLETS or [{}]
+    if len(specs) == 1:
+        audiences = [list(voter_jids)]
+    else:
+        sizes = apportion_seats(len(voter_jids), [float(s.get("audience", 1.0)) for s in specs])
+        shuffled = random.sample(voter_jids, len(voter_jids))
+        bounds = [sum(sizes[:k]) for k in range(len(sizes) + 1)]
+        audiences = [shuffled[bounds[k]:bounds[k + 1]] for k in range(len(sizes))]
+    return [
+        {
+            "jid": generate_jid(MEDIA_PREFIX, k),
+            "audience": audience,
+            "ideology_bias": spec.get("bias", cfg.MEDIA_IDEOLOGY_BIAS),
+            "bias_strength": spec.get("strength", cfg.MEDIA_BIAS_STRENGTH),
+            "news_ratio": spec.get("news_ratio", cfg.NEWS_RATIO),
+            "fake_ratio": spec.get("fake_ratio", cfg.FAKE_RATIO),
+            "policy_file": spec.get("policy", cfg.MEDIA_POLICY_FILE),
+            "targeting": spec.get("target", cfg.MEDIA_TARGETING),
+            "initial_budget": cfg.CANDIDATE_INITIAL_BUDGET * len(audience) / float(len(voter_jids) or 1),
+        }
+        for k, (spec, audience) in enumerate(zip(specs, audiences), start=1)
+    ]
+
+
 # ==========================
 # MAIN
 # ==========================
-async def main():
+async def main(max_run_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Executa a simulação e devolve estatísticas da execução (usadas pelo benchmark.py).
+    max_run_seconds limita a espera pelos resultados depois do boot (padrão: pelos TICKs).
+    """
+    t_setup = time.perf_counter()
+    if cfg.PROFILE_BEHAVIOURS:
+        PROFILER.start(cfg.PROFILE_SAMPLE_INTERVAL, cfg.PROFILE_TRACEMALLOC, tick_source=lambda: METRICS.tick)
     print("\n--- 🚀 Iniciando a Simulação Multiagente (PRODEI012) ---")
     print(
         f"Escala: {N_CITIZENS} Eleitores, "
@@ -153,7 +258,6 @@ async def main():
     # JIDs principais
     sup_jid = generate_jid(SUPERVISOR_PREFIX, 1)
     auth_jid = generate_jid(AUTHORITY_PREFIX, 1)
-    media_jid = generate_jid(MEDIA_PREFIX, 1)
 
     # ==========================
     # Cria rede social + voters
@@ -161,8 +265,10 @@ async def main():
     G = build_social_network(N_CITIZENS, k=4, p=0.3)
 
     voters = []
+    voter_jids: list[str] = []
     voter_party_map = {}  # Mapeamento JID -> Party (essencial p/ Supervisor)
     party_counts = Counter()
+    directory = VoterDirectory()  # eleitor lógico -> agente hospedeiro
 
     # Distribuição FIXA de eleitores por partido
     target_counts = cfg.compute_party_counts(N_CITIZENS)
@@ -179,32 +285,76 @@ async def main():
     elif len(party_list) > N_CITIZENS:
         party_list = party_list[:N_CITIZENS]
 
-    # Criação dos eleitores com a distribuição fixa
+    # Identidade e vizinhos de cada eleitor (distribuição fixa)
+    all_neighbours: list[list[str]] = []
     for i in range(1, N_CITIZENS + 1):
         v_jid = generate_jid(VOTER_PREFIX, i)
         party = party_list[i - 1]
         party_counts[party] += 1
         voter_party_map[v_jid] = party
+        voter_jids.append(v_jid)
 
         # Define vizinhos
         neighbours = []
         if G.has_node(i - 1):
             for n in G.neighbors(i - 1):
                 neighbours.append(generate_jid(VOTER_PREFIX, n + 1))
-
-        # Instancia o VoterAgent
-        voter = VoterAgent(
-            v_jid,
-            PASSWORD,
-            supervisor_jid=sup_jid,
-            authority_jid=auth_jid,  # Passando a JID da Authority
-            party=party,
-            neighbours=neighbours,
-        )
-        voters.append(voter)
+        all_neighbours.append(neighbours)
+
+    # Distritos (blocos contíguos da rede), cada um com a sua autoridade
+    districts = district_bounds(N_CITIZENS, cfg.N_DISTRICTS) if cfg.N_DISTRICTS > 1 else [(0, N_CITIZENS)]
+    district_jids = [generate_jid(cfg.DISTRICT_PREFIX, d) for d in range(1, len(districts) + 1)] if len(districts) > 1 else []
+    voter_authority = [auth_jid] * N_CITIZENS
+    for d_jid, (start, end) in zip(district_jids, districts):
+        voter_authority[start:end] = [d_jid] * (end - start)
+
+    if VOTER_POPULATION_SIZE > 0:
+        # Blocos contíguos de eleitores lógicos, um VoterPopulationAgent por bloco (sem cruzar distritos)
+        blocks = [
+            (start, min(start + VOTER_POPULATION_SIZE, end))
+            for d_start, end in districts
+            for start in range(d_start, end, VOTER_POPULATION_SIZE)
+        ]
+        for k, (start, stop) in enumerate(blocks, start=1):
+            block = voter_jids[start:stop]
+            pop_jid = generate_jid(cfg.POPULATION_PREFIX, k)
+            for v_jid in block:
+                directory.add(v_jid, pop_jid)
+            voters.append(VoterPopulationAgent(
+                pop_jid,
+                PASSWORD,
+                supervisor_jid=sup_jid,
+                authority_jid=voter_authority[start],
+                voter_jids=block,
+                parties=party_list[start:start + len(block)],
+                neighbours=all_neighbours[start:start + len(block)],
+                directory=directory,
+            ))
+    else:
+        for v_jid, neighbours, v_auth in zip(voter_jids, all_neighbours, voter_authority):
+            directory.add(v_jid, v_jid)
+            # Instancia o VoterAgent
+            voter = VoterAgent(
+                v_jid,
+                PASSWORD,
+                supervisor_jid=sup_jid,
+                authority_jid=v_auth,  # Authority do distrito (ou a nacional)
+                party=voter_party_map[v_jid],
+                neighbours=neighbours,
+            )
+            voters.append(voter)
 
     print(f"\n[SETUP] Distribuição Partidária Alvo (compute_party_counts): {target_counts}")
     print(f"[SETUP] Distribuição Partidária Efetiva (eleitores criados):   {party_counts}")
+    if VOTER_POPULATION_SIZE > 0:
+        print(
+            f"[SETUP] {N_CITIZENS} eleitores lógicos em {len(voters)} populações "
+            f"(até {VOTER_POPULATION_SIZE} por agente)."
+        )
+
+    start_tick = 0
+    if cfg.INFLUENCE_FAST_FORWARD != "off":
+        start_tick = fast_forward_influence(voters, G, cfg.INFLUENCE_FAST_FORWARD)
 
     # ==========================
     # Instancia e Conecta Agentes Centrais
@@ -217,14 +367,56 @@ async def main():
         supervisor_jid=sup_jid,
     )
 
-    # 2. Media
-    media = MediaAgent(
-        media_jid,
-        PASSWORD,
-        supervisor_jid=sup_jid,
-        authority_jid=auth_jid,
-        voter_jids=[str(v.jid) for v in voters],
-    )
+    # 1b. Autoridades distritais (contagem em paralelo; a nacional soma)
+    district_authorities = []
+    if district_jids:
+        sizes = [end - start for start, end in districts]
+        seats = list(cfg.DISTRICT_SEATS) if cfg.DISTRICT_SEATS else apportion_seats(cfg.N_SEATS, sizes)
+        if len(seats) != len(districts):
+            raise ValueError(f"DISTRICT_SEATS tem {len(seats)} entradas para {len(districts)} distritos")
+        for d, (d_jid, n_seats, size) in enumerate(zip(district_jids, seats, sizes), start=1):
+            district_authorities.append(ElectionAuthorityAgent(
+                d_jid,
+                PASSWORD,
+                supervisor_jid=sup_jid,
+                district=d,
+                national_jid=auth_jid,
+                n_seats=n_seats,
+                n_citizens=size,
+            ))
+        authority.district_jids = district_jids
+        print(f"[SETUP] {len(districts)} distritos: eleitores={sizes}, cadeiras={seats} (total {sum(seats)}).")
+
+    # 2. Media (uma por entrada de MEDIA_OUTLETS, cada uma com a sua audiência)
+    outlets = media_outlets(voter_jids)
+    # Índice só quando alguma Mídia segmenta; sem ele, as Mídias sorteiam em voter_jids
+    audience_index = build_audience_index(voters, G, outlets) if any(o["targeting"] for o in outlets) else None
+    medias = []
+    for outlet in outlets:
+        media = MediaAgent(
+            outlet["jid"],
+            PASSWORD,
+            supervisor_jid=sup_jid,
+            authority_jid=auth_jid,
+            voter_jids=outlet["audience"],
+            ideology_bias=outlet["ideology_bias"],
+            bias_strength=outlet["bias_strength"],
+            news_ratio=outlet["news_ratio"],
+            fake_ratio=outlet["fake_ratio"],
+            initial_budget=outlet["initial_budget"],
+            policy_file=outlet["policy_file"],
+            targeting=outlet["targeting"],
+        )
+        media.voter_directory = directory
+        media.audience_index = audience_index
+        if len(outlets) > 1:
+            media.chart_suffix = f" {get_sender_name(outlet['jid'])}"
+        medias.append(media)
+    if len(outlets) > 1:
+        print(
+            f"[SETUP] {len(outlets)} Mídias: "
+            + ", ".join(f"{get_sender_name(o['jid'])}={len(o['audience'])} eleitores ({o['ideology_bias']})" for o in outlets)
+        )
 
     # 3. Supervisor
     supervisor = SupervisorAgent(
@@ -233,47 +425,80 @@ async def main():
     )
 
     # Wiring Supervisor: Injeção de dependências (IMPORTANTE)
-    supervisor.voter_jids = [str(v.jid) for v in voters]
+    supervisor.voter_jids = voter_jids
+    supervisor.voter_directory = directory
+    supervisor.audience_index = audience_index  # reclassifica a ideologia com as respostas do T10
     supervisor.voter_party_map = voter_party_map
-    supervisor.media_jid = media_jid
+    supervisor.media_jids = [o["jid"] for o in outlets]
     supervisor.authority_jid = auth_jid
     supervisor.n_candidates = N_CANDIDATES_TO_PROMOTE
+    supervisor.start_tick = start_tick
 
     # ==========================
     # Start dos agentes
     # ==========================
 
-    # 1) Authority e Media (Agentes de serviço)
+    t_boot = time.perf_counter()
+
+    # Assinantes do broadcast PubSub (inscrevem-se ao conectar)
+    for ag in voters + medias + [authority]:
+        ag.pubsub_subscriber = True
+
+    # 1) Supervisor (Controlador Temporal): primeiro, para o nó PubSub existir
+    #    quando os assinantes se inscreverem; o AutoStart espera voters_ready
+    await safe_start(supervisor, get_sender_name(sup_jid).upper())
+
+    # 2) Authority e Media (Agentes de serviço)
     await safe_start(authority, get_sender_name(auth_jid).upper())
-    await safe_start(media, get_sender_name(media_jid).upper())
+    await asyncio.gather(*(safe_start(d, get_sender_name(str(d.jid)).upper()) for d in district_authorities))
+    await asyncio.gather(*(safe_start(m, get_sender_name(str(m.jid)).upper()) for m in medias))
 
-    # 2) Voters
+    # 3) Voters
     voter_start_tasks = []
-    for idx, v in enumerate(voters, start=1):
-        label = f"VOTER_{idx}"
+    for v in voters:
+        label = get_sender_name(str(v.jid)).upper()
         voter_start_tasks.append(safe_start(v, label))
 
     await asyncio.gather(*voter_start_tasks)
 
-    # 3) Supervisor (Controlador Temporal)
-    await safe_start(supervisor, get_sender_name(sup_jid).upper())
+    supervisor.pubsub_subscribers_ok = all(ag.pubsub_subscribed for ag in voters + medias + [authority])
+    supervisor.voters_ready.set()
+    t_run = time.perf_counter()
+    print(f"[BOOT] {len(voters) + len(district_authorities) + len(medias) + 2} agentes iniciados em {t_run - t_boot:.1f}s.")
 
     # ===============================================
     # EXECUÇÃO AUTOMÁTICA DA SIMULAÇÃO (T0 -> T51)
     # ===============================================
     total_run_time = (cfg.TICK_DURATION * (cfg.TOTAL_TICKS + 5)) + 30 # (cfg.TOTAL_TICKS + 1)) + 15 em teste / (cfg.TOTAL_TICKS + 5)) + 30 em simulação real
+    if max_run_seconds:
+        total_run_time = max_run_seconds
     print(
         f"\n[EXEC] Simulação rodará automaticamente até T{cfg.TOTAL_TICKS} "
-        f"por {total_run_time:.1f} segundos."
+        f"(no máximo {total_run_time:.1f} segundos; encerra ao receber os resultados)."
     )
-    await asyncio.sleep(total_run_time)
+    # Encerra assim que o Supervisor recebe os resultados oficiais
+    try:
+        await asyncio.wait_for(supervisor.results_ready.wait(), timeout=total_run_time)
+        print("[EXEC] Resultados oficiais recebidos pelo Supervisor.")
+    except asyncio.TimeoutError:
+        print("[EXEC][ERRO] Tempo máximo atingido sem resultados oficiais.")
+    t_done = time.perf_counter()
+
+    if PROFILER.enabled:
+        PROFILER.stop()
+        print("\n[PROFILE] Tempo ocupado por behaviour (sem esperas em receive/sleep):")
+        for line in PROFILER.report_lines():
+            print(f"[PROFILE]   {line}")
+        PROFILER.save(cfg.PROFILE_FILE, cfg.PROFILE_COLLAPSED_FILE)
+        print(f"[PROFILE] Resumo: {cfg.PROFILE_FILE} | pilhas (flamegraph): {cfg.PROFILE_COLLAPSED_FILE}")
 
     # ===============================================
     # Shutdown
     # ===============================================
     print("\n[SHUTDOWN] Encerrando todos os agentes...")
 
-    all_agents = voters + [supervisor, media, authority]
+    all_agents = voters + [supervisor, authority] + medias + district_authorities
+    traces = trace_footprint(all_agents)
 
     shutdown_tasks = []
     for ag in all_agents:
@@ -281,9 +506,36 @@ async def main():
 
     await asyncio.gather(*shutdown_tasks, return_exceptions=True)
 
+    # Métricas de mensagens (por tipo de agente × protocolo × direção, filas)
+    print("\n[METRICS] Mensagens por tipo de agente/protocolo e filas:")
+    for line in METRICS.report_lines():
+        print(f"[METRICS]   {line}")
+    if cfg.MESSAGE_METRICS_FILE:
+        METRICS.save(cfg.MESSAGE_METRICS_FILE)
+        print(f"[METRICS] Métricas salvas em: {cfg.MESSAGE_METRICS_FILE}")
+    print(
+        f"[METRICS] Traces (política {traces['policy']}): {traces['entries']} eventos, "
+        f"~{traces['bytes'] / 2**20:.1f} MiB"
+    )
+
+    # Aguarda gráficos pendentes da Mídia (renderizados fora do event loop)
+    await asyncio.get_running_loop().run_in_executor(None, charts.wait_pending)
+
     await asyncio.sleep(2)
     print("[SHUTDOWN] Simulação Encerrada.")
 
+    return {
+        "n_citizens": N_CITIZENS,
+        "setup_seconds": t_boot - t_setup,
+        "boot_seconds": t_run - t_boot,
+        "run_seconds": t_done - t_run,
+        "results": supervisor.results,
+        "timing": supervisor.timing.summary()["histograms"],
+        "tick_busy_ms": supervisor.timing.busy_samples(),
+        "messages": METRICS.by_kind(),
+        "traces": traces,
+    }
+
 
 if __name__ == "__main__":
     spade.run(main())
@@ -0,0 +1,62 @@
+# python_spade/scenarios.py
+"""
+Cenários experimentais C0..C3 (ver comentários em common.py e RESULTS/).
+
+Cada cenário é um dicionário de overrides sobre common.py, aplicado pelos
+motores sem XMPP (headless_sim.build_params).
+"""
+
+PARTY_PERCENTAGES_C0 = {"PED": 0.10, "PDD": 0.15, "PCE": 0.40, "PDE": 0.15, "PEE": 0.10, "SPD": 0.10}
+PARTY_PERCENTAGES_C2 = {"PED": 0.40, "PDD": 0.05, "PCE": 0.05, "PDE": 0.05, "PEE": 0.40, "SPD": 0.05}
+PARTY_PERCENTAGES_C3 = {"PED": 0.05, "PDD": 0.05, "PCE": 0.60, "PDE": 0.05, "PEE": 0.05, "SPD": 0.20}
+
+SCENARIOS = {
+    # C0: base (mix 70/30, viral moderado)
+    "C0": {
+        "NEWS_RATIO": 0.70,
+        "FAKE_RATIO": 0.30,
+        "VIRAL_BASE_PROB": 0.15,
+        "VIRAL_MAX_EXTRA_TARGETS": 2,
+        "COST_FAKENEWS_PER_TARGET": 4,
+        "VOTER_OVERLOAD_THRESHOLD": 20,
+        "FAKENEWS_BACKFIRE_CREDIBILITY": 0.7,
+        "P_DETECT_BASE": 0.7,
+        "PARTY_PERCENTAGES": PARTY_PERCENTAGES_C0,
+    },
+    # C1: desinformação barata e viral (mix 10/90)
+    "C1": {
+        "NEWS_RATIO": 0.10,
+        "FAKE_RATIO": 0.90,
+        "VIRAL_BASE_PROB": 0.50,
+        "VIRAL_MAX_EXTRA_TARGETS": 10,
+        "COST_FAKENEWS_PER_TARGET": 1,
+        "VOTER_OVERLOAD_THRESHOLD": 60,
+        "FAKENEWS_BACKFIRE_CREDIBILITY": 0.7,
+        "P_DETECT_BASE": 0.7,
+        "PARTY_PERCENTAGES": PARTY_PERCENTAGES_C0,
+    },
+    # C2: eleitorado polarizado (mix 50/50)
+    "C2": {
+        "NEWS_RATIO": 0.50,
+        "FAKE_RATIO": 0.50,
+        "VIRAL_BASE_PROB": 0.15,
+        "VIRAL_MAX_EXTRA_TARGETS": 10,
+        "COST_FAKENEWS_PER_TARGET": 4,
+        "VOTER_OVERLOAD_THRESHOLD": 20,
+        "FAKENEWS_BACKFIRE_CREDIBILITY": 0.7,
+        "P_DETECT_BASE": 0.7,
+        "PARTY_PERCENTAGES": PARTY_PERCENTAGES_C2,
+    },
+    # C3: eleitorado centrista e fiscalização forte (mix 90/10)
+    "C3": {
+        "NEWS_RATIO": 0.90,
+        "FAKE_RATIO": 0.10,
+        "VIRAL_BASE_PROB": 0.05,
+        "VIRAL_MAX_EXTRA_TARGETS": 10,
+        "COST_FAKENEWS_PER_TARGET": 4,
+        "VOTER_OVERLOAD_THRESHOLD": 60,
+        "FAKENEWS_BACKFIRE_CREDIBILITY": 0.8,
+        "P_DETECT_BASE": 0.95,
+        "PARTY_PERCENTAGES": PARTY_PERCENTAGES_C3,
+    },
+}
@@ -0,0 +1,319 @@
+# python_spade/sensitivity.py
+"""
+Análise de SENSIBILIDADE GLOBAL sobre os parâmetros de common.py.
+
+Métodos:
+  - morris: efeitos elementares (mu*, sigma) com trajetórias OAT num grid de p níveis;
+  - sobol:  índices de primeira ordem (S1, Saltelli 2010) e totais (ST, Jansen)
+            a partir das matrizes A, B e AB_i (N * (k + 2) avaliações).
+
+O desenho é gerado inteiro e despachado em LOTES para o motor vetorizado
+(vectorized_sim.simulate_batch) — ou, com --engine headless, replicação a
+replicação para headless_sim — num pool de processos.
+
+Saídas analisadas: fração de cadeiras por partido, volume de FAKENEWS e de
+NEWS enviados, taxa de abstenção e taxa de voto nulo. Cada ponto do desenho
+é avaliado com uma semente própria, portanto os índices incluem o ruído
+estocástico do modelo; --replicates R avalia cada ponto R vezes e usa a
+média, reduzindo esse ruído.
+
+Uso:
+    python sensitivity.py sobol --n 1024 --workers 8
+    python sensitivity.py morris --trajectories 200
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import common as cfg
+
+# Parâmetro -> (mínimo, máximo)
+DEFAULT_RANGES: Dict[str, Tuple[float, float]] = {
+    "VIRAL_BASE_PROB": (0.0, 0.6),
+    "RL_EPSILON": (0.0, 0.5),
+    "MEDIA_BIAS_STRENGTH": (0.0, 0.3),
+    "P_BASE_ABSTAIN": (0.0, 0.2),
+    "ENGAGEMENT_ABSTAIN_THRESHOLD": (0.05, 0.5),
+    "COST_FAKENEWS_PER_TARGET": (1.0, 10.0),
+}
+
+# RL_EPSILON, MEDIA_BIAS_STRENGTH e COST_FAKENEWS só afetam a Mídia em modo Q-Learning
+DEFAULT_BASE_OVERRIDES: Dict[str, Any] = {"MEDIA_USE_MANUAL_RATIOS": False}
+
+
+# ==========================
+# Desenhos experimentais
+# ==========================
+def scale(unit: np.ndarray, ranges: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """Mapeia pontos do cubo unitário para os intervalos dos parâmetros."""
+    lo = np.array([r[0] for r in ranges.values()])
+    hi = np.array([r[1] for r in ranges.values()])
+    return lo + unit * (hi - lo)
+
+
+def sobol_design(n: int, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Desenho de Saltelli: blocos [A, B, AB_1, ..., AB_k] empilhados,
+    total n * (k + 2) linhas. Usa sequência de Sobol (scipy) se disponível.
+    """
+    try:
+        from scipy.stats import qmc
+
+        base = qmc.Sobol(d=2 * k, scramble=True, seed=rng).random(n)
+    except ImportError:
+        base = rng.random((n, 2 * k))
+    a, b = base[:, :k], base[:, k:]
+    blocks = [a, b]
+    for i in range(k):
+        ab = a.copy()
+        ab[:, i] = b[:, i]
+        blocks.append(ab)
+    return np.vstack(blocks)
+
+
+def morris_design(r: int, k: int, levels: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    r trajetórias de k+1 pontos num grid de `levels` níveis; em cada passo
+    um único fator anda +-delta. Retorna (r * (k + 1), k) pontos.
+    """
+    delta = levels / (2.0 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)  # inícios que permitem +delta
+    points = np.empty((r, k + 1, k))
+    for t in range(r):
+        direction = rng.choice([-1.0, 1.0], size=k)
+        # Direção negativa parte do ponto deslocado e volta -delta
+        x = rng.choice(grid, size=k) + np.where(direction < 0, delta, 0.0)
+        points[t, 0] = x
+        for step, factor in enumerate(rng.permutation(k), start=1):
+            x = x.copy()
+            x[factor] += direction[factor] * delta
+            points[t, step] = x
+    return points.reshape(r * (k + 1), k)
+
+
+# ==========================
+# Avaliação em lotes
+# ==========================
+def _outputs_from_batch(out: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Fração das cadeiras em disputa em cada ponto (N_SEATS pode vir de base_overrides)
+    seats = out["seats"] / out["n_seats"][:, None].astype(float)
+    outputs = {f"seats_{p}": seats[:, i] for i, p in enumerate(cfg.ALL_PARTIES)}
+    received = np.maximum(out["total_votes_received"], 1)
+    outputs["fakenews_sent"] = out["fakenews_sent"].astype(float)
+    outputs["news_sent"] = out["news_sent"].astype(float)
+    outputs["abstention_rate"] = out["abstentions"] / out["total_citizens"]
+    outputs["null_rate"] = out["null_votes"] / received
+    return outputs
+
+
+def evaluate_chunk(args: Tuple[str, List[str], np.ndarray, Dict[str, Any], int]) -> Dict[str, np.ndarray]:
+    """Avalia um lote de pontos do desenho (executado num processo do pool)."""
+    engine, names, values, base_overrides, seed = args
+
+    if engine == "vectorized":
+        import vectorized_sim
+
+        overrides = dict(base_overrides)
+        overrides.update({name: values[:, i] for i, name in enumerate(names)})
+        return _outputs_from_batch(vectorized_sim.simulate_batch(len(values), overrides, seed=seed))
+
+    import headless_sim
+
+    rows, n_seats = [], []
+    for j, point in enumerate(values):
+        overrides = dict(base_overrides)
+        overrides.update({name: float(point[i]) for i, name in enumerate(names)})
+        rows.append(headless_sim.simulate(overrides, seed=f"{seed}:{j}"))
+        n_seats.append(int(headless_sim.build_params(overrides)["N_SEATS"]))
+    seats = np.array([[r["seats_dhondt"].get(p, 0) for p in cfg.ALL_PARTIES] for r in rows])
+    batch = {
+        "seats": seats,
+        "total_votes_received": np.array([r["total_votes_received"] for r in rows]),
+        "fakenews_sent": np.array([r["fakenews_sent"] for r in rows]),
+        "news_sent": np.array([r["news_sent"] for r in rows]),
+        "abstentions": np.array([r["abstentions"] for r in rows]),
+        "null_votes": np.array([r["null_votes"] for r in rows]),
+        "total_citizens": np.array([r["total_citizens"] for r in rows]),
+        "n_seats": np.array(n_seats),
+    }
+    return _outputs_from_batch(batch)
+
+
+def evaluate(
+    design: np.ndarray,
+    ranges: Dict[str, Tuple[float, float]],
+    base_overrides: Dict[str, Any],
+    engine: str = "vectorized",
+    batch_size: int = 2000,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    replicates: int = 1,
+) -> Dict[str, np.ndarray]:
+    """Avalia todas as linhas do desenho (cubo unitário) em lotes paralelos."""
+    values = np.repeat(scale(design, ranges), replicates, axis=0)
+    names = list(ranges)
+    chunks = [
+        (engine, names, values[i:i + batch_size], base_overrides, seed + n)
+        for n, i in enumerate(range(0, len(values), batch_size))
+    ]
+    workers = workers or os.cpu_count() or 1
+    print(f"[SENS] {len(values)} avaliações em {len(chunks)} lotes ({engine}, workers={workers})")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(evaluate_chunk, chunks))
+
+    return {
+        key: np.concatenate([r[key] for r in results]).reshape(-1, replicates).mean(axis=1)
+        for key in results[0]
+    }
+
+
+# ==========================
+# Índices
+# ==========================
+def sobol_indices(y: np.ndarray, n: int, k: int) -> Dict[str, np.ndarray]:
+    """S1 (Saltelli 2010) e ST (Jansen 1999) a partir de [A, B, AB_1..AB_k]."""
+    f_a, f_b = y[:n], y[n:2 * n]
+    var = np.var(np.concatenate([f_a, f_b]))
+    s1, st = np.zeros(k), np.zeros(k)
+    if var <= 0.0:
+        return {"S1": s1, "ST": st}
+    for i in range(k):
+        f_ab = y[(2 + i) * n:(3 + i) * n]
+        s1[i] = np.mean(f_b * (f_ab - f_a)) / var
+        st[i] = 0.5 * np.mean((f_a - f_ab) ** 2) / var
+    return {"S1": s1, "ST": st}
+
+
+def morris_indices(y: np.ndarray, design: np.ndarray, r: int, k: int) -> Dict[str, np.ndarray]:
+    """mu, mu* e sigma dos efeitos elementares por fator."""
+    y = y.reshape(r, k + 1)
+    pts = design.reshape(r, k + 1, k)
+    effects = np.zeros((r, k))
+    for t in range(r):
+        for step in range(1, k + 1):
+            diff = pts[t, step] - pts[t, step - 1]
+            factor = int(np.argmax(np.abs(diff)))
+            effects[t, factor] = (y[t, step] - y[t, step - 1]) / diff[factor]
+    return {
+        "mu": effects.mean(axis=0),
+        "mu_star": np.abs(effects).mean(axis=0),
+        "sigma": effects.std(axis=0, ddof=1) if r > 1 else np.zeros(k),
+    }
+
+
+# ==========================
+# Estudos
+# ==========================
+def run_study(
+    method: str,
+    ranges: Dict[str, Tuple[float, float]] = DEFAULT_RANGES,
+    base_overrides: Optional[Dict[str, Any]] = None,
+    n: int = 1024,
+    trajectories: int = 100,
+    levels: int = 4,
+    engine: str = "vectorized",
+    batch_size: int = 2000,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    replicates: int = 1,
+) -> Dict[str, Any]:
+    """Gera o desenho, avalia em lotes e calcula os índices por saída."""
+    rng = np.random.default_rng(seed)
+    k = len(ranges)
+    base_overrides = dict(DEFAULT_BASE_OVERRIDES if base_overrides is None else base_overrides)
+
+    if method == "sobol":
+        design = sobol_design(n, k, rng)
+    elif method == "morris":
+        design = morris_design(trajectories, k, levels, rng)
+    else:
+        raise ValueError(f"Método desconhecido: {method}")
+
+    start = time.perf_counter()
+    outputs = evaluate(design, ranges, base_overrides, engine, batch_size, workers, seed, replicates)
+    elapsed = time.perf_counter() - start
+
+    indices: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, y in outputs.items():
+        if method == "sobol":
+            idx = sobol_indices(y, n, k)
+        else:
+            idx = morris_indices(y, design, trajectories, k)
+        indices[name] = {
+            param: {key: float(values[i]) for key, values in idx.items()}
+            for i, param in enumerate(ranges)
+        }
+
+    print(f"[SENS] {len(design) * replicates} avaliações concluídas em {elapsed:.1f}s")
+    return {
+        "method": method,
+        "engine": engine,
+        "evaluations": int(len(design) * replicates),
+        "replicates": replicates,
+        "seconds": elapsed,
+        "ranges": {k_: list(v) for k_, v in ranges.items()},
+        "base_overrides": base_overrides,
+        "indices": indices,
+    }
+
+
+def print_report(report: Dict[str, Any], outputs: Optional[List[str]] = None):
+    keys = ("S1", "ST") if report["method"] == "sobol" else ("mu_star", "sigma")
+    for out_name, per_param in report["indices"].items():
+        if outputs and out_name not in outputs:
+            continue
+        print(f"\n[SENS] {out_name}")
+        for param, vals in per_param.items():
+            print(f"    {param:<30} " + "  ".join(f"{k}={vals[k]:+.3f}" for k in keys))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sensibilidade global (Sobol/Morris).")
+    parser.add_argument("method", choices=["sobol", "morris"])
+    parser.add_argument("--n", type=int, default=1024, help="Amostras base do Sobol (N)")
+    parser.add_argument("--trajectories", type=int, default=100, help="Trajetórias do Morris (r)")
+    parser.add_argument("--levels", type=int, default=4, help="Níveis do grid do Morris (p)")
+    parser.add_argument("--engine", choices=["vectorized", "headless"], default="vectorized")
+    parser.add_argument("--replicates", type=int, default=1, help="Replicações por ponto do desenho")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-citizens", type=int, default=None)
+    parser.add_argument("--manual-ratios", action="store_true", help="Mídia em modo MANUAL (sem RL)")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    base = dict(DEFAULT_BASE_OVERRIDES)
+    if args.manual_ratios:
+        base["MEDIA_USE_MANUAL_RATIOS"] = True
+    if args.n_citizens:
+        base["N_CITIZENS"] = args.n_citizens
+
+    report = run_study(
+        args.method,
+        base_overrides=base,
+        n=args.n,
+        trajectories=args.trajectories,
+        levels=args.levels,
+        engine=args.engine,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        seed=args.seed,
+        replicates=args.replicates,
+    )
+    print_report(report)
+
+    out = args.out or f"sensitivity_{args.method}.json"
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\n[SENS] Relatório salvo em: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# python_spade/sim_agent.py
+"""
+Agente base da simulação (SimAgent) com métricas de mensagens.
+
+Todas as mensagens passam por dois pontos do SPADE:
+  - Agent.dispatch (entrada, via container local ou XMPP);
+  - TraceStore.append, chamado por Behaviour.send logo após o envio (saída).
+
+O SimAgent sobrescreve ambos para contar mensagens por agente × protocolo
+× direção (e por TICK), e mede a profundidade da fila de cada behaviour no
+momento da entrega (marca d'água máxima). Os contadores são globais ao
+processo (METRICS), ficam disponíveis ao vivo na interface web do SPADE
+(/metrics) e são gravados no encerramento (MESSAGE_METRICS_FILE).
+
+O que fica guardado no TraceStore de cada agente segue TRACE_POLICY
+(desligado, ring buffer, amostragem 1-em-N ou filtro por protocolo); o
+custo em memória é estimado por trace_footprint().
+
+Com PROFILE_BEHAVIOURS, cada behaviour adicionado é embrulhado pelo
+behaviour_profiler (tempo ocupado e alocação por classe e por TICK).
+
+Com FORCE_XMPP_ROUTING, o SimAgent desliga a entrega local do container e
+todas as mensagens passam pelo servidor XMPP (modo "xmpp" do benchmark).
+"""
+import datetime
+import json
+import sys
+from collections import Counter, defaultdict, deque
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+import spade
+from spade.message import Message
+from spade.trace import TraceStore
+
+import common as cfg
+from common import get_sender_name
+import sim_pubsub
+from behaviour_profiler import PROFILER
+
+
+def agent_kind(name: str) -> str:
+    """'voter_12' -> 'voter'."""
+    return name.rsplit("_", 1)[0]
+
+
+class MessageMetrics:
+    """Contadores de mensagens e filas, compartilhados por todos os agentes do processo."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tick = -1
+        self.counts: Counter = Counter()          # (agente, protocolo, "in"/"out") -> n
+        self.bytes_out: Counter = Counter()       # protocolo -> bytes de corpo enviados
+        self.per_tick: Dict[int, Counter] = defaultdict(Counter)  # tick -> protocolo -> enviadas
+        self.queue_hwm: Dict[tuple, int] = {}     # (agente, behaviour) -> profundidade máxima
+
+    # ---------------- Caminho quente ----------------
+    def count(self, agent: str, protocol: Optional[str], direction: str, nbytes: int = 0):
+        protocol = protocol or "-"
+        self.counts[(agent, protocol, direction)] += 1
+        if direction == "out":
+            self.per_tick[self.tick][protocol] += 1
+            self.bytes_out[protocol] += nbytes
+
+    def queue_depth(self, agent: str, behaviour: str, depth: int):
+        key = (agent, behaviour)
+        if depth > self.queue_hwm.get(key, 0):
+            self.queue_hwm[key] = depth
+
+    # ---------------- Leitura ----------------
+    def by_kind(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Totais agregados por tipo de agente: tipo -> protocolo -> direção -> n."""
+        out: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for (agent, protocol, direction), n in self.counts.items():
+            slot = out.setdefault(agent_kind(agent), {}).setdefault(protocol, {"in": 0, "out": 0})
+            slot[direction] += n
+        return out
+
+    def queue_summary(self, top: int = 10) -> Dict[str, Any]:
+        per_behaviour: Dict[str, int] = {}
+        for (agent, behaviour), depth in self.queue_hwm.items():
+            key = f"{agent_kind(agent)}.{behaviour}"
+            per_behaviour[key] = max(per_behaviour.get(key, 0), depth)
+        worst = sorted(self.queue_hwm.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return {
+            "max_by_behaviour": per_behaviour,
+            "top": [{"agent": a, "behaviour": b, "depth": d} for (a, b), d in worst],
+        }
+
+    def snapshot(self, agent: Optional[str] = None) -> Dict[str, Any]:
+        if agent is not None:
+            mine = {f"{p}:{d}": n for (a, p, d), n in self.counts.items() if a == agent}
+            hwm = {b: d for (a, b), d in self.queue_hwm.items() if a == agent}
+            return {"agent": agent, "tick": self.tick, "counts": mine, "queue_hwm": hwm}
+        return {
+            "tick": self.tick,
+            "by_kind": self.by_kind(),
+            "bytes_out": dict(self.bytes_out),
+            "per_tick": {str(t): dict(c) for t, c in sorted(self.per_tick.items())},
+            "queues": self.queue_summary(),
+        }
+
+    def report_lines(self) -> List[str]:
+        out = []
+        for kind, protocols in sorted(self.by_kind().items()):
+            for protocol, d in sorted(protocols.items()):
+                out.append(f"{kind:<12} {protocol:<20} in={d['in']:<8} out={d['out']}")
+        ticks = [t for t in self.per_tick if t >= 0]
+        if ticks:
+            totals = Counter()
+            peak = Counter()
+            for t in ticks:
+                for protocol, n in self.per_tick[t].items():
+                    totals[protocol] += n
+                    peak[protocol] = max(peak[protocol], n)
+            for protocol, n in sorted(totals.items()):
+                out.append(f"por TICK {protocol:<20} média={n / len(ticks):.1f} pico={peak[protocol]}")
+        for key, depth in sorted(self.queue_summary()["max_by_behaviour"].items()):
+            out.append(f"fila máx. {key:<40} {depth}")
+        return out
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.snapshot(), fh, indent=2)
+
+
+METRICS = MessageMetrics()
+
+
+class SimTraceStore(TraceStore):
+    """
+    TraceStore que conta a saída (Behaviour.send chama append() após cada
+    envio) e aplica a política de trace (TRACE_POLICY) antes de guardar:
+      - "off":       não guarda nada (só os contadores de METRICS);
+      - "ring":      últimos TRACE_RING_SIZE eventos (deque, O(1) por evento);
+      - "sample":    1 a cada TRACE_SAMPLE_EVERY eventos;
+      - "protocols": só os protocolos em TRACE_PROTOCOLS.
+    As entradas são registradas por SimAgent.dispatch via record().
+    """
+
+    POLICIES = ("off", "ring", "sample", "protocols")
+
+    def __init__(self, agent_name: str, policy: Optional[str] = None):
+        self.policy = policy or cfg.TRACE_POLICY
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"TRACE_POLICY inválida: {self.policy!r} (use {', '.join(self.POLICIES)})")
+        super().__init__(0 if self.policy == "off" else cfg.TRACE_RING_SIZE)
+        self.agent_name = agent_name
+        self.sample_every = max(1, int(cfg.TRACE_SAMPLE_EVERY))
+        self.protocols = frozenset(cfg.TRACE_PROTOCOLS)
+        self.seen = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.store = deque(maxlen=self.size)
+
+    def all(self, limit: Optional[int] = None) -> List:
+        return list(islice(self.store, limit))[::-1]
+
+    def append(self, event: Message, category: Optional[str] = None) -> None:
+        METRICS.count(self.agent_name, event.get_metadata("protocol"), "out", len(event.body or ""))
+        self.record(event, category)
+
+    def keep(self, event: Message) -> bool:
+        if self.policy == "ring":
+            return True
+        if self.policy == "sample":
+            self.seen += 1
+            return self.seen % self.sample_every == 0
+        if self.policy == "protocols":
+            return event.get_metadata("protocol") in self.protocols
+        return False
+
+    def record(self, event: Message, category: Any = None) -> None:
+        """Guarda o evento se a política permitir (category só vira str se guardado)."""
+        if not self.keep(event):
+            return
+        self.store.appendleft((datetime.datetime.now(), event, None if category is None else str(category)))
+
+
+def _deep_sizeof(obj: Any, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(x, seen) for x in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+def trace_footprint(agents: List[spade.agent.Agent], sample: int = 50) -> Dict[str, Any]:
+    """
+    Memória estimada dos traces: nº de eventos guardados × tamanho médio de
+    uma amostra (tupla + datetime + Message, sem contar objetos compartilhados
+    entre agentes, como JIDs internados).
+    """
+    entries = sum(len(ag.traces.store) for ag in agents)
+    probe = [e for ag in agents for e in islice(ag.traces.store, 2)][:sample]
+    per_entry = (sum(_deep_sizeof(e, set()) for e in probe) / len(probe)) if probe else 0.0
+    policies = sorted({getattr(ag.traces, "policy", "spade") for ag in agents})
+    return {
+        "policy": ",".join(policies),
+        "entries": entries,
+        "bytes_per_entry": per_entry,
+        "bytes": int(entries * per_entry),
+    }
+
+
+# Metadado que endereça um eleitor lógico dentro de um VoterPopulationAgent
+VOTER_ID_KEY = "voter_id"
+
+
+class VoterDirectory:
+    """
+    Roteamento de eleitores lógicos: JID do eleitor -> JID do agente que o
+    hospeda. Um VoterAgent hospeda a si mesmo; um VoterPopulationAgent
+    hospeda milhares, endereçados pelo metadado VOTER_ID_KEY.
+    """
+
+    def __init__(self):
+        self._host: Dict[str, str] = {}
+        self._hosts: Dict[str, None] = {}  # ordenado, sem repetição
+
+    def add(self, voter_jid: str, host_jid: str):
+        self._host[voter_jid] = host_jid
+        self._hosts[host_jid] = None
+
+    def host_of(self, voter_jid: str) -> str:
+        return self._host.get(voter_jid, voter_jid)
+
+    def hosts(self) -> List[str]:
+        """Destinos de um broadcast a todos os eleitores (uma mensagem por host)."""
+        return list(self._hosts)
+
+    def address(self, msg: Message, voter_jid: str) -> Message:
+        """Preenche o destino de `msg` para o eleitor lógico `voter_jid`."""
+        host = self._host.get(voter_jid, voter_jid)
+        msg.to = host
+        if host != voter_jid:
+            msg.set_metadata(VOTER_ID_KEY, voter_jid)
+        return msg
+
+
+class XmppOnlyContainer:
+    """Container que nunca entrega localmente: todo envio vai pelo servidor XMPP."""
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getattr__(self, name):
+        return getattr(self._container, name)
+
+    async def send(self, msg: Message, behaviour) -> None:
+        await behaviour._xmpp_send(msg=msg)
+
+
+class SimAgent(spade.agent.Agent):
+    """Agente SPADE com contagem de mensagens e marca d'água das filas."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metric_name = get_sender_name(str(self.jid))
+        self.traces = SimTraceStore(self.metric_name)
+        if cfg.FORCE_XMPP_ROUTING:
+            self.set_container(XmppOnlyContainer(self.container))
+        # Broadcast via PubSub (sim_pubsub.py): definidos pelo run_spade_sim.py antes do start()
+        self.pubsub_owner = False       # cria o nó (Supervisor)
+        self.pubsub_subscriber = False  # recebe TICKs/anúncios pelo nó
+        self.pubsub_subscribed = False
+
+    async def _hook_plugin_after_connection(self) -> None:
+        await super()._hook_plugin_after_connection()
+        if cfg.BROADCAST_MODE == "pubsub" and (self.pubsub_owner or self.pubsub_subscriber):
+            sim_pubsub.enable(self)
+            if self.pubsub_owner:
+                await sim_pubsub.create_node(self)
+            self.pubsub_subscribed = await sim_pubsub.subscribe(self)
+
+    def _message_received(self, msg) -> List:
+        if sim_pubsub.has_event(msg):
+            return []  # entregue por sim_pubsub.on_publish
+        return super()._message_received(msg)
+
+    def add_behaviour(self, behaviour, template=None) -> None:
+        if PROFILER.enabled:
+            PROFILER.wrap(agent_kind(self.metric_name), behaviour)
+        super().add_behaviour(behaviour, template)
+
+    def dispatch(self, msg: Message) -> List:
+        """
+        Igual a Agent.dispatch, mas entrega direto na fila (put_nowait em vez
+        de uma tarefa por mensagem), o que torna a profundidade medida exata.
+        """
+        METRICS.count(self.metric_name, msg.get_metadata("protocol"), "in")
+        matched = False
+        for behaviour in self.behaviours:
+            if behaviour.match(msg):
+                behaviour.queue.put_nowait(msg)
+                METRICS.queue_depth(self.metric_name, type(behaviour).__name__, behaviour.queue.qsize())
+                self.traces.record(msg, category=behaviour)
+                matched = True
+        if not matched:
+            self.traces.record(msg)
+        return []
+
+    # ---------------- Interface web ----------------
+    async def _metrics_controller(self, request):
+        return METRICS.snapshot()
+
+    async def _agent_metrics_controller(self, request):
+        return METRICS.snapshot(agent=request.match_info["agent"])
+
+    def add_metrics_routes(self):
+        """Registra /metrics (todos os agentes) e /metrics/{agent} na interface web."""
+        self.web.add_get("/metrics", self._metrics_controller, None)
+        self.web.add_get("/metrics/{agent}", self._agent_metrics_controller, None)
+        self.web.add_menu_entry("Métricas", "/metrics", "fa fa-chart-bar")
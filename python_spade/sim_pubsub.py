@@ -0,0 +1,122 @@
+# python_spade/sim_pubsub.py
+"""
+Broadcast via PubSub (XEP-0060) para TICKs e anúncios de candidatos.
+
+O Supervisor cria o nó PUBSUB_NODE no serviço PUBSUB_SERVICE e publica cada
+broadcast UMA vez; o servidor XMPP entrega a notificação a todos os
+inscritos (hosts de eleitores, Mídia e Autoridade), de modo que o custo do
+fan-out no Supervisor não cresce com a população.
+
+O item publicado carrega a mensagem SPADE inteira:
+    <sim xmlns="urn:prodei012:sim" protocol=".." performative=".." stage=".."
+         sender="supervisor_1@localhost">TICK_5</sim>
+e o assinante a converte de volta em spade.message.Message e a entrega
+pelo SimAgent.dispatch, como se tivesse chegado direto: os behaviours não
+mudam.
+
+Antes de usar o PubSub, o Supervisor publica uma sonda e espera recebê-la
+ele mesmo; se o servidor não entregar (o pyjabber 0.4.5 não atualiza os nós
+e inscrições criados em execução), volta ao envio direto.
+"""
+import asyncio
+from typing import Dict, Optional
+from xml.etree import ElementTree as ET
+
+from spade.message import Message
+
+import common as cfg
+
+SIM_NS = "urn:prodei012:sim"
+PROBE_PROTOCOL = "PUBSUB_PROBE"
+_MD_KEYS = ("protocol", "performative", "stage")
+
+
+def has_event(xmpp_msg) -> bool:
+    """True se a stanza é uma notificação PubSub (tratada por on_publish, não por dispatch)."""
+    return xmpp_msg.xml.find("{http://jabber.org/protocol/pubsub#event}event") is not None
+
+
+def to_payload(body: str, metadata: Dict[str, str], sender: str) -> ET.Element:
+    el = ET.Element(f"{{{SIM_NS}}}sim", {k: v for k, v in metadata.items() if k in _MD_KEYS})
+    el.set("sender", sender)
+    el.text = body
+    return el
+
+
+def from_payload(payload: ET.Element, to: str) -> Message:
+    msg = Message(to=to, sender=payload.get("sender"), body=payload.text or "")
+    for key in _MD_KEYS:
+        if payload.get(key) is not None:
+            msg.set_metadata(key, payload.get(key))
+    return msg
+
+
+def _plugin(agent):
+    client = agent.client
+    if "xep_0060" not in client.plugin:
+        client.register_plugin("xep_0060")
+    return client.plugin["xep_0060"]
+
+
+def enable(agent) -> None:
+    """Registra o plugin e o handler que converte notificações em mensagens do agente."""
+    _plugin(agent)
+    agent.client.add_event_handler("pubsub_publish", lambda m: on_publish(agent, m))
+
+
+def on_publish(agent, xmpp_msg) -> None:
+    items = xmpp_msg["pubsub_event"]["items"]
+    if items["node"] != cfg.PUBSUB_NODE:
+        return
+    # items.iterables (lista), não "for item in items": a stanza é o próprio iterador
+    # e o slixmpp já está iterando sobre ela ao disparar o evento
+    for item in items.iterables:
+        payload = item["payload"]
+        if payload is None or payload.tag != f"{{{SIM_NS}}}sim":
+            continue
+        if payload.get("protocol") == PROBE_PROTOCOL:
+            probe = getattr(agent, "pubsub_probe", None)
+            if probe is not None:
+                probe.set()
+            continue
+        if payload.get("sender") == str(agent.jid):
+            continue  # o Supervisor também é assinante (para a sonda)
+        agent.dispatch(from_payload(payload, str(agent.jid)))
+
+
+async def create_node(agent, timeout: float = 5.0) -> bool:
+    try:
+        await _plugin(agent).create_node(cfg.PUBSUB_SERVICE, cfg.PUBSUB_NODE, timeout=timeout)
+        return True
+    except Exception as e:
+        if "conflict" in repr(e):  # nó já existe
+            return True
+        return False
+
+
+async def subscribe(agent, timeout: float = 5.0) -> bool:
+    try:
+        await _plugin(agent).subscribe(cfg.PUBSUB_SERVICE, cfg.PUBSUB_NODE, timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def publish(agent, body: str, metadata: Dict[str, str], timeout: float = 5.0) -> None:
+    payload = to_payload(body, metadata, str(agent.jid))
+    await _plugin(agent).publish(cfg.PUBSUB_SERVICE, cfg.PUBSUB_NODE, payload=payload, timeout=timeout)
+
+
+async def probe(agent, wait: float = 2.0) -> Optional[str]:
+    """Publica uma sonda e espera a própria notificação. Devolve o motivo da falha, ou None."""
+    agent.pubsub_probe = asyncio.Event()
+    try:
+        await publish(agent, "PROBE", {"protocol": PROBE_PROTOCOL})
+        await asyncio.wait_for(agent.pubsub_probe.wait(), timeout=wait)
+        return None
+    except asyncio.TimeoutError:
+        return f"notificação não recebida em {wait:.0f}s"
+    except Exception as e:
+        return repr(e)
+    finally:
+        agent.pubsub_probe = None
@@ -1,10 +1,11 @@
 # python_spade/supervisor_agent.py
 import asyncio
+import heapq
 import json
+import math
 import random
 from typing import List, Tuple, Dict, Optional
 
-import spade
 from spade.behaviour import CyclicBehaviour, OneShotBehaviour
 from spade.message import Message
 from spade.template import Template
@@ -23,9 +24,20 @@ from common import (
     MEDIA_PREFIX, 
     N_SEATS, 
     PROTOCOL_CAMPAIGN, # Necessário para _request_media_report
+    TICK_TIMING_FILE,
+    SUPERVISOR_WEB_PORT,
+    BROADCAST_MODE,
+    PUBSUB_SERVICE,
+    PUBSUB_NODE,
+    ENGAGEMENT_QUORUM,
+    ENGAGEMENT_TIMEOUT,
 )
+import sim_pubsub
+from sim_agent import METRICS, SimAgent, VoterDirectory, VOTER_ID_KEY
+from audience import AudienceIndex
+from tick_timing import TickTimer
 
-class SupervisorAgent(spade.agent.Agent):
+class SupervisorAgent(SimAgent):
     """
     Orquestrador AUTO-REGULADO:
       - Emite TICKs (T0..T51) automaticamente.
@@ -41,6 +53,7 @@ class SupervisorAgent(spade.agent.Agent):
         self.tick_duration: float   = TICK_DURATION
         self.n_candidates: int      = 3
         self.autostart_delay: float = 3.0
+        self.start_tick: int        = 0  # 10 com INFLUENCE_FAST_FORWARD (T0..T9 já aplicados)
         
         # ESTADO
         self._tick: int     = 0
@@ -48,23 +61,46 @@ class SupervisorAgent(spade.agent.Agent):
 
         # CONEXÕES (Injetado pelo run_spade_sim.py)
         self.voter_jids: List[str] = []
-        self.media_jid: Optional[str] = None
+        self.voter_directory: Optional[VoterDirectory] = None  # eleitores lógicos -> agente hospedeiro
+        self.audience_index: Optional[AudienceIndex] = None    # segmentos das Mídias (audience.py)
+        self.media_jids: List[str] = []
         self.authority_jid: Optional[str] = None
 
         # Dados auxiliares
         self.voter_party_map: Dict[str, str] = {}    
         self.candidate_jids: List[str]       = []
 
-        # Coleta T10
-        self._engagement_replies: List[Tuple[str, float]] = []
+        # Coleta T10: min-heap com os n maiores (engagement, JID), respostas
+        # contadas e futuro resolvido quando o quórum de respostas chega
+        self._engagement_top: List[Tuple[float, str]] = []
+        self._engagement_count: int = 0
+        self._engagement_target: int = 0
+        self._engagement_done: Optional[asyncio.Future] = None
+
+        # Instrumentação de tempo dos TICKs
+        self.timing = TickTimer(self.tick_duration)
+
+        # Resultados oficiais (preenchidos pelo ResultsListener)
+        self.results: Optional[Dict] = None
+        self.results_ready = asyncio.Event()
+
+        # Broadcast via PubSub: o Supervisor é dono do nó; run_spade_sim.py informa
+        # se todos os assinantes se inscreveram e libera o AutoStart (voters_ready)
+        self.pubsub_owner = True
+        self.pubsub_subscribers_ok: bool = False
+        self.pubsub_ready: bool = False
+        self.voters_ready = asyncio.Event()
 
     # ---------------- Behaviours ----------------
     class AutoStart(OneShotBehaviour):
         async def run(self):
+            await self.agent.voters_ready.wait()
             print(f"[{get_sender_name(str(self.agent.jid)).upper()}] Aguardando {self.agent.autostart_delay}s para iniciar o ciclo de TICKs...")
             await asyncio.sleep(self.agent.autostart_delay)
+            await self.agent._check_pubsub()
+            self.agent._tick = self.agent.start_tick
             self.agent._started = True
-            print(f"[{get_sender_name(str(self.agent.jid)).upper()}] AutoStart concluído. Iniciando T0.")
+            print(f"[{get_sender_name(str(self.agent.jid)).upper()}] AutoStart concluído. Iniciando T{self.agent.start_tick}.")
 
     class TimeController(CyclicBehaviour):
         async def run(self):
@@ -75,22 +111,34 @@ class SupervisorAgent(spade.agent.Agent):
             if self.agent._tick > TOTAL_TICKS:
                 self.kill()
                 print(f"[{get_sender_name(str(self.agent.jid)).upper()}] *** FASE DE TICKING CONCLUÍDA ***")
+                self.agent._report_timing()
                 return
             
             # --- Executa o Tick atual ---
             t = self.agent._tick
+            timing = self.agent.timing
+            timing.start_tick(t)
+            METRICS.tick = t
             phase = self._phase(t)
             print(f"[{get_sender_name(str(self.agent.jid)).upper()}] TICK {t} de {TOTAL_TICKS}. Fase: {phase}.")
-            await self.agent._broadcast_tick(t, self)
+            with timing.phase("broadcast"):
+                await self.agent._broadcast_tick(t, self)
 
             if t == 10:
-                await self.agent._t10_collect_and_promote(self)
+                with timing.phase("t10_collect"):
+                    await self.agent._t10_collect_and_promote(self)
 
             if t in REPORT_TICKS: # Solicita Relatórios Jornalísticos (TAREFA 4)
-                await self._request_media_report(t)
+                with timing.phase("media_report"):
+                    await self._request_media_report(t)
 
             if t == 51:
-                await self.agent._t51_request_votes_and_count(self)
+                with timing.phase("t51_vote"):
+                    await self.agent._t51_request_votes_and_count(self)
+
+            timing.end_tick()
+            if t == 10 or t in REPORT_TICKS or t == 51:
+                self.agent._print_live_timing()
                 
             self.agent._tick += 1
             await asyncio.sleep(self.agent.tick_duration)
@@ -102,9 +150,9 @@ class SupervisorAgent(spade.agent.Agent):
             return "Dia da Eleição"
         
         async def _request_media_report(self, t: int):
-            """Envia solicitação de relatório jornalístico para a Mídia."""
-            if self.agent.media_jid:
-                m = Message(to=self.agent.media_jid)
+            """Envia solicitação de relatório jornalístico para cada Mídia."""
+            for media_jid in self.agent.media_jids:
+                m = Message(to=media_jid)
                 m.set_metadata("protocol", PROTOCOL_CAMPAIGN)
                 m.set_metadata("performative", "inform")
                 m.set_metadata("stage", "MEDIA_REPORT")
@@ -129,10 +177,12 @@ class SupervisorAgent(spade.agent.Agent):
                     print(f"[{get_sender_name(str(self.agent.jid)).upper()}]   -> VOTOS POR PARTIDO: {data.get('by_party', {})}")
                     print(f"[{get_sender_name(str(self.agent.jid)).upper()}]   -> CADEIRAS (D'HONDT, N={N_SEATS}): {data.get('seats_dhondt', {})}")
                     print(f"[{get_sender_name(str(self.agent.jid)).upper()}]   -> VOTOS POR CANDIDATO: {data.get('by_candidate', {})}")
+                    self.agent.results = data
                 
                 except Exception as e:
                     print(f"[{get_sender_name(str(self.agent.jid)).upper()}] ERRO ao processar resultados: {e}. Payload bruto: {msg.body}")
                 
+                self.agent.results_ready.set()
                 self.kill()
 
 
@@ -149,18 +199,47 @@ class SupervisorAgent(spade.agent.Agent):
                 payload = json.loads(msg.body or "{}")
                 eng = float(payload.get("engagement", 0.0))
             except Exception:
-                eng = 0.0
-            self.agent._engagement_replies.append((str(msg.sender), eng))
+                payload, eng = {}, 0.0
+            voter = msg.get_metadata(VOTER_ID_KEY) or str(msg.sender)
+            self.agent._record_engagement(voter, eng)
+            # A ideologia deriva até o T10: só quem mudou de faixa troca de segmento
+            if self.agent.audience_index is not None and "ideology" in payload:
+                self.agent.audience_index.update(voter, ideology=float(payload["ideology"]))
 
     # --- Funções do Agente, chamadas pelo Behaviour (Brodcast/T10/T51) ---
-    async def _broadcast_tick(self, t: int, beh: CyclicBehaviour):
-        """Envia a mensagem de TICK para todos os agentes relevantes."""
-        body = f"TICK_{t}"
-        md = {"protocol": PROTOCOL_INIT_SIM, "performative": "inform", "stage": "TICK"} 
+    def _voter_hosts(self) -> List[str]:
+        """Destinos dos broadcasts aos eleitores: um por VoterAgent ou por população."""
+        if self.voter_directory is not None:
+            return self.voter_directory.hosts()
+        return list(self.voter_jids)
+
+    async def _check_pubsub(self):
+        """Decide entre PubSub e envio direto antes do T0 (sonda publicada no nó)."""
+        if BROADCAST_MODE != "pubsub":
+            return
+        name = get_sender_name(str(self.jid)).upper()
+        if not (self.pubsub_subscribed and self.pubsub_subscribers_ok):
+            reason = "inscrição no nó falhou"
+        else:
+            reason = await sim_pubsub.probe(self)
+        self.pubsub_ready = reason is None
+        if self.pubsub_ready:
+            print(f"[{name}] Broadcast via PubSub ({PUBSUB_SERVICE}/{PUBSUB_NODE}).")
+        else:
+            print(f"[{name}] PubSub indisponível ({reason}); broadcast direto.")
+
+    async def _broadcast(self, body: str, md: Dict[str, str], beh: CyclicBehaviour):
+        """Envia body/md a eleitores, Mídia e Autoridade: uma publicação PubSub ou uma mensagem por destino."""
+        if self.pubsub_ready:
+            try:
+                await sim_pubsub.publish(self, body, md)
+                METRICS.count(self.metric_name, md.get("protocol"), "out", len(body))
+                return
+            except Exception as e:
+                self.pubsub_ready = False
+                print(f"[{get_sender_name(str(self.jid)).upper()}] Falha ao publicar ({e!r}); broadcast direto.")
 
-        targets = list(self.voter_jids)
-        if self.media_jid:
-            targets.append(self.media_jid)
+        targets = self._voter_hosts() + list(self.media_jids)
         if self.authority_jid:
             targets.append(self.authority_jid)
 
@@ -170,35 +249,65 @@ class SupervisorAgent(spade.agent.Agent):
             m.metadata = dict(md)
             await beh.send(m)
 
+    async def _broadcast_tick(self, t: int, beh: CyclicBehaviour):
+        """Envia a mensagem de TICK para todos os agentes relevantes."""
+        body = f"TICK_{t}"
+        md = {"protocol": PROTOCOL_INIT_SIM, "performative": "inform", "stage": "TICK"} 
+        await self._broadcast(body, md, beh)
+
+    def _record_engagement(self, voter: str, eng: float):
+        """Atualiza o top-N em O(log n) e resolve a coleta ao atingir o quórum."""
+        done = self._engagement_done
+        if done is None:
+            return  # fora da coleta do T10
+        self._engagement_count += 1
+        entry = (eng, voter)
+        if len(self._engagement_top) < self.n_candidates:
+            heapq.heappush(self._engagement_top, entry)
+        elif self._engagement_top and entry > self._engagement_top[0]:
+            heapq.heapreplace(self._engagement_top, entry)
+        if not done.done() and self._engagement_count >= self._engagement_target:
+            done.set_result(self._engagement_count)
+
     async def _t10_collect_and_promote(self, beh: CyclicBehaviour):
         """Passo T10: Coleta engagement e anuncia candidatos."""
         
         print(f"[{get_sender_name(str(self.jid)).upper()}] T10: Coletando Engagement e Promovendo Candidatos...")
         
-        # 1) REQUEST_ENGAGEMENT
-        self._engagement_replies.clear()
+        # 1) REQUEST_ENGAGEMENT (o futuro existe antes da primeira resposta)
+        expected = len(self.voter_jids)
+        self._engagement_top = []
+        self._engagement_count = 0
+        self._engagement_target = min(expected, max(1, math.ceil(ENGAGEMENT_QUORUM * expected)))
+        self._engagement_done = done = asyncio.get_running_loop().create_future()
+        if expected == 0:
+            done.set_result(0)
         base = Message()
         base.set_metadata("protocol", PROTOCOL_REQUEST_ENGAGEMENT)
         base.set_metadata("performative", "query")
         base.body = "SEND_ENGAGEMENT"
 
-        for v in self.voter_jids: 
+        for v in self._voter_hosts():
             m = Message(to=v)
             m.body = base.body
             m.metadata = dict(base.metadata)
             await beh.send(m)
 
-        # 2) Aguarda respostas (até 8 segundos)
-        expected = len(self.voter_jids)
-        deadline = asyncio.get_event_loop().time() + 8.0
-        while asyncio.get_event_loop().time() < deadline and len(self._engagement_replies) < expected:
-            await asyncio.sleep(0.5)
-
-        print(f"[{get_sender_name(str(self.jid)).upper()}] T10: recebidas {len(self._engagement_replies)}/{expected} respostas de engagement.")
-
-        # 3) Seleciona Top-N
-        ordered = sorted(self._engagement_replies, key=lambda t: t[1], reverse=True)
-        promoted = [jid for jid, _ in ordered[:self.n_candidates]]
+        # 2) Aguarda o quórum de respostas (no máximo ENGAGEMENT_TIMEOUT)
+        t0 = asyncio.get_running_loop().time()
+        try:
+            await asyncio.wait_for(asyncio.shield(done), timeout=ENGAGEMENT_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"[{get_sender_name(str(self.jid)).upper()}] T10: quórum de {self._engagement_target} não atingido em {ENGAGEMENT_TIMEOUT:.1f}s.")
+        self._engagement_done = None
+
+        print(
+            f"[{get_sender_name(str(self.jid)).upper()}] T10: recebidas {self._engagement_count}/{expected} respostas de engagement "
+            f"em {asyncio.get_running_loop().time() - t0:.2f}s."
+        )
+
+        # 3) Top-N (já mantido pelo heap)
+        promoted = [jid for _, jid in sorted(self._engagement_top, reverse=True)]
         
         if len(promoted) < self.n_candidates:
             universe = [v for v in self.voter_jids if v not in promoted]
@@ -212,21 +321,10 @@ class SupervisorAgent(spade.agent.Agent):
         body = "CANDIDATES_ANNOUNCED;" \
                f"CANDIDATES={','.join(promoted)};" \
                f"CANDIDATE_PARTIES={','.join(cand_parties)};" \
-               f"MEDIA_JID={self.media_jid}" # Envia o JID da Mídia para a Authority
+               f"MEDIA_JID={','.join(self.media_jids)}" # Envia os JIDs das Mídias para a Authority
 
         md = {"protocol": PROTOCOL_INIT_SIM, "performative": "inform", "stage": "ANNOUNCE"}
-        
-        targets = list(self.voter_jids)
-        if self.media_jid:
-            targets.append(self.media_jid)
-        if self.authority_jid:
-            targets.append(self.authority_jid)
-
-        for to in targets:
-            m = Message(to=to)
-            m.body = body
-            m.metadata = dict(md)
-            await beh.send(m)
+        await self._broadcast(body, md, beh)
 
         print(f"[{get_sender_name(str(self.jid)).upper()}] CANDIDATOS PROMOVIDOS (JIDs): {', '.join(promoted)}")
         print(f"[{get_sender_name(str(self.jid)).upper()}] Transição para FASE CAMPANHA (T11).")
@@ -240,7 +338,7 @@ class SupervisorAgent(spade.agent.Agent):
         base.set_metadata("protocol", PROTOCOL_VOTING)
         base.set_metadata("performative", "request")
         base.body = "REQUEST_VOTE"
-        for v in self.voter_jids:
+        for v in self._voter_hosts():
             m = Message(to=v)
             m.body = base.body
             m.metadata = dict(base.metadata)
@@ -255,6 +353,35 @@ class SupervisorAgent(spade.agent.Agent):
             await beh.send(inf)
 
 
+    # ---------------- Instrumentação ----------------
+    def _print_live_timing(self):
+        live = self.timing.live()
+        last = live["last"] or {}
+        phases = ", ".join(f"{k}={v:.0f}ms" for k, v in last.get("phases", {}).items())
+        print(
+            f"[{get_sender_name(str(self.jid)).upper()}] TIMING T{last.get('tick')}: {phases} | "
+            f"ocupado={last.get('busy_ms', 0.0):.0f}ms | atraso acumulado={live['lag_ms']:+.0f}ms"
+        )
+
+    def _report_timing(self):
+        """Imprime os histogramas por fase e grava o JSON (TICK_TIMING_FILE)."""
+        name = get_sender_name(str(self.jid)).upper()
+        print(f"[{name}] HISTOGRAMAS DE TEMPO POR TICK (nominal {self.tick_duration * 1000:.0f}ms):")
+        for line in self.timing.report_lines():
+            print(f"[{name}]   {line}")
+        if TICK_TIMING_FILE:
+            try:
+                self.timing.save(TICK_TIMING_FILE)
+                print(f"[{name}] TEMPOS DOS TICKS SALVOS EM: {TICK_TIMING_FILE}")
+            except OSError as e:
+                print(f"[{name}] ERRO AO SALVAR TEMPOS DOS TICKS: {e!r}")
+
+    async def _timing_controller(self, request):
+        return self.timing.live()
+
+    async def _timing_summary_controller(self, request):
+        return self.timing.summary()
+
     # ---------------- setup ----------------
 
     async def setup(self):
@@ -267,4 +394,13 @@ class SupervisorAgent(spade.agent.Agent):
         template_engagement = Template(metadata={"protocol": PROTOCOL_RESPONSE_ENGAGEMENT})
         self.add_behaviour(self.EngagementSink(), template_engagement)
         
-        self.add_behaviour(self.ResultsListener(),  Template(metadata={"protocol": PROTOCOL_RESULTS}))
\ No newline at end of file
+        self.add_behaviour(self.ResultsListener(),  Template(metadata={"protocol": PROTOCOL_RESULTS}))
+
+        # Métricas ao vivo (JSON): /timing (último TICK), /timing/summary (histogramas)
+        # e /metrics (mensagens por protocolo e filas de todos os agentes)
+        self.web.add_get("/timing", self._timing_controller, None)
+        self.web.add_get("/timing/summary", self._timing_summary_controller, None)
+        self.add_metrics_routes()
+        if SUPERVISOR_WEB_PORT:
+            self.web.start(port=SUPERVISOR_WEB_PORT)
+            print(f"[{get_sender_name(str(self.jid)).upper()}] Métricas em http://localhost:{SUPERVISOR_WEB_PORT}/timing e /metrics")
\ No newline at end of file
@@ -0,0 +1,270 @@
+# python_spade/sweep_runner.py
+"""
+Sweep de cenários com replicações Monte Carlo e PARADA ANTECIPADA ADAPTATIVA.
+
+Para cada cenário (scenarios.SCENARIOS) acompanha estimativas correntes de:
+  - fração de cadeiras D'Hondt por partido (seats_<PARTIDO>);
+  - taxa de abstenção (abstenções / cidadãos);
+  - taxa de voto nulo (nulos / votos recebidos).
+
+Um cenário deixa de receber replicações quando a largura de TODOS os
+intervalos de confiança fica abaixo de --target-width. Cada worker livre do
+pool é entregue ao cenário ainda mais incerto, o que minimiza o CPU total
+para uma precisão dada.
+
+Uso:
+    python sweep_runner.py --scenarios C0 C1 C2 C3 --target-width 0.1 --workers 8
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+import common as cfg
+from scenarios import SCENARIOS
+
+
+# ==========================
+# Estatística corrente
+# ==========================
+class RunningStat:
+    """Média e variância correntes (algoritmo de Welford)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def half_width(self, z: float) -> float:
+        if self.n < 2:
+            return math.inf
+        return z * self.std / math.sqrt(self.n)
+
+
+class ScenarioTracker:
+    """Estado de um cenário no sweep: estatísticas, replicações e CPU."""
+
+    def __init__(self, name: str, overrides: Dict[str, Any], min_reps: int, max_reps: int):
+        self.name = name
+        self.overrides = overrides
+        self.min_reps = min_reps
+        self.max_reps = max_reps
+        self.stats: Dict[str, RunningStat] = {}
+        self.launched = 0
+        self.in_flight = 0
+        self.cpu_seconds = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.launched - self.in_flight
+
+    def add(self, metrics: Dict[str, float], cpu_seconds: float):
+        self.in_flight -= 1
+        self.cpu_seconds += cpu_seconds
+        for key, value in metrics.items():
+            self.stats.setdefault(key, RunningStat()).add(value)
+
+    def width_ratio(self, z: float, target_width: float) -> float:
+        """Maior (largura do IC / alvo) entre as métricas; inf se poucos dados."""
+        if self.done < self.min_reps or not self.stats:
+            return math.inf
+        return max(2 * s.half_width(z) for s in self.stats.values()) / target_width
+
+    def projected_ratio(self, z: float, target_width: float) -> float:
+        """Razão projetada contando replicações já em execução (IC ~ 1/sqrt(n))."""
+        if self.launched < self.min_reps:
+            return math.inf
+        if self.done < self.min_reps:
+            return 0.0  # aguardando as replicações mínimas terminarem
+        ratio = self.width_ratio(z, target_width)
+        return ratio * math.sqrt(self.done / float(self.done + self.in_flight))
+
+    def converged(self, z: float, target_width: float) -> bool:
+        return self.width_ratio(z, target_width) <= 1.0
+
+    def exhausted(self) -> bool:
+        return self.launched >= self.max_reps
+
+    def summary(self, z: float, target_width: float) -> Dict[str, Any]:
+        metrics = {}
+        for key, s in sorted(self.stats.items()):
+            hw = s.half_width(z)
+            metrics[key] = {
+                "mean": s.mean,
+                "std": s.std,
+                "ci_low": s.mean - hw,
+                "ci_high": s.mean + hw,
+                "width": 2 * hw,
+            }
+        return {
+            "replications": self.done,
+            "converged": self.converged(z, target_width),
+            "cpu_seconds": self.cpu_seconds,
+            "metrics": metrics,
+        }
+
+
+# ==========================
+# Worker (processo do pool)
+# ==========================
+def extract_metrics(results: Dict[str, Any], n_seats: int) -> Dict[str, float]:
+    """Converte o payload de resultados nas métricas acompanhadas pelo sweep."""
+    seats = results.get("seats_dhondt", {})
+    metrics = {f"seats_{p}": seats.get(p, 0) / float(n_seats) for p in cfg.ALL_PARTIES}
+    citizens = results.get("total_citizens") or 1
+    received = results.get("total_votes_received") or 0
+    metrics["abstention_rate"] = results.get("abstentions", 0) / float(citizens)
+    metrics["null_rate"] = results.get("null_votes", 0) / float(received) if received else 0.0
+    return metrics
+
+
+def run_replication(scenario: str, overrides: Dict[str, Any], seed: str) -> Tuple[str, Dict[str, float], float]:
+    """Executa uma replicação headless e devolve (cenário, métricas, CPU em s)."""
+    import headless_sim
+
+    cpu_start = time.process_time()
+    params = headless_sim.build_params(overrides)
+    results = headless_sim.HeadlessElection(params, seed).run()
+    metrics = extract_metrics(results, int(params["N_SEATS"]))
+    return scenario, metrics, time.process_time() - cpu_start
+
+
+# ==========================
+# Escalonador adaptativo
+# ==========================
+def pick_scenario(trackers: List[ScenarioTracker], z: float, target_width: float) -> Optional[ScenarioTracker]:
+    """Escolhe o cenário mais incerto que ainda precisa de replicações."""
+    best, best_ratio = None, 1.0
+    for tr in trackers:
+        if tr.exhausted():
+            continue
+        ratio = tr.projected_ratio(z, target_width)
+        if ratio > best_ratio:
+            best, best_ratio = tr, ratio
+    return best
+
+
+def run_sweep(
+    scenarios: Dict[str, Dict[str, Any]],
+    target_width: float = 0.10,
+    confidence: float = 0.95,
+    min_reps: int = 10,
+    max_reps: int = 500,
+    workers: Optional[int] = None,
+    base_seed: int = 0,
+    common_overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Executa o sweep adaptativo e devolve o resumo por cenário."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    workers = workers or os.cpu_count() or 1
+    trackers = [
+        ScenarioTracker(name, {**(common_overrides or {}), **ov}, min_reps, max_reps)
+        for name, ov in scenarios.items()
+    ]
+    by_name = {tr.name: tr for tr in trackers}
+
+    print(
+        f"[SWEEP] {len(trackers)} cenários, alvo IC={target_width:.3f} "
+        f"({confidence*100:.0f}%), reps {min_reps}..{max_reps}, workers={workers}"
+    )
+
+    wall_start = time.perf_counter()
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            # Preenche os workers livres com os cenários mais incertos
+            while len(pending) < workers:
+                tr = pick_scenario(trackers, z, target_width)
+                if tr is None:
+                    break
+                seed = f"{base_seed}:{tr.name}:{tr.launched}"
+                pending.add(pool.submit(run_replication, tr.name, tr.overrides, seed))
+                tr.launched += 1
+                tr.in_flight += 1
+
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name, metrics, cpu = fut.result()
+                tr = by_name[name]
+                tr.add(metrics, cpu)
+                if tr.converged(z, target_width) and tr.in_flight == 0:
+                    print(f"[SWEEP] {name}: convergiu com {tr.done} replicações.")
+
+    wall = time.perf_counter() - wall_start
+    summary = {name: tr.summary(z, target_width) for name, tr in by_name.items()}
+    total_cpu = sum(tr.cpu_seconds for tr in trackers)
+    print(f"[SWEEP] Concluído em {wall:.1f}s (CPU total {total_cpu:.1f}s).")
+    return {
+        "target_width": target_width,
+        "confidence": confidence,
+        "wall_seconds": wall,
+        "cpu_seconds": total_cpu,
+        "scenarios": summary,
+    }
+
+
+def print_summary(report: Dict[str, Any]):
+    for name, data in report["scenarios"].items():
+        status = "OK" if data["converged"] else "MAX_REPS"
+        print(f"\n[SWEEP] Cenário {name} — {data['replications']} reps ({status}), CPU {data['cpu_seconds']:.1f}s")
+        for key, m in data["metrics"].items():
+            print(f"    {key:<18} {m['mean']:.3f}  [{m['ci_low']:.3f}, {m['ci_high']:.3f}]")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sweep adaptativo de cenários (headless).")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), help="Cenários de scenarios.py")
+    parser.add_argument("--target-width", type=float, default=0.10, help="Largura máxima dos ICs")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--min-reps", type=int, default=10)
+    parser.add_argument("--max-reps", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-citizens", type=int, default=None)
+    parser.add_argument("--out", default="sweep_results.json")
+    args = parser.parse_args(argv)
+
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenários desconhecidos: {unknown}")
+
+    common_overrides = {}
+    if args.n_citizens:
+        common_overrides["N_CITIZENS"] = args.n_citizens
+
+    report = run_sweep(
+        {name: SCENARIOS[name] for name in args.scenarios},
+        target_width=args.target_width,
+        confidence=args.confidence,
+        min_reps=args.min_reps,
+        max_reps=args.max_reps,
+        workers=args.workers,
+        base_seed=args.seed,
+        common_overrides=common_overrides,
+    )
+    print_summary(report)
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\n[SWEEP] Relatório salvo em: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# python_spade/tick_timing.py
+"""
+Instrumentação de tempo dos TICKs do Supervisor.
+
+Para cada TICK registra a duração de cada fase (fan-out do TICK, coleta
+T10, pedidos de relatório, pedido de votos T51), o tempo ocupado e o
+período real até o TICK seguinte. A deriva é o período real menos o
+nominal (TICK_DURATION); o atraso acumulado é quanto o relógio da
+simulação está atrás do cronograma ideal T * TICK_DURATION.
+
+Os tempos vão para histogramas de baldes fixos (ms), impressos no fim da
+execução, e ficam disponíveis ao vivo via live().
+"""
+import bisect
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Limites superiores dos baldes (ms); o último balde é aberto
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Quantil exato das amostras (interpolação linear entre as vizinhas, como numpy.percentile)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    pos = q * (len(ordered) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class Histogram:
+    """Histograma de baldes fixos em ms, com contagem, soma, mínimo e máximo."""
+
+    def __init__(self, bounds_ms: Optional[List[float]] = None):
+        self.bounds = list(bounds_ms or BUCKETS_MS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.n += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Quantil aproximado: limite superior do balde que o contém."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank and c:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "n": self.n,
+            "mean_ms": self.mean,
+            "min_ms": self.min if self.n else 0.0,
+            "max_ms": self.max if self.n else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "buckets": {lab: c for lab, c in zip(labels, self.counts) if c},
+        }
+
+    def lines(self, width: int = 30) -> List[str]:
+        peak = max(self.counts) or 1
+        out = []
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            label = f"<={self.bounds[i]}ms" if i < len(self.bounds) else f">{self.bounds[-1]}ms"
+            out.append(f"{label:>10} {'#' * max(1, int(width * c / peak)):<{width}} {c}")
+        return out
+
+
+class TickTimer:
+    """Registra fases por TICK e a deriva em relação à duração nominal."""
+
+    def __init__(self, nominal_s: float):
+        self.nominal_s = nominal_s
+        self.records: List[Dict[str, Any]] = []
+        self.histograms: Dict[str, Histogram] = {}
+        self._t0: Optional[float] = None
+        self._current: Optional[Dict[str, Any]] = None
+
+    def _observe(self, key: str, value_ms: float):
+        self.histograms.setdefault(key, Histogram()).add(value_ms)
+
+    def start_tick(self, tick: int):
+        now = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = now
+        if self.records:
+            prev = self.records[-1]
+            period_ms = (now - self._t0) * 1000.0 - prev["start_ms"]
+            prev["period_ms"] = period_ms
+            prev["drift_ms"] = period_ms - self.nominal_s * 1000.0
+            self._observe("period", period_ms)
+            self._observe("drift", max(0.0, prev["drift_ms"]))
+        first_tick = self.records[0]["tick"] if self.records else tick
+        start_ms = (now - self._t0) * 1000.0
+        self._current = {
+            "tick": tick,
+            "start_ms": start_ms,
+            "lag_ms": start_ms - (tick - first_tick) * self.nominal_s * 1000.0,
+            "phases": {},
+        }
+        self.records.append(self._current)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            if self._current is not None:
+                self._current["phases"][name] = self._current["phases"].get(name, 0.0) + elapsed_ms
+            self._observe(name, elapsed_ms)
+
+    def end_tick(self):
+        if self._current is None:
+            return
+        busy_ms = (time.perf_counter() - self._t0) * 1000.0 - self._current["start_ms"]
+        self._current["busy_ms"] = busy_ms
+        self._observe("busy", busy_ms)
+        self._current = None
+
+    # ---------------- Leitura ----------------
+    def live(self) -> Dict[str, Any]:
+        """Estado atual (último TICK concluído + atraso acumulado)."""
+        done = [r for r in self.records if "busy_ms" in r]
+        last = done[-1] if done else None
+        return {
+            "nominal_ms": self.nominal_s * 1000.0,
+            "ticks": len(self.records),
+            "last": last,
+            "lag_ms": self.records[-1]["lag_ms"] if self.records else 0.0,
+        }
+
+    def busy_samples(self) -> List[float]:
+        """Tempo ocupado (ms) de cada TICK concluído, sem agrupar em baldes."""
+        return [r["busy_ms"] for r in self.records if "busy_ms" in r]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "nominal_ms": self.nominal_s * 1000.0,
+            "histograms": {k: h.to_dict() for k, h in self.histograms.items()},
+            "ticks": self.records,
+        }
+
+    def report_lines(self) -> List[str]:
+        out = []
+        for key, h in self.histograms.items():
+            out.append(
+                f"{key}: n={h.n} média={h.mean:.1f}ms p50<={h.quantile(0.5):.0f}ms "
+                f"p95<={h.quantile(0.95):.0f}ms máx={h.max:.1f}ms"
+            )
+            out.extend("    " + line for line in h.lines())
+        return out
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.summary(), fh, indent=2)
@@ -0,0 +1,329 @@
+# python_spade/vectorized_sim.py
+"""
+Motor VETORIZADO (NumPy) da simulação eleitoral.
+
+Executa B replicações independentes de uma vez, com o estado dos eleitores
+em arrays (B, N). Cada parâmetro numérico de common.py pode variar por
+replicação (array de tamanho B), o que permite despachar desenhos
+experimentais inteiros (sensitivity.py) num único lote.
+
+Segue o mesmo ciclo do headless_sim.py (T0..T10 influência, T10 promoção,
+T11..T50 um passo de campanha por TICK ou um por candidato ativo com
+MEDIA_CAMPAIGN_MODE = "tick", T51 votação + D'Hondt), com duas
+simplificações de modelagem:
+  - a rede small-world é uma tabela de k vizinhos por eleitor (anel com
+    religação independente de cada vizinho com prob. 0.3), em vez do grafo
+    Watts-Strogatz exato do NetworkX;
+  - a influência social de um TICK é aplicada de forma síncrona.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+import common as cfg
+from headless_sim import (
+    P_SOCIAL_QUERY,
+    PUNISHMENTS_TO_ELIMINATE,
+    build_params,
+    party_list_for,
+)
+from election_model import MEDIA_SIDE, PESO_CAMP, PESO_IDEO, punishment_factor
+from influence_fastforward import FAST_FORWARD_ROUNDS
+
+# Parâmetros que definem formas de arrays (iguais para todo o lote)
+STRUCTURAL_KEYS = {
+    "TOTAL_TICKS",
+    "N_CITIZENS",
+    "N_CANDIDATES_TO_PROMOTE",
+    "N_SEATS",
+    "VIRAL_MAX_EXTRA_TARGETS",
+    "CAMPAIGN_MEMORY_WINDOW",
+    "INFLUENCE_FAST_FORWARD",
+    "MEDIA_IDEOLOGY_BIAS",
+    "MEDIA_USE_MANUAL_RATIOS",
+    "MEDIA_CAMPAIGN_MODE",
+    "PARTY_PERCENTAGES",
+}
+
+NETWORK_K = 4
+NETWORK_P = 0.3
+
+# Índices de estado/ação da tabela Q (HIGH, MID, LOW) x (NEWS, FAKENEWS)
+NEWS, FAKENEWS = 0, 1
+
+
+def _as_row(value: Any, batch: int) -> np.ndarray:
+    """Converte um escalar ou array (B,) num array float (B,)."""
+    arr = np.asarray(value, dtype=float)
+    if arr.ndim == 0:
+        return np.full(batch, float(arr))
+    if arr.shape != (batch,):
+        raise ValueError(f"Parâmetro com forma {arr.shape}, esperado ({batch},)")
+    return arr
+
+
+def small_world_table(rng: np.random.Generator, batch: int, n: int, k: int = NETWORK_K, p: float = NETWORK_P) -> np.ndarray:
+    """Tabela (B, N, k) de vizinhos: anel de grau k com religação aleatória."""
+    half = max(1, k // 2)
+    offsets = np.concatenate([np.arange(1, half + 1), -np.arange(1, half + 1)])
+    base = (np.arange(n)[:, None] + offsets[None, :]) % n
+    table = np.broadcast_to(base, (batch, n, offsets.size)).copy()
+    rewire = rng.random(table.shape) < p
+    table[rewire] = rng.integers(0, n, size=int(rewire.sum()))
+    return table
+
+
+def _budget_state(budgets: np.ndarray, initial: np.ndarray) -> np.ndarray:
+    """HIGH=0, MID=1, LOW=2 (mesmos limiares de election_model.budget_state)."""
+    ratio = budgets / initial[:, None]
+    return np.where(ratio >= 0.7, 0, np.where(ratio >= 0.3, 1, 2))
+
+
+def dhondt_batch(party_votes: np.ndarray, n_seats: int) -> np.ndarray:
+    """D'Hondt vetorizado: (B, P) votos -> (B, P) cadeiras."""
+    batch, n_parties = party_votes.shape
+    divisors = np.arange(1, n_seats + 1, dtype=float)
+    quotients = (party_votes[:, :, None] / divisors[None, None, :]).reshape(batch, -1)
+    top = np.argsort(-quotients, axis=1, kind="stable")[:, :n_seats] // n_seats
+    seats = np.zeros((batch, n_parties), dtype=int)
+    np.add.at(seats, (np.arange(batch)[:, None], top), 1)
+    return seats
+
+
+def simulate_batch(batch: int, overrides: Optional[Dict[str, Any]] = None, seed: Any = None) -> Dict[str, np.ndarray]:
+    """
+    Executa `batch` replicações. Valores de `overrides` podem ser escalares
+    ou arrays (batch,) para os parâmetros numéricos não estruturais.
+    Retorna arrays indexados pela replicação.
+    """
+    params = build_params({k: v for k, v in (overrides or {}).items() if k in STRUCTURAL_KEYS})
+    row = {
+        key: _as_row((overrides or {}).get(key, value), batch)
+        for key, value in params.items()
+        if key not in STRUCTURAL_KEYS
+    }
+
+    rng = np.random.default_rng(seed)
+    B = batch
+    N = int(params["N_CITIZENS"])
+    C = min(int(params["N_CANDIDATES_TO_PROMOTE"]), N)
+    rows = np.arange(B)
+
+    # ---------------- Eleitores ----------------
+    parties = cfg.ALL_PARTIES
+    party_of = np.array(
+        [parties.index(p) for p in party_list_for(N, params["PARTY_PERCENTAGES"])], dtype=int
+    )
+    party_ideology = np.array([cfg.PARTIES[p]["ideology"] for p in parties], dtype=float)
+    ideology = np.broadcast_to(party_ideology[party_of], (B, N)).copy()
+    engagement = rng.random((B, N))
+    credibility = rng.uniform(0.5, 0.9, (B, N))
+    neighbours = small_world_table(rng, B, N) if N > 1 else None
+
+    # ---------------- T0..T10: influência ----------------
+    # INFLUENCE_FAST_FORWARD="expected": T0..T9 pelo estado esperado (influence_fastforward.py);
+    # "sampled" é o próprio sorteio síncrono abaixo
+    expected_rounds = FAST_FORWARD_ROUNDS if params["INFLUENCE_FAST_FORWARD"] == "expected" else 0
+    for t in range(11):
+        if neighbours is None:
+            break
+        if t < expected_rounds:
+            k = neighbours.shape[2]
+            pulled = np.take_along_axis(ideology * engagement, neighbours.reshape(B, N * k), axis=1)
+            ideology = (1.0 - 0.1 * P_SOCIAL_QUERY) * ideology + 0.1 * P_SOCIAL_QUERY * pulled.reshape(B, N, k).mean(axis=2)
+            continue
+        asks = rng.random((B, N)) < P_SOCIAL_QUERY
+        slot = rng.integers(0, neighbours.shape[2], (B, N))
+        j = np.take_along_axis(neighbours, slot[:, :, None], axis=2)[:, :, 0]
+        n_ideol = np.take_along_axis(ideology, j, axis=1)
+        n_eng = np.take_along_axis(engagement, j, axis=1)
+        updated = np.clip(ideology * 0.9 + n_ideol * n_eng * 0.1, -2.0, 2.0)
+        ideology = np.where(asks, updated, ideology)
+
+    # ---------------- T10: promoção ----------------
+    candidates = np.argsort(-engagement, axis=1, kind="stable")[:, :C]  # (B, C)
+    is_candidate = np.zeros((B, N), dtype=bool)
+    is_candidate[rows[:, None], candidates] = True
+    cand_party = party_of[candidates]  # (B, C)
+
+    initial_budget = row["CANDIDATE_INITIAL_BUDGET"]
+    budgets = np.broadcast_to(initial_budget[:, None], (B, C)).copy()
+    punishments = np.zeros((B, C), dtype=int)
+    eliminated = np.zeros((B, C), dtype=bool)
+    q_values = np.zeros((B, C, 3, 2))
+
+    bias_side = MEDIA_SIDE.get(str(params["MEDIA_IDEOLOGY_BIAS"]).upper(), 0)
+    sign_match = np.sign(bias_side * party_ideology[cand_party])  # (B, C)
+    neutral = str(params["MEDIA_IDEOLOGY_BIAS"]).upper() == "NEUTRAL"
+    strength = row["MEDIA_BIAS_STRENGTH"]
+    ideol_weight = np.where(
+        neutral | (strength[:, None] <= 0.0), 1.0, 1.0 + sign_match * strength[:, None]
+    )
+    punish_factor = np.array([punishment_factor(p) or 1.0 for p in parties])
+
+    # Memória de campanha: buffer circular dos K últimos impactos por (eleitor,
+    # candidato), com soma corrente; a posição de escrita é mem_count % K
+    K = max(1, int(params["CAMPAIGN_MEMORY_WINDOW"]))
+    memory = np.zeros((B, N, C, K))
+    mem_sum = np.zeros((B, N, C))
+    mem_count = np.zeros((B, N, C), dtype=np.int32)
+    msg_count = np.zeros((B, N), dtype=int)
+
+    news_sent = np.zeros(B, dtype=int)
+    fake_sent = np.zeros(B, dtype=int)
+    cand_idx = np.zeros(B, dtype=int)
+
+    base_targets = max(1, int(0.4 * N))
+    k_extra = min(int(params["VIRAL_MAX_EXTRA_TARGETS"]), N - base_targets)
+    manual = bool(params["MEDIA_USE_MANUAL_RATIOS"])
+    total_ratio = np.maximum(row["NEWS_RATIO"] + row["FAKE_RATIO"], 0.0)
+    news_threshold = np.where(total_ratio > 0, row["NEWS_RATIO"] / np.where(total_ratio > 0, total_ratio, 1), 1.0)
+
+    # ---------------- T11..T50: campanha ----------------
+    per_tick = str(params["MEDIA_CAMPAIGN_MODE"]) == "tick"
+    for _tick in range(11, 51):
+        if per_tick:
+            # Um envio por candidato ativo no início do TICK
+            selections = [np.where(eliminated[:, c], -1, c) for c in range(C)]
+        else:
+            # Round-robin pulando eliminados
+            sel = np.full(B, -1)
+            searching = np.ones(B, dtype=bool)
+            for _ in range(C):
+                c = cand_idx % C
+                cand_idx = cand_idx + searching
+                hit = searching & ~eliminated[rows, c]
+                sel[hit] = c[hit]
+                searching &= ~hit
+            selections = [sel]
+        if not any((sel >= 0).any() for sel in selections):
+            break
+
+        for sel in selections:
+            active = sel >= 0
+            if not active.any():
+                continue
+            sel_c = np.where(active, sel, 0)
+
+            state = _budget_state(budgets, initial_budget)[rows, sel_c]
+            if manual:
+                action = np.where(rng.random(B) < news_threshold, NEWS, FAKENEWS)
+            else:
+                q_state = q_values[rows, sel_c, state]  # (B, 2)
+                greedy = np.where(q_state[:, NEWS] >= q_state[:, FAKENEWS], NEWS, FAKENEWS)
+                explore = rng.random(B) < row["RL_EPSILON"]
+                action = np.where(explore, rng.integers(0, 2, B), greedy)
+            is_fake = action == FAKENEWS
+
+            # Alvos + viral (mesmas chaves aleatórias para base e extras)
+            keys = rng.random((B, N))
+            kth = [base_targets - 1] + ([base_targets + k_extra - 1] if k_extra > 0 else [])
+            part = np.partition(keys, kth, axis=1)
+            targets = keys <= part[:, [base_targets - 1]]
+            viral_p = row["VIRAL_BASE_PROB"] * np.where(is_fake, 1.5, 0.7)
+            viral = rng.random(B) < viral_p
+            if k_extra > 0:
+                extra = (keys > part[:, [base_targets - 1]]) & (keys <= part[:, [base_targets + k_extra - 1]])
+                targets |= extra & viral[:, None]
+            targets &= active[:, None]
+            n_targets = targets.sum(axis=1)
+
+            cost_per_target = np.where(is_fake, row["COST_FAKENEWS_PER_TARGET"], row["COST_NEWS_PER_TARGET"])
+            fine = np.where(is_fake, row["PENALTY_PER_FAKENEWS"], 0.0)
+            total_cost = n_targets * cost_per_target
+            budgets[rows, sel_c] -= np.where(active, total_cost + fine, 0.0)
+            punished_rl = is_fake & (rng.random(B) < row["P_DETECT_BASE"])
+
+            # Entrega
+            recipients = targets & ~is_candidate
+            msg_count += recipients
+            impact = np.where(
+                is_fake[:, None],
+                rng.uniform(0.1, 0.3, (B, N)) * np.where(credibility > row["FAKENEWS_BACKFIRE_CREDIBILITY"][:, None], -0.5, 1.0),
+                rng.uniform(0.05, 0.2, (B, N)) * credibility,
+            )
+            cnt_sel = mem_count[rows, :, sel_c]  # (B, N)
+            slot = (cnt_sel % K)[:, :, None]
+            mem_sel = memory[rows, :, sel_c]  # (B, N, K)
+            oldest = np.take_along_axis(mem_sel, slot, axis=2)[:, :, 0]  # 0.0 enquanto o buffer não enche
+            np.put_along_axis(mem_sel, slot, np.where(recipients, impact, oldest)[:, :, None], axis=2)
+            memory[rows, :, sel_c] = mem_sel
+            mem_sum[rows, :, sel_c] += np.where(recipients, impact - oldest, 0.0)
+            mem_count[rows, :, sel_c] = cnt_sel + recipients
+
+            # Denúncia à Authority
+            detected = active & is_fake & (rng.random(B) < row["P_DETECT_BASE"])
+            punishments[rows, sel_c] += detected
+            eliminated |= punishments >= PUNISHMENTS_TO_ELIMINATE
+
+            if not manual:
+                coverage = n_targets / float(N)
+                reward = coverage - row["RL_LAMBDA_COST"] * (total_cost + fine) / initial_budget
+                reward *= ideol_weight[rows, sel_c]
+                next_state = _budget_state(budgets, initial_budget)[rows, sel_c]
+                q_sa = q_values[rows, sel_c, state, action]
+                max_next = q_values[rows, sel_c, next_state].max(axis=1)
+                updated = q_sa + row["RL_ALPHA"] * (reward + row["RL_GAMMA"] * max_next - q_sa)
+                factor = np.where(punished_rl, punish_factor[cand_party[rows, sel_c]], 1.0)
+                q_values[rows, sel_c, state, action] = np.where(active, updated * factor, q_sa)
+
+            news_sent += np.where(active & ~is_fake, n_targets, 0)
+            fake_sent += np.where(active & is_fake, n_targets, 0)
+
+    # ---------------- T51: votação ----------------
+    overload = np.maximum(0, msg_count - row["VOTER_OVERLOAD_THRESHOLD"][:, None])
+    eff = np.maximum(0.0, engagement - np.minimum(0.40, 0.02 * overload))
+    p_abstain = row["P_BASE_ABSTAIN"][:, None] + 0.4 * (eff < row["ENGAGEMENT_ABSTAIN_THRESHOLD"][:, None])
+    votes = rng.random((B, N)) >= p_abstain
+
+    scores = PESO_IDEO * rng.uniform(0.1, 0.3, (B, N, C)) * eff[:, :, None]
+    avg_mem = mem_sum / np.maximum(np.minimum(mem_count, K), 1)
+    scores += PESO_CAMP * avg_mem
+    choice = scores.argmax(axis=2)
+    max_score = scores.max(axis=2)
+    p_null = row["P_BASE_NULL"][:, None] + 0.25 * (max_score < 0.05)
+    null = rng.random((B, N)) < p_null
+
+    # Candidatos votam em si mesmos (99%)
+    self_slot = np.full((B, N), -1)
+    self_slot[rows[:, None], candidates] = np.arange(C)[None, :]
+    self_vote = rng.random((B, N)) < 0.99
+    choice = np.where(is_candidate, self_slot, choice)
+    null = np.where(is_candidate, ~self_vote, null)
+
+    valid = votes & ~null
+    by_candidate = np.zeros((B, C), dtype=int)
+    np.add.at(by_candidate, (np.broadcast_to(rows[:, None], (B, N))[valid], choice[valid]), 1)
+    party_votes = np.zeros((B, len(parties)), dtype=float)
+    np.add.at(party_votes, (np.broadcast_to(rows[:, None], (B, C)), cand_party), by_candidate)
+    # Partidos sem candidato não disputam cadeiras
+    has_candidate = np.zeros((B, len(parties)), dtype=bool)
+    has_candidate[rows[:, None], cand_party] = True
+    n_seats = int(params["N_SEATS"])
+    seats = dhondt_batch(np.where(has_candidate, party_votes, -1.0), n_seats)
+
+    received = votes.sum(axis=1)
+    return {
+        "seats": seats,
+        "party_votes": party_votes.astype(int),
+        "by_candidate": by_candidate,
+        "total_votes_received": received,
+        "abstentions": N - received,
+        "null_votes": (votes & null).sum(axis=1),
+        "news_sent": news_sent,
+        "fakenews_sent": fake_sent,
+        "eliminated": eliminated.sum(axis=1),
+        "total_citizens": np.full(B, N),
+        "n_seats": np.full(B, n_seats),
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    out = simulate_batch(1000, seed=0)
+    print(f"[VECTORIZED] 1000 replicações em {time.perf_counter() - t0:.2f}s")
+    share = out["seats"].mean(axis=0) / out["n_seats"][0]
+    print("[VECTORIZED] Fração média de cadeiras:", {p: round(float(s), 3) for p, s in zip(cfg.ALL_PARTIES, share)})
+    print(f"[VECTORIZED] Abstenção média: {out['abstentions'].mean() / cfg.N_CITIZENS:.3f}")
@@ -4,7 +4,6 @@ import random
 import json
 from typing import List, Dict, Tuple
 
-import spade
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
 from spade.template import Template
@@ -13,6 +12,7 @@ from common import (
     get_sender_name,
     PARTIES,
     PROTOCOL_CAMPAIGN,
+    PROTOCOL_CAMPAIGN_BATCH,
     PROTOCOL_VOTING,
     PROTOCOL_VOTE,
     PROTOCOL_INIT_SIM,
@@ -20,20 +20,59 @@ from common import (
     PROTOCOL_RESPONSE_ENGAGEMENT,
     SERVER, 
     TOTAL_TICKS,
-    # Constantes de Abstenção/Nulo
     N_CITIZENS,
-    P_BASE_ABSTAIN,
-    P_BASE_NULL,
-    ENGAGEMENT_ABSTAIN_THRESHOLD,
+    INFLUENCE_MODE,
+)
+from sim_agent import SimAgent
+from election_model import (
+    campaign_impact,
+    influence_ideology,
+    decide_vote,
+    ImpactWindow,
 )
 
 # Tempo de espera para o receive.
 RECEIVE_TIMEOUT = 2.5 # 1.0 em teste / 2.0s em simulação real
 # Protocolo de influência (usado localmente)
 PROTOCOL_INFLUENCE = "INFLUENCE"
+# Perfis publicados aos vizinhos no modo gossip (INFLUENCE_MODE)
+PROTOCOL_PROFILE = "PROFILE"
+
+
+def encode_profiles(profiles: List[Tuple[str, float, float]]) -> str:
+    """Perfis (jid, ideologia, engagement) num corpo compacto: "jid=ideol,eng;jid=ideol,eng"."""
+    return ";".join(f"{jid}={ideol:.6f},{eng:.6f}" for jid, ideol, eng in profiles)
+
+
+def decode_profiles(body: str) -> List[Tuple[str, float, float]]:
+    out = []
+    for entry in body.split(";"):
+        jid, sep, values = entry.partition("=")
+        if not sep:
+            continue
+        try:
+            ideol, eng = values.split(",")
+            out.append((jid, float(ideol), float(eng)))
+        except ValueError:
+            continue
+    return out
+
+
+def encode_pitches(pitches: List[Tuple[str, str, str]]) -> str:
+    """Envios de campanha (jid do eleitor, candidato curto, performative) num corpo: "jid|cand|perf;..."."""
+    return ";".join(f"{jid}|{cand}|{perf}" for jid, cand, perf in pitches)
+
 
+def decode_pitches(body: str) -> List[Tuple[str, str, str]]:
+    out = []
+    for entry in body.split(";"):
+        parts = entry.split("|")
+        if len(parts) == 3:
+            out.append((parts[0], parts[1], parts[2].upper()))
+    return out
 
-class VoterAgent(spade.agent.Agent):
+
+class VoterAgent(SimAgent):
     def __init__(self, jid: str, password: str, supervisor_jid: str, authority_jid: str, party: str, *args, **kwargs):
         neighbours = kwargs.pop("neighbours", [])
         super().__init__(jid, password, *args, **kwargs)
@@ -49,8 +88,8 @@ class VoterAgent(spade.agent.Agent):
         self.engagement = random.random()
         self.confianca_midia = random.uniform(0.5, 0.9)
 
-        # Memória de campanha: Dict[str, List[float]] para Memória Curta (2)
-        self.memoria_campanha: Dict[str, List[float]] = {} 
+        # Memória de campanha: últimos CAMPAIGN_MEMORY_WINDOW impactos por candidato
+        self.memoria_campanha: Dict[str, ImpactWindow] = {} 
         
         # Fadiga: Contador de mensagens de campanha (TAREFA 2)
         self.msg_count_campaign: int = 0
@@ -61,6 +100,8 @@ class VoterAgent(spade.agent.Agent):
 
         # Rede social local
         self.neighbours: List[str] = neighbours
+        # Último perfil (ideologia, engagement) recebido de cada vizinho (modo gossip)
+        self.neighbour_profiles: Dict[str, Tuple[float, float]] = {}
 
         # Estado interno global
         self.tick: int = 0
@@ -85,7 +126,7 @@ class VoterAgent(spade.agent.Agent):
         party_name = PARTIES.get(self.party, {}).get("name", self.party)
         
         # Formata memória curta
-        memoria_str = ", ".join([f"('{c}':{i[-2:]})" for c, i in self.memoria_campanha.items()])
+        memoria_str = ", ".join([f"('{c}':{i.values()})" for c, i in self.memoria_campanha.items()])
 
         return (
             f"Party={party_name} ({self.party}), Ideology={self.ideology:.2f}, "
@@ -143,15 +184,36 @@ class VoterAgent(spade.agent.Agent):
             payload = json.loads(msg.body or "{}")
             n_ideol = float(payload.get("ideology", 0))
             n_eng = float(payload.get("engagement", 0))
-            
-            influence_factor = (n_ideol * n_eng) * 0.1
-            
-            self.ideology = (self.ideology * 0.9) + influence_factor
-            self.ideology = max(-2.0, min(2.0, self.ideology))
+
+            self.ideology = influence_ideology(self.ideology, n_ideol, n_eng)
         except Exception:
             pass
 
 
+    async def gossip_step(self, beh: CyclicBehaviour):
+        """
+        Modo gossip (um TICK de T0..T10): aplica, com prob. 0.2, a influência do
+        último perfil conhecido de um vizinho e publica o próprio perfil a todos.
+        """
+        if not self.neighbours:
+            return
+        if random.random() < 0.2:
+            profile = self.neighbour_profiles.get(random.choice(self.neighbours))
+            if profile is not None:
+                self.ideology = influence_ideology(self.ideology, profile[0], profile[1])
+
+        body = encode_profiles([(str(self.jid), self.ideology, self.engagement)])
+        for neighbour in self.neighbours:
+            m = Message(to=neighbour)
+            m.set_metadata("protocol", PROTOCOL_PROFILE)
+            m.set_metadata("performative", "inform")
+            m.body = body
+            await beh.send(m)
+
+    def store_profiles(self, msg: Message):
+        for jid, ideol, eng in decode_profiles(msg.body or ""):
+            self.neighbour_profiles[jid] = (ideol, eng)
+
     async def handle_engagement_request(self, msg: Message, beh: CyclicBehaviour):
         """Responde ao REQUEST_ENGAGEMENT do Supervisor (T10)."""
         data = {
@@ -168,41 +230,38 @@ class VoterAgent(spade.agent.Agent):
 
     def update_campaign_memory(self, campaign_msg: Message):
         """
-        Atualiza a memória de impacto de campanha (Memória Curta: 2).
-        TAREFA 1: Implementa Memória Curta (2 últimas interações por candidato).
+        Atualiza a memória de impacto de campanha (Memória Curta).
+        TAREFA 1: Implementa Memória Curta (CAMPAIGN_MEMORY_WINDOW últimas interações por candidato).
         """
         performative = campaign_msg.metadata.get("performative", "").upper()
-        
-        # 1. CÁLCULO DE IMPACTO
-        impact = 0.0
-        if performative == "NEWS":
-            impact = random.uniform(0.05, 0.2) * self.confianca_midia
-        elif performative == "FAKENEWS":
-            impact = random.uniform(0.1, 0.3)
-            if self.confianca_midia > 0.7: # 0,7 em C0, C1 e C2 / 0,8 em C3
-                impact *= -0.5
-
-        # 2. EXTRAÇÃO DO CANDIDATO
+
+        # EXTRAÇÃO DO CANDIDATO
         candidate_id_short = None
         try:
             candidate_id_short = campaign_msg.body.split(':')[1].split(';')[0]
         except:
             return 
-        
+        self.remember_campaign(performative, candidate_id_short)
+
+    def remember_campaign(self, performative: str, candidate_id_short: str):
+        """Impacto de um envio na memória curta do candidato (mensagem avulsa ou lote CAMPAIGN_BATCH)."""
+        # 1. CÁLCULO DE IMPACTO
+        impact = campaign_impact(performative, self.confianca_midia)
+
+        # 2. CANDIDATO CONHECIDO?
         known_short_jids = [get_sender_name(j) for j in self.candidates_known]
         if not candidate_id_short or candidate_id_short not in known_short_jids:
             return
 
         # 3. ATUALIZAÇÃO DA MEMÓRIA CURTA (TAREFA 1)
         if candidate_id_short not in self.memoria_campanha:
-            self.memoria_campanha[candidate_id_short] = []
+            self.memoria_campanha[candidate_id_short] = ImpactWindow()
 
-        self.memoria_campanha[candidate_id_short].append(impact)
-        # Limita a memória aos 2 últimos impactos
-        self.memoria_campanha[candidate_id_short] = self.memoria_campanha[candidate_id_short][-2:]
+        # Buffer circular: guarda só os últimos CAMPAIGN_MEMORY_WINDOW impactos
+        self.memoria_campanha[candidate_id_short].add(impact)
         
         # 4. LOG DE INSTRUMENTAÇÃO
-        resumo_mem = {c: f"{[f'{i:.4f}' for i in l]}" for c, l in self.memoria_campanha.items()}
+        resumo_mem = {c: f"{[f'{i:.4f}' for i in l.values()]}" for c, l in self.memoria_campanha.items()}
         print(
             f"[{get_sender_name(str(self.jid)).upper()}] CAMPANHA RECEBIDA: "
             f"cand={candidate_id_short}, perf={performative}, impacto={impact:.4f}, "
@@ -221,74 +280,26 @@ class VoterAgent(spade.agent.Agent):
         me = str(self.jid)
         label = get_sender_name(me).upper()
 
-        # 1. CÁLCULO DA FADIGA (TAREFA 2)
-        overload_threshold = 20 # 20 em C0 e C2 / 60 em C1 e C3
-        overload_factor = max(0, self.msg_count_campaign - overload_threshold)
-        fatigue_penalty = min(0.40, 0.02 * overload_factor)
-        
-        # Engagement Efetivo
-        effective_engagement = max(0.0, self.engagement - fatigue_penalty)
-        eng = effective_engagement 
-
-        # 2. LÓGICA DE ABSTENÇÃO (TAREFA 3.1)
-        p_abstain = P_BASE_ABSTAIN
-        if eng < ENGAGEMENT_ABSTAIN_THRESHOLD:
-            p_abstain += 0.4  # sobe bastante a chance de abster-se
+        # 1-6. Fadiga, abstenção, scores, nulo e auto-voto (election_model)
+        decision = decide_vote(
+            self.engagement,
+            self.msg_count_campaign,
+            self.memoria_campanha,
+            [get_sender_name(j) for j in self.candidates_known],
+            self.is_candidate,
+            get_sender_name(me),
+        )
+        eng = decision["effective_engagement"]
+        p_abstain = decision["p_abstain"]
 
-        if random.random() < p_abstain:
+        if decision["choice"] is None:
             # Log de Abstenção
             print(f"[{label}] ABSTENÇÃO: não enviou voto (Engagement={self.engagement:.2f}, Eng_Eff={eng:.2f}, P_Abstain={p_abstain:.2f}).")
             self.voted = True
             return  # Não manda mensagem alguma para a Authority
 
-        # 3. CÁLCULO DE SCORES (Agora usa effective_engagement)
-        vote_scores: Dict[str, float] = {}
-        PESO_IDEO = 0.5 
-        PESO_CAMP = 0.5 
-
-        candidate_short_jids = [get_sender_name(j) for j in self.candidates_known]
-        for short_jid in candidate_short_jids:
-             # Pontuação base (influenciada pelo engagement efetivo)
-             vote_scores[short_jid] = PESO_IDEO * random.uniform(0.1, 0.3) * effective_engagement
-
-        # Aplica o impacto da memória de campanha (média dos 2 últimos impactos)
-        for cand_jid_short, impactos in self.memoria_campanha.items():
-            if cand_jid_short in vote_scores:
-                avg_impact = sum(impactos) / len(impactos) if impactos else 0.0
-                vote_scores[cand_jid_short] += PESO_CAMP * avg_impact
-
-
-        # 4. DECISÃO INICIAL (Melhor Candidato)
-        if not vote_scores:
-            chosen_short = "NULO"
-            max_score = 0.0
-        else:
-            chosen_short = max(vote_scores, key=vote_scores.get)
-            max_score = vote_scores.get(chosen_short, 0.0)
-
-        # 5. LÓGICA DE VOTO NULO PROBABILÍSTICO (TAREFA 3.1)
-        p_null_extra = 0.0
-        if max_score < 0.05:
-            p_null_extra = 0.25
-        
-        p_null = P_BASE_NULL + p_null_extra
-        
-        if random.random() < p_null:
-            chosen_short = "NULO"
-        else:
-            # Se não for nulo probabilístico, o chosen_short é o max_score da etapa 4.
-            pass
-
+        chosen_short = decision["choice"]
 
-        # 6. Regra: candidato vota em si mesmo (Prioridade máxima)
-        me_short = get_sender_name(me)
-        if self.is_candidate:
-            if random.random() < 0.99:
-                chosen_short = me_short
-            else:
-                chosen_short = "NULO" 
-
-        
         # 7. LOGS FINAIS
         print(f"[{label}] ESTADO_NO_MOMENTO_DO_VOTO: {self.debug_summary()}")
         
@@ -326,7 +337,8 @@ class VoterAgent(spade.agent.Agent):
             msg = await self.receive(timeout=RECEIVE_TIMEOUT) 
             if not msg:
                 # 3. Interação Social (T0-T10)
-                if self.agent.tick <= 10 and self.agent.neighbours and random.random() < 0.2:
+                if (INFLUENCE_MODE == "pull" and self.agent.tick <= 10 and self.agent.neighbours
+                        and random.random() < 0.2):
                     neighbour = random.choice(self.agent.neighbours)
                     q = Message(to=neighbour)
                     q.set_metadata("protocol", PROTOCOL_INFLUENCE) 
@@ -339,9 +351,15 @@ class VoterAgent(spade.agent.Agent):
             
             if proto == PROTOCOL_INIT_SIM:
                 self.agent.handle_init_sim(msg.body or "")
+                if (INFLUENCE_MODE == "gossip" and (msg.body or "").startswith("TICK_")
+                        and self.agent.tick <= 10):
+                    await self.agent.gossip_step(self)
 
             elif proto == PROTOCOL_REQUEST_ENGAGEMENT:
                 await self.agent.handle_engagement_request(msg, self)
+
+            elif proto == PROTOCOL_PROFILE:
+                self.agent.store_profiles(msg)
             
             elif proto == PROTOCOL_INFLUENCE:
                 performative = msg.metadata.get("performative")
@@ -355,6 +373,14 @@ class VoterAgent(spade.agent.Agent):
                     # Contador de mensagens (Fadiga)
                     self.agent.msg_count_campaign += 1
                     self.agent.update_campaign_memory(msg)
+
+            elif proto == PROTOCOL_CAMPAIGN_BATCH:
+                if not self.agent.is_candidate and self.agent.tick > 10:
+                    me = str(self.agent.jid)
+                    for voter, cand_short, performative in decode_pitches(msg.body or ""):
+                        if voter == me:
+                            self.agent.msg_count_campaign += 1
+                            self.agent.remember_campaign(performative, cand_short)
             
             elif proto == PROTOCOL_VOTING:
                 # Comando REQUEST_VOTE (T51)
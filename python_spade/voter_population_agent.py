@@ -0,0 +1,392 @@
+# python_spade/voter_population_agent.py
+"""
+VoterPopulationAgent: milhares de eleitores lógicos atrás de UM agente SPADE.
+
+Cada eleitor mantém a identidade de um VoterAgent (JID lógico voter_N@...,
+usado nos anúncios de candidatos e nos votos), mas o estado fica em arrays
+da população e a conexão XMPP é uma só. O protocolo externo é o mesmo:
+  - broadcasts do Supervisor (TICK, ANNOUNCE, REQUEST_ENGAGEMENT,
+    REQUEST_VOTE) chegam uma vez por população e valem para todos;
+  - mensagens para um eleitor (CAMPAIGN, INFLUENCE) trazem o metadado
+    voter_id (ver sim_agent.VoterDirectory);
+  - respostas ao Supervisor (RESPONSE_ENGAGEMENT) saem uma por eleitor,
+    com voter_id = JID lógico do remetente;
+  - os votos seguem VOTE_AGGREGATION: um BALLOT_SUMMARY por população
+    (contagens por escolha + hashes das cédulas) ou um VOTE por eleitor.
+
+A influência social entre vizinhos da mesma população é aplicada direto
+nos arrays; só vizinhos de outras populações geram mensagens INFLUENCE.
+Como no headless_sim, cada eleitor consulta um vizinho com prob. 0.2 a
+cada TICK até T10. No modo gossip (INFLUENCE_MODE) a população manda, a
+cada TICK, uma única mensagem PROFILE por host vizinho com os perfis de
+todos os seus eleitores que têm vizinhos lá.
+"""
+import json
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from spade.behaviour import CyclicBehaviour
+from spade.message import Message
+from spade.template import Template
+
+from common import (
+    get_sender_name,
+    PARTIES,
+    PROTOCOL_CAMPAIGN,
+    PROTOCOL_CAMPAIGN_BATCH,
+    PROTOCOL_VOTING,
+    PROTOCOL_VOTE,
+    PROTOCOL_BALLOT_SUMMARY,
+    PROTOCOL_INIT_SIM,
+    PROTOCOL_REQUEST_ENGAGEMENT,
+    PROTOCOL_RESPONSE_ENGAGEMENT,
+    SERVER,
+    TOTAL_TICKS,
+    POPULATION_VERBOSE,
+    INFLUENCE_MODE,
+    VOTE_AGGREGATION,
+)
+from sim_agent import SimAgent, VoterDirectory, VOTER_ID_KEY
+from election_model import (
+    campaign_impact,
+    influence_ideology,
+    decide_vote,
+    summarize_ballots,
+    ImpactWindow,
+)
+from voter_agent import (
+    PROTOCOL_INFLUENCE,
+    PROTOCOL_PROFILE,
+    RECEIVE_TIMEOUT,
+    decode_pitches,
+    decode_profiles,
+    encode_profiles,
+)
+
+# Probabilidade de consultar um vizinho por TICK (T0..T10)
+P_SOCIAL_QUERY = 0.2
+# Metadado com o eleitor de origem de uma consulta INFLUENCE
+REPLY_VOTER_KEY = "reply_voter_id"
+
+
+class VoterPopulationAgent(SimAgent):
+    def __init__(
+        self,
+        jid: str,
+        password: str,
+        supervisor_jid: str,
+        authority_jid: str,
+        voter_jids: List[str],
+        parties: List[str],
+        neighbours: List[List[str]],
+        directory: VoterDirectory,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(jid, password, *args, **kwargs)
+        self.supervisor_jid = supervisor_jid
+        self.authority_jid = authority_jid
+        self.server = SERVER
+        self.directory = directory
+
+        # Identidade dos eleitores lógicos
+        self.voter_jids: List[str] = list(voter_jids)
+        self.index: Dict[str, int] = {v: i for i, v in enumerate(self.voter_jids)}
+        self.short_names: List[str] = [get_sender_name(v) for v in self.voter_jids]
+
+        # Estado por eleitor (arrays)
+        n = len(self.voter_jids)
+        self.parties: List[str] = list(parties)
+        self.ideology = array("d", (float(PARTIES.get(p, {"ideology": 0})["ideology"]) for p in parties))
+        self.engagement = array("d", (random.random() for _ in range(n)))
+        self.credibility = array("d", (random.uniform(0.5, 0.9) for _ in range(n)))
+        self.msg_count = array("l", bytes(8 * n))
+        self.voted = bytearray(n)
+        self.memory: List[Optional[Dict[str, ImpactWindow]]] = [None] * n
+
+        # Vizinhos: locais (índices) e remotos (JIDs lógicos de outras populações)
+        self.local_neighbours: List[List[int]] = []
+        self.remote_neighbours: List[List[str]] = []
+        for nbrs in neighbours:
+            self.local_neighbours.append([self.index[v] for v in nbrs if v in self.index])
+            self.remote_neighbours.append([v for v in nbrs if v not in self.index])
+        # Modo gossip: último perfil de cada vizinho remoto e, por host vizinho,
+        # os eleitores locais cujo perfil vai no payload (montado no 1º TICK)
+        self.remote_profiles: Dict[str, Tuple[float, float]] = {}
+        self._gossip_routes: Optional[Dict[str, List[int]]] = None
+
+        # Estado global
+        self.tick: int = 0
+        self.candidates_known: List[str] = []
+        self.candidates_short: List[str] = []
+        self.candidate_idx: set = set()
+
+    async def setup(self):
+        print(
+            f"[{get_sender_name(str(self.jid)).upper()}] População iniciada: "
+            f"{len(self.voter_jids)} eleitores lógicos."
+        )
+        self.add_behaviour(self.PopulationCycle(), Template())
+
+    # =========================================================
+    # Helpers
+    # =========================================================
+    def _label(self, i: int) -> str:
+        return self.short_names[i].upper()
+
+    def _to_voter(self, to_voter: str, protocol: str, performative: str, body: str) -> Message:
+        """Mensagem para outro eleitor lógico (voter_id = destinatário, se hospedado)."""
+        m = Message()
+        self.directory.address(m, to_voter)
+        m.set_metadata("protocol", protocol)
+        m.set_metadata("performative", performative)
+        m.body = body
+        return m
+
+    def handle_init_sim(self, body: str):
+        if body.startswith("TICK_"):
+            try:
+                self.tick = int(body.split("_", 1)[1])
+            except Exception:
+                pass
+
+        if "CANDIDATES_ANNOUNCED" in body:
+            cands: List[str] = []
+            for p in body.split(";"):
+                if p.startswith("CANDIDATES="):
+                    raw = p.split("=", 1)[1].strip()
+                    cands = [x.strip() for x in raw.split(",") if x.strip()]
+            self.candidates_known = cands
+            self.candidates_short = [get_sender_name(c) for c in cands]
+            self.candidate_idx = {self.index[c] for c in cands if c in self.index}
+            for i in self.candidate_idx:
+                print(f"[{self._label(i)}] *** PROMOVIDO A CANDIDATO ***")
+
+    async def influence_step(self, beh: CyclicBehaviour):
+        """Cada eleitor consulta um vizinho com prob. P_SOCIAL_QUERY (T0..T10)."""
+        for i in range(len(self.voter_jids)):
+            n_local = len(self.local_neighbours[i])
+            n_total = n_local + len(self.remote_neighbours[i])
+            if not n_total or random.random() >= P_SOCIAL_QUERY:
+                continue
+            k = random.randrange(n_total)
+            if k < n_local:
+                j = self.local_neighbours[i][k]
+                self.ideology[i] = influence_ideology(self.ideology[i], self.ideology[j], self.engagement[j])
+            else:
+                q = self._to_voter(self.remote_neighbours[i][k - n_local], PROTOCOL_INFLUENCE, "query",
+                                   "QUERY_PROFILE")
+                q.set_metadata(REPLY_VOTER_KEY, self.voter_jids[i])
+                await beh.send(q)
+
+    async def gossip_step(self, beh: CyclicBehaviour):
+        """Modo gossip: influência pelos perfis já conhecidos + um payload PROFILE por host vizinho."""
+        for i in range(len(self.voter_jids)):
+            n_local = len(self.local_neighbours[i])
+            n_total = n_local + len(self.remote_neighbours[i])
+            if not n_total or random.random() >= P_SOCIAL_QUERY:
+                continue
+            k = random.randrange(n_total)
+            if k < n_local:
+                j = self.local_neighbours[i][k]
+                self.ideology[i] = influence_ideology(self.ideology[i], self.ideology[j], self.engagement[j])
+            else:
+                profile = self.remote_profiles.get(self.remote_neighbours[i][k - n_local])
+                if profile is not None:
+                    self.ideology[i] = influence_ideology(self.ideology[i], profile[0], profile[1])
+
+        if self._gossip_routes is None:
+            routes: Dict[str, List[int]] = {}
+            for i, remote in enumerate(self.remote_neighbours):
+                for host in {self.directory.host_of(v) for v in remote}:
+                    routes.setdefault(host, []).append(i)
+            self._gossip_routes = routes
+
+        for host, members in self._gossip_routes.items():
+            m = Message(to=host)
+            m.set_metadata("protocol", PROTOCOL_PROFILE)
+            m.set_metadata("performative", "inform")
+            m.body = encode_profiles([(self.voter_jids[i], self.ideology[i], self.engagement[i]) for i in members])
+            await beh.send(m)
+
+    def store_profiles(self, msg: Message):
+        for jid, ideol, eng in decode_profiles(msg.body or ""):
+            self.remote_profiles[jid] = (ideol, eng)
+
+    async def handle_influence(self, msg: Message, beh: CyclicBehaviour):
+        i = self.index.get(msg.get_metadata(VOTER_ID_KEY) or "")
+        if i is None:
+            return
+        if msg.get_metadata("performative") == "query" and (msg.body or "").upper() == "QUERY_PROFILE":
+            data = {"ideology": self.ideology[i], "engagement": self.engagement[i]}
+            to_voter = msg.get_metadata(REPLY_VOTER_KEY) or str(msg.sender)
+            await beh.send(self._to_voter(to_voter, PROTOCOL_INFLUENCE, "inform", json.dumps(data)))
+        elif msg.get_metadata("performative") == "inform":
+            try:
+                payload = json.loads(msg.body or "{}")
+                self.ideology[i] = influence_ideology(
+                    self.ideology[i], float(payload.get("ideology", 0)), float(payload.get("engagement", 0))
+                )
+            except Exception:
+                pass
+
+    async def handle_engagement_request(self, msg: Message, beh: CyclicBehaviour):
+        """Uma resposta RESPONSE_ENGAGEMENT por eleitor lógico."""
+        for i in range(len(self.voter_jids)):
+            data = {
+                "engagement": self.engagement[i],
+                "party": self.parties[i],
+                "ideology": self.ideology[i],
+                "credibility": self.credibility[i],
+            }
+            reply = Message(to=str(msg.sender))
+            reply.set_metadata("protocol", PROTOCOL_RESPONSE_ENGAGEMENT)
+            reply.set_metadata("performative", "inform")
+            reply.set_metadata(VOTER_ID_KEY, self.voter_jids[i])
+            reply.body = json.dumps(data)
+            await beh.send(reply)
+
+    def update_campaign_memory(self, i: int, campaign_msg: Message):
+        """Memória curta (CAMPAIGN_MEMORY_WINDOW últimos impactos por candidato), como no VoterAgent."""
+        performative = (campaign_msg.get_metadata("performative") or "").upper()
+        try:
+            candidate_id_short = campaign_msg.body.split(":")[1].split(";")[0]
+        except Exception:
+            return
+        self.remember_campaign(i, performative, candidate_id_short)
+
+    def remember_campaign(self, i: int, performative: str, candidate_id_short: str):
+        """Impacto de um envio na memória do eleitor i (mensagem avulsa ou lote CAMPAIGN_BATCH)."""
+        impact = campaign_impact(performative, self.credibility[i])
+        if not candidate_id_short or candidate_id_short not in self.candidates_short:
+            return
+
+        mem = self.memory[i]
+        if mem is None:
+            mem = self.memory[i] = {}
+        window = mem.get(candidate_id_short)
+        if window is None:
+            window = mem[candidate_id_short] = ImpactWindow()
+        window.add(impact)
+
+        if POPULATION_VERBOSE:
+            resumo_mem = {c: f"{[f'{v:.4f}' for v in l.values()]}" for c, l in mem.items()}
+            print(
+                f"[{self._label(i)}] CAMPANHA RECEBIDA: "
+                f"cand={candidate_id_short}, perf={performative}, impacto={impact:.4f}, "
+                f"memoria={resumo_mem}"
+            )
+
+    async def vote_all(self, beh: CyclicBehaviour):
+        """Decide e envia o voto de cada eleitor que ainda não votou."""
+        sent = abstentions = 0
+        ballots: List[Tuple[str, str]] = []
+        for i in range(len(self.voter_jids)):
+            if self.voted[i]:
+                continue
+            self.voted[i] = 1
+            decision = decide_vote(
+                self.engagement[i],
+                self.msg_count[i],
+                self.memory[i] or {},
+                self.candidates_short,
+                i in self.candidate_idx,
+                self.short_names[i],
+            )
+            if decision["choice"] is None:
+                abstentions += 1
+                if POPULATION_VERBOSE:
+                    print(
+                        f"[{self._label(i)}] ABSTENÇÃO: não enviou voto (Engagement={self.engagement[i]:.2f}, "
+                        f"Eng_Eff={decision['effective_engagement']:.2f}, P_Abstain={decision['p_abstain']:.2f})."
+                    )
+                continue
+
+            vote = decision["choice"]
+            if vote != "NULO":
+                vote = f"{vote}@{self.server}"
+            if POPULATION_VERBOSE:
+                print(f"[{self._label(i)}] VOTO FINAL DECIDIDO: {vote.upper()}")
+
+            if VOTE_AGGREGATION == "summary":
+                ballots.append((self.voter_jids[i], vote))
+                continue
+            msg = Message(to=self.authority_jid)
+            msg.set_metadata("protocol", PROTOCOL_VOTE)
+            msg.set_metadata("performative", "inform")
+            msg.set_metadata(VOTER_ID_KEY, self.voter_jids[i])
+            msg.body = vote
+            await beh.send(msg)
+            sent += 1
+
+        if ballots:
+            # Uma mensagem por população: a Autoridade soma O(populações) resumos
+            summary = summarize_ballots(ballots)
+            summary["population"] = str(self.jid)
+            msg = Message(to=self.authority_jid)
+            msg.set_metadata("protocol", PROTOCOL_BALLOT_SUMMARY)
+            msg.set_metadata("performative", "inform")
+            msg.body = json.dumps(summary)
+            await beh.send(msg)
+            sent += len(ballots)
+
+        if sent or abstentions:
+            print(
+                f"[{get_sender_name(str(self.jid)).upper()}] VOTAÇÃO: "
+                f"{sent} votos enviados, {abstentions} abstenções."
+            )
+
+    # =========================================================
+    # Behaviour
+    # =========================================================
+    class PopulationCycle(CyclicBehaviour):
+        async def run(self):
+            agent = self.agent
+            # Failsafe T51 (como no VoterAgent)
+            if agent.tick >= TOTAL_TICKS and not all(agent.voted):
+                await agent.vote_all(self)
+                return
+
+            msg = await self.receive(timeout=RECEIVE_TIMEOUT)
+            if not msg:
+                return
+
+            proto = msg.get_metadata("protocol") or ""
+
+            if proto == PROTOCOL_INIT_SIM:
+                agent.handle_init_sim(msg.body or "")
+                if (msg.body or "").startswith("TICK_") and agent.tick <= 10:
+                    if INFLUENCE_MODE == "gossip":
+                        await agent.gossip_step(self)
+                    else:
+                        await agent.influence_step(self)
+
+            elif proto == PROTOCOL_REQUEST_ENGAGEMENT:
+                await agent.handle_engagement_request(msg, self)
+
+            elif proto == PROTOCOL_INFLUENCE:
+                await agent.handle_influence(msg, self)
+
+            elif proto == PROTOCOL_PROFILE:
+                agent.store_profiles(msg)
+
+            elif proto == PROTOCOL_CAMPAIGN:
+                i = agent.index.get(msg.get_metadata(VOTER_ID_KEY) or "")
+                if i is not None and i not in agent.candidate_idx and agent.tick > 10:
+                    agent.msg_count[i] += 1
+                    agent.update_campaign_memory(i, msg)
+
+            elif proto == PROTOCOL_CAMPAIGN_BATCH:
+                if agent.tick > 10:
+                    for voter, cand_short, performative in decode_pitches(msg.body or ""):
+                        i = agent.index.get(voter)
+                        if i is not None and i not in agent.candidate_idx:
+                            agent.msg_count[i] += 1
+                            agent.remember_campaign(i, performative, cand_short)
+
+            elif proto == PROTOCOL_VOTING:
+                if (msg.get_metadata("performative") == "request"
+                        and (msg.body or "").strip().upper() == "REQUEST_VOTE"):
+                    print(f"[{get_sender_name(str(agent.jid)).upper()}] REQUEST_VOTE recebido. Iniciando votação.")
+                    await agent.vote_all(self)
@@ -0,0 +1,348 @@
+# python_spade/xmpp_stress.py
+"""
+Teste de carga do servidor XMPP embutido (pyjabber), na linha do spade_ping.py.
+
+Sobe o servidor no mesmo event loop dos clientes (como o SPADE embutido) e
+M pares Pinger/Ponger. Cada Pinger envia, a uma taxa fixa,
+stanzas com o formato das mensagens da simulação (CAMPAIGN, TICK,
+RESPONSE_ENGAGEMENT, VOTE) e o Ponger devolve cada uma. Toda mensagem passa
+pelo servidor (XmppOnlyContainer), mesmo com os agentes no mesmo processo.
+
+Os níveis de M são cumulativos (pares novos entram a cada nível) e, para
+cada um, o relatório traz stanzas/s roteadas, latência de ida e volta
+(p50/p99), perdas e CPU do servidor (fração do event loop em frames do
+pyjabber, amostrada, mais o pool de processos dele). O nível em que as stanzas/s deixam de
+acompanhar a carga oferecida é o teto do transporte.
+
+Uso:
+    python xmpp_stress.py --pairs 10 50 100 200 --rate 5 --duration 10 --out stress.json
+    python xmpp_stress.py --pairs 50 --db-file server_stress.db   # SQLite em disco
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+PYJABBER_DIR = os.sep + "pyjabber" + os.sep
+
+PING_PREFIX = "stress_ping"
+PONG_PREFIX = "stress_pong"
+
+# Stanzas no formato das mensagens da simulação: (protocolo, performative, corpo)
+SHAPES = [
+    ("CAMPAIGN", "NEWS", "pitch:voter_12;t=33"),
+    ("SIM_INIT", "inform", "TICK_33"),
+    ("RESPONSE_ENGAGEMENT", "inform",
+     '{"engagement": 0.4821, "party": "PCE", "ideology": 0.1375, "credibility": 0.7112}'),
+    ("VOTE", "inform", "voter_7@localhost"),
+]
+
+
+# ==========================
+# Servidor (no mesmo event loop, como o SPADE embutido)
+# ==========================
+async def start_server(db_file: Optional[str]):
+    """Sobe o pyjabber neste event loop (SQLite em memória, ou em disco com db_file)."""
+    import loguru
+    from pyjabber.server import Server
+    from pyjabber.server_parameters import Parameters
+
+    loguru.logger.remove()  # servidor silencioso
+    if db_file:
+        params = Parameters(host="localhost", database_path=os.path.abspath(db_file), database_purge=True)
+    else:
+        params = Parameters(host="localhost", database_in_memory=True)
+    server = Server(params)
+    task = asyncio.create_task(server.start())
+    await server.ready.wait()
+    return task
+
+
+def children_cpu_seconds() -> float:
+    """CPU (user+sys) dos processos filhos vivos (pool do pyjabber; Linux: /proc)."""
+    hz = os.sysconf("SC_CLK_TCK")
+    me = os.getpid()
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as fh:
+                fields = fh.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == me:  # ppid (campo 4, contando após o ")")
+            total += int(fields[11]) + int(fields[12])
+    return total / hz
+
+
+class ServerSampler:
+    """
+    Estima a CPU do servidor no event loop compartilhado: amostra a pilha da
+    thread do loop e conta as amostras com algum frame do pyjabber.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.server = 0
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="stress-sampler", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            in_server = False
+            while frame is not None:
+                if PYJABBER_DIR in frame.f_code.co_filename:
+                    in_server = True
+                    break
+                frame = frame.f_back
+            self.total += 1
+            self.server += in_server
+
+    def reset(self):
+        self.server = self.total = 0
+
+    def share(self) -> float:
+        return self.server / self.total if self.total else 0.0
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# ==========================
+# Agentes
+# ==========================
+def _agents():
+    """Classes dos agentes (import tardio do SPADE)."""
+    from spade.agent import Agent
+    from spade.behaviour import CyclicBehaviour
+    from spade.message import Message
+
+    from sim_agent import XmppOnlyContainer
+
+    class StressAgent(Agent):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.set_container(XmppOnlyContainer(self.container))
+
+    class Ponger(StressAgent):
+        class Echo(CyclicBehaviour):
+            async def run(self):
+                msg = await self.receive(timeout=1)
+                if msg:
+                    reply = Message(to=str(msg.sender), body=msg.body, metadata=dict(msg.metadata))
+                    await self.send(reply)
+
+        async def setup(self):
+            self.add_behaviour(self.Echo())
+
+    class Pinger(StressAgent):
+        def __init__(self, jid, password, target, stats, *args, **kwargs):
+            super().__init__(jid, password, *args, **kwargs)
+            self.target = target
+            self.stats = stats
+            self.rate = 0.0
+            self.seq = 0
+
+        class Send(CyclicBehaviour):
+            async def run(self):
+                agent = self.agent
+                if agent.rate <= 0:
+                    await asyncio.sleep(0.1)
+                    return
+                protocol, performative, body = SHAPES[agent.seq % len(SHAPES)]
+                m = Message(to=agent.target, body=body)
+                m.set_metadata("protocol", protocol)
+                m.set_metadata("performative", performative)
+                m.set_metadata("stress_t0", repr(time.perf_counter()))
+                agent.seq += 1
+                await self.send(m)
+                agent.stats.sent += 1
+                # Taxa fixa com relógio ancorado (sem deriva acumulada)
+                agent.next_at = max(getattr(agent, "next_at", 0.0) + 1.0 / agent.rate, time.perf_counter() - 1.0)
+                await asyncio.sleep(max(0.0, agent.next_at - time.perf_counter()))
+
+        class Collect(CyclicBehaviour):
+            async def run(self):
+                msg = await self.receive(timeout=1)
+                if msg:
+                    self.agent.stats.record(time.perf_counter() - float(msg.get_metadata("stress_t0")))
+
+        async def setup(self):
+            self.add_behaviour(self.Send())
+            self.add_behaviour(self.Collect())
+
+    return Pinger, Ponger
+
+
+class LevelStats:
+    """Contadores de um nível de carga (compartilhados pelos Pingers)."""
+
+    def __init__(self):
+        self.sent = 0
+        self.latencies: List[float] = []
+
+    def record(self, seconds: float):
+        self.latencies.append(seconds)
+
+
+def _quantile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# ==========================
+# Execução
+# ==========================
+async def start_agent(agent, retries: int = 5) -> bool:
+    """start() com novas tentativas (o pyjabber recusa conexões esporadicamente, como em safe_start)."""
+    for attempt in range(1, retries + 1):
+        try:
+            await asyncio.wait_for(agent.start(auto_register=True), timeout=20.0)
+            return True
+        except Exception as e:
+            print(f"[STRESS][ERRO] {agent.jid} (tentativa {attempt}): {e!r}")
+            await asyncio.sleep(0.5 * attempt)
+    return False
+
+
+async def run_levels(args, sampler: ServerSampler) -> List[Dict[str, Any]]:
+    from common import PASSWORD, generate_jid
+
+    Pinger, Ponger = _agents()
+    pingers: List[Any] = []
+    agents: List[Any] = []
+    levels = []
+
+    for n_pairs in sorted(args.pairs):
+        # Sobe os pares novos deste nível
+        t_boot = time.perf_counter()
+        for i in range(len(pingers) + 1, n_pairs + 1):
+            pong_jid = generate_jid(PONG_PREFIX, i)
+            ponger = Ponger(pong_jid, PASSWORD)
+            pinger = Pinger(generate_jid(PING_PREFIX, i), PASSWORD, pong_jid, LevelStats())
+            for agent in (ponger, pinger):
+                if not await start_agent(agent):
+                    raise RuntimeError(f"não foi possível conectar {agent.jid}")
+            pingers.append(pinger)
+            agents += [ponger, pinger]
+        boot = time.perf_counter() - t_boot
+
+        # Carga: todos os Pingers à mesma taxa durante args.duration
+        stats = LevelStats()
+        for p in pingers:
+            p.stats = stats
+            p.next_at = time.perf_counter()
+            p.rate = args.rate
+        pool0 = children_cpu_seconds()
+        sampler.reset()
+        proc0 = time.process_time()
+        t0 = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        for p in pingers:
+            p.rate = 0.0
+        await asyncio.sleep(args.drain)  # respostas em trânsito
+        wall = time.perf_counter() - t0
+        # Parte do loop gasta em frames do pyjabber + CPU do pool de processos dele
+        cpu = sampler.share() * wall + (children_cpu_seconds() - pool0)
+        proc_cpu = time.process_time() - proc0
+
+        lat = sorted(stats.latencies)
+        received = len(lat)
+        level = {
+            "pairs": n_pairs,
+            "clients": 2 * n_pairs,
+            "boot_seconds": boot,
+            "offered_per_second": n_pairs * args.rate,
+            "sent": stats.sent,
+            "received": received,
+            "lost": stats.sent - received,
+            # ida (ping) + volta (pong) = 2 stanzas roteadas por ida e volta completa
+            "stanzas_per_second": 2 * received / args.duration,
+            "p50_ms": _quantile(lat, 0.50) * 1000.0 if lat else None,
+            "p99_ms": _quantile(lat, 0.99) * 1000.0 if lat else None,
+            "max_ms": lat[-1] * 1000.0 if lat else None,
+            "server_cpu_percent": 100.0 * cpu / wall,
+            # Processo inteiro (servidor + clientes no mesmo loop): ~100% = loop saturado
+            "process_cpu_percent": 100.0 * proc_cpu / wall,
+        }
+        level["saturated"] = (
+            stats.sent < 0.9 * level["offered_per_second"] * args.duration
+            or received < 0.95 * stats.sent
+            or (level["p99_ms"] or 0.0) > args.p99_limit_ms
+        )
+        print_level(level)
+        levels.append(level)
+
+    await asyncio.gather(*(a.stop() for a in agents), return_exceptions=True)
+    return levels
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if isinstance(value, (int, float)) else "-"
+
+
+def print_level(level: Dict[str, Any]):
+    print(
+        f"[STRESS] pares={level['pairs']:<5} oferta={level['offered_per_second']:.0f}/s "
+        f"enviadas={level['sent']:<7} recebidas={level['received']:<7} "
+        f"stanzas/s={level['stanzas_per_second']:.0f} "
+        f"p50={_fmt(level['p50_ms'], '.1f')}ms p99={_fmt(level['p99_ms'], '.1f')}ms "
+        f"cpu_servidor={level['server_cpu_percent']:.0f}% cpu_processo={level['process_cpu_percent']:.0f}%"
+        + (" <- SATURADO" if level["saturated"] else "")
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor XMPP embutido (pyjabber).")
+    parser.add_argument("--pairs", nargs="+", type=int, default=[10, 50, 100], help="Níveis de M pares (cumulativos)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Mensagens/s por Pinger")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duração de cada nível (s)")
+    parser.add_argument("--drain", type=float, default=2.0, help="Espera pelas respostas em trânsito (s)")
+    parser.add_argument("--p99-limit-ms", type=float, default=1000.0, help="p99 acima disso = saturado")
+    parser.add_argument("--db-file", default=None, help="SQLite em disco (padrão: em memória, como o SPADE)")
+    parser.add_argument("--out", default=None, help="Relatório JSON")
+    args = parser.parse_args(argv)
+
+    import spade
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rate_per_pinger": args.rate,
+            "duration": args.duration,
+            "database": args.db_file or "memória",
+            "cpu_count": os.cpu_count(),
+        },
+        "levels": [],
+    }
+
+    async def run():
+        server = await start_server(args.db_file)
+        sampler = ServerSampler()
+        try:
+            report["levels"] = await run_levels(args, sampler)
+        finally:
+            sampler.stop()
+            server.cancel()
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            print(f"[STRESS] Relatório salvo em: {args.out}")
+
+    spade.run(run())
+
+
+if __name__ == "__main__":
+    main()